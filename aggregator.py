@@ -0,0 +1,193 @@
+"""
+Snapshot aggregator for BF6 Crash Monitor
+Receives batches from the monitors' publishers and ingests them into one
+crash store. A single asyncio loop serves every sender; decoding is the only
+work on the loop, all writes go through the store's writer thread. A batch
+is acknowledged only once the store has committed it, so a failed write is
+resent by its sender.
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+
+from crash_store import snapshot_row
+from publisher import ACK, HEADER, decode_header, decode_payload
+
+
+def _settle(loop, future):
+    """A store done(error) callback that resolves future on loop, from the writer thread"""
+    def resolve(error):
+        if not future.done():
+            future.set_result(error)
+
+    def done(error):
+        try:
+            loop.call_soon_threadsafe(resolve, error)
+        except RuntimeError:
+            # The loop closed while the write was queued
+            pass
+    return done
+
+
+class Aggregator:
+    """Asyncio TCP server writing every sender's snapshots and crashes to one CrashStore"""
+
+    def __init__(self, store, host='127.0.0.1', port=0, drain_timeout=2.0, backlog=1024):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.drain_timeout = drain_timeout
+        # A restarted aggregator gets every sender reconnecting at once
+        self.backlog = backlog
+        self.connected = 0
+        self.connections = 0
+        # sender id -> last batch sequence number, kept across reconnects
+        self.sequences = {}
+        self.last_seen = {}
+        self.batches = 0
+        self.snapshots = 0
+        self.crashes = 0
+        self.bytes = 0
+        self.bad_frames = 0
+        self.duplicates = 0
+        self.store_errors = 0
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.error = None
+        self._ready = threading.Event()
+
+    async def serve(self):
+        """Serve until cancelled"""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, backlog=self.backlog)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start(self, timeout=5.0):
+        """Serve on a background thread; returns the bound port"""
+        self.thread = threading.Thread(target=self._run, name="Aggregator", daemon=True)
+        self.thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("aggregator did not start")
+        if self.error:
+            raise self.error
+        return self.port
+
+    def stop(self, timeout=5.0):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.thread:
+            self.thread.join(timeout)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        except asyncio.CancelledError:
+            pass
+        except OSError as e:
+            # Address in use and the like - start() raises it
+            self.error = e
+            self._ready.set()
+        finally:
+            # Frames already sent are still in the socket buffers: read on
+            # until the senders hang up or the grace period runs out
+            self.loop.run_until_complete(self._drain())
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    async def _drain(self):
+        deadline = self.loop.time() + self.drain_timeout
+        while self.connected and self.loop.time() < deadline:
+            await asyncio.sleep(0.05)
+
+    def stats(self):
+        return {
+            'connected': self.connected,
+            'hosts': len(self.last_seen),
+            'connections': self.connections,
+            'batches': self.batches,
+            'snapshots': self.snapshots,
+            'crashes': self.crashes,
+            'bytes': self.bytes,
+            'bad_frames': self.bad_frames,
+            'duplicates': self.duplicates,
+            'store_errors': self.store_errors
+        }
+
+    async def _handle(self, reader, writer):
+        self.connected += 1
+        self.connections += 1
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                flags, length = decode_header(header)
+                payload = await reader.readexactly(length)
+                self.bytes += HEADER.size + length
+                batch = decode_payload(flags, payload)
+                if not await self.ingest(batch):
+                    # Not stored: hang up unacknowledged, the sender resends it after reconnecting
+                    break
+                writer.write(ACK.pack(batch['seq']))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Sender hung up, or the aggregator is shutting down
+            pass
+        except (ValueError, KeyError, TypeError, zlib.error):
+            # A stream that isn't ours can't be resynchronized - drop the connection
+            self.bad_frames += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.connected -= 1
+            writer.close()
+
+    async def ingest(self, batch):
+        """Store one decoded batch; True once it is committed or was stored before"""
+        host = batch['host']
+        last = self.sequences.get(batch['sender'])
+        if last is not None and batch['seq'] <= last:
+            # Resent after a lost acknowledgement
+            self.duplicates += 1
+            return True
+
+        loop = asyncio.get_running_loop()
+        writes = []
+
+        def done():
+            writes.append(loop.create_future())
+            return _settle(loop, writes[-1])
+
+        rows, latest, crashes = [], None, 0
+        for item in batch['items']:
+            if item['kind'] == 'snapshot':
+                rows.append(snapshot_row(host, item['data'], item['time']))
+                latest = item['data']
+            elif item['kind'] == 'crash':
+                report = dict(item['data']['report'], host=host)
+                # Two machines can crash in the same second
+                self.store.save(report, f"{host}/{item['data']['source']}", done=done())
+                crashes += 1
+        if rows:
+            self.store.save_snapshots(host, rows, latest, done=done())
+
+        if any(error is not None for error in await asyncio.gather(*writes)):
+            self.store_errors += 1
+            return False
+
+        # Only a stored batch counts as seen, so its resend isn't skipped as a duplicate
+        self.sequences[batch['sender']] = batch['seq']
+        self.last_seen[host] = time.time()
+        self.batches += 1
+        self.crashes += crashes
+        self.snapshots += len(rows)
+        return True
@@ -0,0 +1,242 @@
+"""
+End-to-end publisher -> aggregator run over localhost
+Run: python benchmarks/bench_aggregator.py [--senders 200] [--seconds 10] [--rate 1] [--outage 2]
+
+The aggregator runs in its own process so its CPU time is measured apart
+from the senders. Every sender publishes real-shaped snapshots (from the
+fake backends) at --rate per second plus one crash report; the first
+--outage seconds are published before the aggregator is listening, to
+exercise reconnects. A second, in-process check holds the store's writes
+back to show a batch is acknowledged only once it is committed, and that a
+failed write is resent rather than skipped. Exits 1 if anything published
+didn't reach the store or a check fails.
+"""
+
+import argparse
+import multiprocessing
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aggregator import Aggregator
+from crash_store import CrashStore
+from fake_backends import FakeProcessTable, fake_backends
+from monitor_engine import MonitorEngine
+from publisher import ACK, SnapshotPublisher, encode_batch
+from checks import check, finish
+
+
+def serve(log_dir, port, ready, stop, results):
+    store = CrashStore(Path(log_dir) / "crash_history.db")
+    # Stopped only after every publisher closed: read all they sent
+    aggregator = Aggregator(store, '127.0.0.1', port, drain_timeout=120)
+    aggregator.start()
+    ready.set()
+    stop.wait()
+    aggregator.stop()
+    store.sync(wait=True, timeout=120)
+    store.close(timeout=120)
+    results.put(aggregator.stats())
+
+
+def sample_data(tmp):
+    """One snapshot and one crash report shaped like the real ones"""
+    table = FakeProcessTable(200, planted=['bf6.exe', 'EAAntiCheat.GameService.exe'])
+    engine = MonitorEngine(backends=fake_backends(table, tmp), log_dir=tmp)
+    try:
+        snapshot = engine.get_system_snapshot()
+        snapshot['targets'] = {name: target.status() for name, target in engine.targets.items()}
+        source, report = engine.save_crash_report(snapshot)
+    finally:
+        engine.close()
+    return snapshot, {'source': source, 'report': report}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class GatedStore:
+    """Stands in for CrashStore; writes complete only when release() says so"""
+
+    def __init__(self):
+        self.waiting = []
+        self.lock = threading.Lock()
+
+    def save(self, report, source=None, done=None):
+        with self.lock:
+            self.waiting.append(done)
+
+    def save_snapshots(self, host, rows, latest=None, done=None):
+        with self.lock:
+            self.waiting.append(done)
+
+    def release(self, error=None, timeout=5.0):
+        """Complete the queued writes, once there are some; False if none came"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                waiting, self.waiting = self.waiting, []
+            if waiting:
+                for done in waiting:
+                    done(error)
+                return True
+            time.sleep(0.01)
+        return False
+
+
+def send_batch(port, seq, snapshot):
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(encode_batch({'host': 'pc001', 'sender': 'bench', 'seq': seq, 'sent_at': time.time(),
+                               'items': [{'kind': 'snapshot', 'time': time.time(), 'data': snapshot}]}))
+    return sock
+
+
+def read_ack(sock, timeout):
+    """The acknowledged sequence number, None if none came in time, False if the aggregator hung up"""
+    sock.settimeout(timeout)
+    try:
+        data = sock.recv(ACK.size)
+    except socket.timeout:
+        return None
+    return ACK.unpack(data)[0] if len(data) == ACK.size else False
+
+
+def check_ack(snapshot):
+    store = GatedStore()
+    aggregator = Aggregator(store, '127.0.0.1', 0)
+    port = aggregator.start()
+    try:
+        sock = send_batch(port, 1, snapshot)
+        check("no ACK while the write is still queued", read_ack(sock, 0.5) is None)
+        store.release()
+        check("the ACK follows the commit", read_ack(sock, 5) == 1)
+        sock.close()
+
+        sock = send_batch(port, 2, snapshot)
+        store.release(RuntimeError("disk full"))
+        check("a failed write is hung up on without an ACK", read_ack(sock, 5) is False)
+        sock.close()
+
+        sock = send_batch(port, 2, snapshot)
+        store.release()
+        check("the resent batch is stored, not skipped as a duplicate",
+              read_ack(sock, 5) == 2 and aggregator.duplicates == 0 and aggregator.snapshots == 2,
+              f"{aggregator.snapshots} snapshots, {aggregator.duplicates} duplicates")
+        sock.close()
+
+        sock = send_batch(port, 2, snapshot)
+        check("a batch stored before is acknowledged without writing it again",
+              read_ack(sock, 5) == 2 and not store.waiting and aggregator.duplicates == 1)
+        sock.close()
+        check("the failed write is counted", aggregator.store_errors == 1)
+    finally:
+        aggregator.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publisher/aggregator end-to-end benchmark")
+    parser.add_argument('--senders', type=int, default=200)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--rate', type=float, default=1.0, help='snapshots per second per sender')
+    parser.add_argument('--outage', type=float, default=2.0,
+                        help='seconds of publishing before the aggregator starts')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot, crash = sample_data(tmp)
+        agg_dir = Path(tmp) / 'aggregated'
+        agg_dir.mkdir()
+        port = free_port()
+
+        publishers = [SnapshotPublisher(('127.0.0.1', port), host_name=f"pc{index:03d}",
+                                        max_queue=int(args.rate * (args.outage + 5)) + 50)
+                      for index in range(args.senders)]
+        for publisher in publishers:
+            publisher.start()
+
+        ready, stop = multiprocessing.Event(), multiprocessing.Event()
+        results = multiprocessing.Queue()
+        server = multiprocessing.Process(target=serve, args=(str(agg_dir), port, ready, stop, results))
+
+        publish_us = []
+        ticks = int(args.seconds * args.rate)
+        started = time.perf_counter()
+        for tick in range(ticks):
+            if not server.is_alive() and tick >= args.outage * args.rate and not ready.is_set():
+                server.start()
+                ready.wait(30)
+                cpu_start = psutil.Process(server.pid).cpu_times()
+            for publisher in publishers:
+                t0 = time.perf_counter()
+                publisher.publish('snapshot', snapshot)
+                publish_us.append((time.perf_counter() - t0) * 1e6)
+            if tick == ticks // 2:
+                for publisher in publishers:
+                    publisher.publish('crash', crash)
+            delay = started + (tick + 1) / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        # Publishers flush what they still hold on close
+        for publisher in publishers:
+            publisher._stop_event.set()
+            publisher._wake.set()
+        for publisher in publishers:
+            publisher.close(timeout=30)
+        stats = [publisher.stats() for publisher in publishers]
+
+        cpu_end = psutil.Process(server.pid).cpu_times()
+        stop.set()
+        agg = results.get(timeout=180)
+        server.join(30)
+        elapsed = time.perf_counter() - started - args.outage
+
+        conn = sqlite3.connect(str(agg_dir / "crash_history.db"))
+        try:
+            stored_snapshots = conn.execute("SELECT COUNT(*) FROM host_snapshots").fetchone()[0]
+            stored_crashes = conn.execute("SELECT COUNT(*) FROM crashes").fetchone()[0]
+            hosts = conn.execute("SELECT COUNT(*) FROM hosts").fetchone()[0]
+        finally:
+            conn.close()
+
+    published = args.senders * ticks
+    sent_bytes = sum(stat['sent_bytes'] for stat in stats)
+    dropped = sum(stat['dropped'] for stat in stats)
+    cpu = (cpu_end.user + cpu_end.system) - (cpu_start.user + cpu_start.system)
+    ordered = sorted(publish_us)
+
+    print(f"Senders:                 {args.senders} at {args.rate}/s for {args.seconds:.0f} s "
+          f"(aggregator down for the first {args.outage:.0f} s)")
+    print(f"publish() p50 / p99:     {statistics.median(ordered):.1f} / "
+          f"{ordered[int(len(ordered) * 0.99)]:.1f} us")
+    print(f"Wire bytes per item:     {sent_bytes / max(1, agg['snapshots'] + agg['crashes']):.0f} "
+          f"(snapshot JSON is {len(str(snapshot))} chars)")
+    print(f"Aggregator CPU:          {cpu:.2f} s over {elapsed:.1f} s "
+          f"({cpu / elapsed * 100:.1f}% of one core, {cpu / max(1, agg['snapshots']) * 1e6:.0f} us per snapshot)")
+    print(f"Delivered:               {stored_snapshots}/{published} snapshots, "
+          f"{stored_crashes}/{args.senders} crashes from {hosts} hosts, {dropped} dropped at the sender")
+    print(f"Resent duplicates:       {agg['duplicates']}, bad frames: {agg['bad_frames']}")
+    print()
+    check("every snapshot was stored or dropped at the sender", stored_snapshots + dropped == published,
+          f"{stored_snapshots} + {dropped} of {published}")
+    check("every crash report was stored", stored_crashes == args.senders, f"{stored_crashes} of {args.senders}")
+    check("no bad frames", not agg['bad_frames'], str(agg['bad_frames']))
+    check_ack(snapshot)
+    finish()
+
+
+if __name__ == "__main__":
+    main()
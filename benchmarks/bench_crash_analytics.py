@@ -0,0 +1,201 @@
+"""
+Benchmark: crash analytics over the SQLite store vs parsing every JSON report
+Run: python benchmarks/bench_crash_analytics.py [reports] [json_reports]
+
+Builds a synthetic corpus of crash reports (random drivers, HAGS, Javelin
+versions, running times and findings), loads it into a CrashStore, and times
+crash_analytics against the old approach of opening each
+crash_report_*.json and aggregating in Python. Checks that both give the same
+crash count, play time, median time to crash and per-driver counts on one
+corpus, and that since= keeps only the newer reports; exits 1 if any check
+fails.
+"""
+
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crash_analytics import crash_analytics, format_analytics
+from crash_store import CrashStore
+from checks import check, finish
+
+DRIVERS = [('AMD', '31.0.24027.1012'), ('AMD', '32.0.11021.1011'), ('AMD', '32.0.12011.1036'),
+           ('NVIDIA', '32.0.15.6094'), ('NVIDIA', '32.0.15.6590'), ('NVIDIA', '32.0.15.7216')]
+JAVELIN_VERSIONS = ['1.0.8.2', '1.0.9.0', '1.1.0.3']
+RULES = ['gpu_tdr', 'amd_driver', 'nvidia_driver', 'javelin_error', 'hags_enabled', 'high_ram']
+
+
+def synthetic_report(rng, index, start):
+    vendor, driver = rng.choice(DRIVERS)
+    running_time = rng.expovariate(1 / 2400)
+    exit_time = start + index * 1800 + rng.random() * 600
+    findings = [{'rule': rule, 'issue': rule, 'recommendation': None, 'count': rng.randint(1, 30)}
+                for rule in rng.sample(RULES, rng.randint(0, 3))]
+    return {
+        'crash_number': 1,
+        'crash_time': time.strftime("%Y%m%d_%H%M%S", time.localtime(exit_time)),
+        'game_exit': {
+            'pid': 1000 + index,
+            'exit_code': 0 if rng.random() < 0.1 else 0xC0000005,
+            'exit_timestamp': exit_time,
+            'running_time': running_time
+        },
+        'pre_crash_snapshot': {
+            'cpu_percent': rng.uniform(20, 100),
+            'memory': {'percent': rng.uniform(40, 99)},
+            'gpu_info': {'Name': f"{vendor} GPU", 'DriverVersion': driver, 'Vendor': vendor},
+            'hags_enabled': rng.random() < 0.4,
+            'ea_javelin': {'installed': True, 'version': rng.choice(JAVELIN_VERSIONS)},
+            'anticheat_process': {'name': 'JavelinAC.exe'} if rng.random() < 0.95 else None,
+            'bf6_process': {'running_time': running_time}
+        },
+        # Real reports carry the pre-crash window and event log entries too
+        'pre_crash_window': {
+            'end_time': exit_time,
+            'samples': 240,
+            'offset_seconds': [round(-60 + i * 0.25, 2) for i in range(240)],
+            'cpu_percent': [round(rng.uniform(20, 100), 2) for _ in range(240)],
+            'game_rss_mb': [round(rng.uniform(6000, 9000), 2) for _ in range(240)]
+        },
+        'windows_event_logs': [
+            {'Source': 'Display', 'EventID': 4101, 'TimeGenerated': None,
+             'Message': f"Display driver stopped responding and has successfully recovered ({i})"}
+            for i in range(rng.randint(0, 30))
+        ],
+        'quick_analysis': {'issues': [], 'recommendations': [], 'findings': findings}
+    }
+
+
+def legacy_analytics(paths):
+    """What answering these questions took with one JSON file per crash"""
+    crashes = 0
+    play_seconds = 0.0
+    running_times = []
+    by_driver = {}
+    by_hags = {}
+    by_javelin = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        exit_info = report.get('game_exit') or {}
+        snapshot = report['pre_crash_snapshot']
+        play_seconds += exit_info.get('running_time') or 0
+        if exit_info.get('exit_code') == 0:
+            continue
+        crashes += 1
+        running_times.append(exit_info.get('running_time'))
+        gpu = snapshot.get('gpu_info') or {}
+        key = (gpu.get('Vendor'), gpu.get('DriverVersion'))
+        by_driver[key] = by_driver.get(key, 0) + 1
+        by_hags[snapshot.get('hags_enabled')] = by_hags.get(snapshot.get('hags_enabled'), 0) + 1
+        version = (snapshot.get('ea_javelin') or {}).get('version')
+        by_javelin[version] = by_javelin.get(version, 0) + 1
+    running_times.sort()
+    return crashes, play_seconds, running_times[len(running_times) // 2], by_driver
+
+
+def check_against_legacy(count=500):
+    rng = random.Random(7)
+    start = time.time() - count * 1800
+    reports = [synthetic_report(rng, index, start) for index in range(count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CrashStore(Path(tmp) / "crash_history.db")
+        store.close()
+        conn = sqlite3.connect(store.path)
+        with conn:
+            for index, report in enumerate(reports):
+                store._insert(conn, report, f"synthetic_{index}.json")
+        conn.close()
+
+        paths = []
+        for index, report in enumerate(reports):
+            path = Path(tmp) / f"crash_report_{index:06d}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f)
+            paths.append(path)
+        crashes, play_seconds, median_seconds, by_driver = legacy_analytics(paths)
+
+        conn = store.connect()
+        result = crash_analytics(conn)
+        since = reports[count // 2]['game_exit']['exit_timestamp']
+        recent = crash_analytics(conn, since=since)
+        conn.close()
+
+    check("crash and clean exit counts match the JSON reports",
+          (result['crashes'], result['reports'] - result['clean_exits']) == (crashes, crashes),
+          f"{result['crashes']} vs {crashes}")
+    check("play time matches", result['play_hours'] == round(play_seconds / 3600, 2),
+          f"{result['play_hours']} h vs {play_seconds / 3600:.2f} h")
+    check("median time to crash matches",
+          result['time_to_crash']['p50_minutes'] == round(median_seconds / 60, 1),
+          f"{result['time_to_crash']['p50_minutes']} min vs {median_seconds / 60:.1f} min")
+    check("crashes by driver match", {(row['vendor'], row['driver']): row['crashes']
+                                      for row in result['by_driver']} == by_driver)
+    newer = [r for r in reports if r['game_exit']['exit_timestamp'] >= since]
+    check("since= only counts the newer reports",
+          (recent['reports'], recent['crashes']) == (len(newer), sum(r['game_exit']['exit_code'] != 0 for r in newer)),
+          f"{recent['reports']} of {count}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    json_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(42)
+    start = time.time() - count * 1800
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CrashStore(Path(tmp) / "crash_history.db")
+        store.close()
+
+        build_start = time.perf_counter()
+        conn = sqlite3.connect(store.path)
+        with conn:
+            for index in range(count):
+                store._insert(conn, synthetic_report(rng, index, start), f"synthetic_{index}.json")
+        conn.close()
+        build_s = time.perf_counter() - build_start
+        db_mb = Path(store.path).stat().st_size / 1024 ** 2
+
+        conn = store.connect()
+        analytics_start = time.perf_counter()
+        result = crash_analytics(conn)
+        analytics_ms = (time.perf_counter() - analytics_start) * 1000
+
+        since = time.time() - 30 * 86400
+        window_start = time.perf_counter()
+        crash_analytics(conn, since=since)
+        window_ms = (time.perf_counter() - window_start) * 1000
+        conn.close()
+
+        json_dir = Path(tmp) / "json"
+        json_dir.mkdir()
+        paths = []
+        for index in range(json_count):
+            path = json_dir / f"crash_report_{index:06d}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(synthetic_report(rng, index, start), f, indent=2)
+            paths.append(path)
+        legacy_start = time.perf_counter()
+        legacy_analytics(paths)
+        legacy_ms = (time.perf_counter() - legacy_start) * 1000
+        legacy_per_report_ms = legacy_ms / json_count
+
+    print("\n".join(format_analytics(result)[:4]))
+    print(f"\nStore: {count} reports, {db_mb:.1f} MB, built in {build_s:.1f}s")
+    print(f"crash_analytics, all time:    {analytics_ms:8.1f} ms")
+    print(f"crash_analytics, last 30 days:{window_ms:8.1f} ms")
+    print(f"JSON files: {json_count} parsed in {legacy_ms:.0f} ms "
+          f"-> ~{legacy_per_report_ms * count / 1000:.1f} s for {count} reports")
+    print()
+    check_against_legacy()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmark: crash evidence collected one after another vs in parallel
+Run: python benchmarks/bench_crash_capture.py [event_log_latency_seconds]
+
+Every event log query and the GPU adapter query get the given latency (a
+warm Get-WinEvent through PowerShell is about that slow), the WER stores are
+temporary folders with a few thousand old reports, indexed by a DumpIndex.
+Besides the timings it checks that a hung collector is cut off at the deadline, that partial
+reports reach the store while capture runs, and that the dispatch thread
+keeps applying snapshots during a capture; exits 1 if any check fails.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crash_capture import CrashCapture
+from monitor_engine import MonitorEngine
+from probe_scheduler import IDLE, GAME
+from sample_ring import PreCrashRecorder
+from fake_backends import FakeProcessTable, fake_backends, write_wer_report
+from checks import check, finish
+
+
+def make_engine(tmp, latency, old_reports=2000):
+    """An engine with a warm event log reader and WER stores holding old and fresh reports"""
+    archive = Path(tmp) / 'ReportArchive'
+    queue_dir = Path(tmp) / 'ReportQueue'
+    archive.mkdir()
+    queue_dir.mkdir()
+    week_ago = time.time() - 7 * 86400
+    for index in range(old_reports):
+        folder = Path(archive) / f"AppCrash_old_{index:05d}"
+        folder.mkdir()
+        os.utime(folder, (week_ago, week_ago))
+    write_wer_report(queue_dir, 'bf6.exe')
+    write_wer_report(archive, 'chrome.exe')
+
+    table = FakeProcessTable(200, planted=['bf6.exe', 'EAAntiCheat.GameService.exe'])
+    backends = fake_backends(table, tmp, probe_latency={'gpu': latency}, event_log_latency=latency,
+                             dump_roots=[archive, queue_dir])
+    engine = MonitorEngine(backends=backends, log_dir=tmp)
+    # The background poller has read the logs before any crash
+    engine.backends.event_log.poll()
+    recorder = PreCrashRecorder(engine.sample_ring, engine.process_scanner, process_factory=table.process)
+    engine.process_scanner.scan()
+    for _ in range(20):
+        recorder.sample()
+    return engine, table
+
+
+def timed_report(engine, snapshot):
+    start = time.perf_counter()
+    source, report = engine.save_crash_report(snapshot)
+    return (time.perf_counter() - start) * 1000, report
+
+
+def bench_capture(latency):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _ = make_engine(tmp, latency)
+        try:
+            snapshot = engine.get_system_snapshot()
+            parallel_ms, report = timed_report(engine, snapshot)
+
+            # The same collectors with a single worker run one after another
+            parallel = engine.crash_capture
+            with ThreadPoolExecutor(max_workers=1) as single:
+                engine.crash_capture = CrashCapture(single, parallel.deadline)
+                sequential_ms, _ = timed_report(engine, snapshot)
+            engine.crash_capture = parallel
+        finally:
+            engine.close()
+
+    print("=" * 60)
+    print(f"Crash capture with {latency * 1000:.0f} ms per event log / GPU query")
+    print("=" * 60)
+    print(f"one after another:   {sequential_ms:>10.1f} ms")
+    print(f"in parallel:         {parallel_ms:>10.1f} ms")
+    for name, outcome in report['capture'].items():
+        print(f"  {name:<24} {outcome['status']:<8} {outcome['ms']:>8.1f} ms")
+    print()
+
+    print("Report contents")
+    check("parallel is faster than sequential", parallel_ms < sequential_ms * 0.6,
+          f"{sequential_ms / parallel_ms:.1f}x")
+    check("every collector succeeded", report['capture_complete'])
+    channels = {event['Channel'] for event in report['windows_event_logs']}
+    check("events from both channels", channels == {'Application', 'System'}, ', '.join(sorted(channels)))
+    check("event-log rules ran on the merged events", len(report['quick_analysis']['findings']) > 0)
+    dumps = report['crash_dumps']
+    kinds = sorted(dump['kind'] for dump in dumps)
+    check("only the game's fresh WER report and dump are attached", kinds == ['minidump', 'wer_report']
+          and all(dump['process'] == 'bf6.exe' for dump in dumps), ', '.join(kinds))
+    wer = [dump['wer'] for dump in dumps if 'wer' in dump]
+    if wer:
+        check("Report.wer fields parsed", wer[0]['signature'].get('Exception Code') == 'c0000005'
+              and wer[0]['event_type'] == 'APPCRASH')
+    check("GPU state captured", report['gpu_state'] and report['gpu_state']['adapter'] is not None)
+    check("pre-crash window captured", report['pre_crash_window'] and report['pre_crash_window']['samples'] == 20)
+
+
+def check_deadline():
+    print("Deadline and incremental saves")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _ = make_engine(tmp, 0.0, old_reports=0)
+        release = threading.Event()
+        try:
+            engine.crash_capture.deadline = 0.5
+            engine.capture_gpu_state = lambda: release.wait(10)
+            progress = []
+            engine.subscribe(lambda event, payload: progress.append(payload) if event == 'crash_progress' else None)
+
+            saved_early = []
+
+            def watch_store():
+                # The partial report is in the store while the GPU collector still hangs
+                deadline = time.monotonic() + 0.45
+                while time.monotonic() < deadline and not saved_early:
+                    engine.crash_store.sync(wait=True)
+                    conn = engine.crash_store.connect()
+                    try:
+                        row = conn.execute("SELECT id FROM crashes").fetchone()
+                    finally:
+                        conn.close()
+                    if row:
+                        report = engine.crash_store.load_report(row['id'])
+                        if report and report['windows_event_logs']:
+                            saved_early.append(report)
+                    time.sleep(0.02)
+
+            watcher = threading.Thread(target=watch_store)
+            watcher.start()
+            elapsed, report = timed_report(engine, engine.get_system_snapshot())
+            watcher.join()
+            release.set()
+
+            check("returns at the deadline", elapsed < 800, f"{elapsed:.0f} ms")
+            check("hung collector marked timeout", report['capture']['gpu_state']['status'] == 'timeout')
+            check("the rest of the evidence is kept", bool(report['windows_event_logs']) and not report['capture_complete'])
+            check("partial report stored before capture finished",
+                  bool(saved_early) and saved_early[0]['capture_complete'] is False)
+            check("progress for every collector", [p['done'] for p in progress] == list(range(6)),
+                  str([p['status'] for p in progress]))
+
+            engine.crash_store.sync(wait=True)
+            conn = engine.crash_store.connect()
+            rows = conn.execute("SELECT COUNT(*) FROM crashes").fetchone()[0]
+            final = engine.crash_store.load_report(conn.execute("SELECT id FROM crashes").fetchone()['id'])
+            conn.close()
+            check("one row per crash, holding the final report", rows == 1 and final['capture']['gpu_state']['status'] == 'timeout')
+        finally:
+            release.set()
+            engine.close()
+
+
+def check_dispatch():
+    print("Dispatch thread during a capture")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, table = make_engine(tmp, 1.0, old_reports=0)
+        engine.probe_intervals['snapshot'] = {IDLE: 0.2, GAME: 0.2}
+        started, crashed = threading.Event(), threading.Event()
+        snapshots = []
+
+        def on_event(event, payload):
+            if event == 'game_started':
+                started.set()
+            elif event == 'crash':
+                crashed.set()
+            elif event == 'snapshot' and engine.crash_count and not crashed.is_set():
+                snapshots.append(time.monotonic())
+
+        engine.subscribe(on_event)
+        engine.start()
+        try:
+            started.wait(10)
+            table.kill(table.pids_named('bf6.exe')[0])
+            ok = crashed.wait(20)
+            check("crash reported", ok)
+            check("snapshots applied while evidence was collected", len(snapshots) >= 2, f"{len(snapshots)} snapshots")
+        finally:
+            engine.close()
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    bench_capture(latency)
+    check_deadline()
+    check_dispatch()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
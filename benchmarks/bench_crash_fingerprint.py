@@ -0,0 +1,291 @@
+"""
+Benchmark: finding similar crashes with the LSH index vs comparing against every report
+Run: python benchmarks/bench_crash_fingerprint.py [reports]
+
+Builds a crash history out of a dozen recurring failure modes (two of them
+differing only in the faulting module), with pids, addresses, report ids,
+resource readings and unrelated event log noise varying from crash to crash.
+Times --similar lookups through the index against a scan of every stored
+signature and checks that groups follow the failure modes, that long event
+message templates are stored once and that reports read back unchanged;
+exits 1 if any check fails.
+"""
+
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import crash_monitor
+from crash_fingerprint import crash_features, crash_groups, minhash, similar_crashes, similarity, unpack_signature
+from crash_store import CrashStore, split_payloads
+from checks import check, finish
+
+APP_ERROR = ("Faulting application name: bf6.exe, version: 1.0.{build}.0, time stamp: 0x{stamp:08x}\r\n"
+             "Faulting module name: {module}, version: {module_version}, time stamp: 0x{stamp:08x}\r\n"
+             "Exception code: 0x{code}\r\nFault offset: 0x{offset:016x}\r\nFaulting process id: 0x{pid:x}\r\n"
+             "Faulting application start time: 0x{start:016x}\r\nFaulting application path: C:\\Games\\bf6.exe\r\n"
+             "Faulting module path: C:\\Windows\\System32\\{module}\r\nReport Id: {guid}")
+TDR = "Display driver {driver_name} stopped responding and has successfully recovered."
+LIVE_KERNEL = ("The system has encountered a hardware error (LiveKernelEvent 141) on adapter {guid}, "
+               "a full dump was written to C:\\Windows\\LiveKernelReports\\WATCHDOG-{stamp}.dmp")
+JAVELIN = ("The EA AntiCheat service terminated unexpectedly. It has done this {count} time(s). "
+           "The following corrective action will be taken in 60000 milliseconds: Restart the service.")
+NOISE = [
+    ("DistributedCOM", 10016, "The application-specific permission settings do not grant Local Activation "
+                              "permission for the COM Server application with CLSID {guid} to the user"),
+    ("Service Control Manager", 7031, "The Windows Update service terminated unexpectedly. It has done this "
+                                      "{count} time(s). The following corrective action will be taken"),
+    ("ESENT", 455, "svchost ({pid},R,98) TILEREPOSITORYS-1-5-18: Error -1023 (0x{offset:x}) occurred while "
+                   "opening logfile C:\\WINDOWS\\system32\\config\\systemprofile\\AppData\\Local\\edb.log"),
+    ("Kernel-EventTracing", 2, "Session \"Diagtrack-Listener\" failed to start with the following error: "
+                               "0x{offset:x}, buffer {count} of the trace session was lost"),
+    ("Perflib", 1008, "The Open Procedure for service \"BITS\" in DLL \"C:\\Windows\\System32\\bitsperf.dll\" "
+                      "failed with error code {count}. Performance data for this service will not be available"),
+    ("Defrag", 257, "The volume Data (D:) was not optimized because an error was encountered: the operation "
+                    "requested is not supported by the hardware backing the volume (0x{offset:x})"),
+]
+
+# name, vendor, driver, events [(source, id, template)], findings, exit code, WER fault module, profile
+MODES = [
+    ('amd_tdr', 'AMD', '32.0.11021.1011', [('Display', 4101, TDR)], ['gpu_tdr', 'amd_driver', 'hags_enabled'],
+     0xC0000005, 'amdxx64.dll', {'hags': True, 'ram': (60, 80), 'vram': (80, 99)}),
+    ('amd_tdr_old', 'AMD', '31.0.24027.1012', [('Display', 4101, TDR)], ['gpu_tdr', 'amd_driver'],
+     0xC0000005, 'atidxx64.dll', {'hags': False, 'ram': (50, 70), 'vram': (60, 90)}),
+    ('amd_dx12', 'AMD', '32.0.11021.1011', [('Application Error', 1000, APP_ERROR)], ['amd_hags', 'hags_enabled'],
+     0xC0000005, 'amdxc64.dll', {'hags': True, 'ram': (60, 80), 'vram': (70, 95)}),
+    ('amd_dx12_d3d', 'AMD', '32.0.11021.1011', [('Application Error', 1000, APP_ERROR)], ['amd_hags', 'hags_enabled'],
+     0xC0000005, 'D3D12Core.dll', {'hags': True, 'ram': (60, 80), 'vram': (70, 95)}),
+    ('nv_tdr', 'NVIDIA', '32.0.15.6590', [('Display', 4101, TDR), ('LiveKernelEvent', 141, LIVE_KERNEL)],
+     ['gpu_tdr', 'nvidia_driver'], 0xC0000005, 'nvwgf2umx.dll', {'hags': False, 'ram': (40, 60), 'vram': (85, 99)}),
+    ('nv_oom', 'NVIDIA', '32.0.15.7216', [('Application Error', 1000, APP_ERROR)], ['high_ram'],
+     0xC0000017, 'bf6.exe', {'hags': False, 'ram': (92, 99), 'vram': (50, 70), 'growing': True}),
+    ('nv_shader', 'NVIDIA', '32.0.15.6094', [('Application Error', 1000, APP_ERROR)], ['nvidia_driver'],
+     0xC0000409, 'nvgpucomp64.dll', {'hags': True, 'ram': (50, 70), 'vram': (60, 80)}),
+    ('javelin', 'NVIDIA', '32.0.15.7216', [('Service Control Manager', 7034, JAVELIN)],
+     ['javelin_error', 'javelin_missing'], 1, None, {'hags': False, 'ram': (40, 60), 'vram': (40, 60), 'no_anticheat': True}),
+    ('javelin_amd', 'AMD', '32.0.12011.1036', [('Service Control Manager', 7034, JAVELIN)], ['javelin_error'],
+     1, None, {'hags': False, 'ram': (40, 60), 'vram': (40, 60)}),
+    ('stack_overrun', 'AMD', '32.0.12011.1036', [('Application Error', 1000, APP_ERROR)], [],
+     0xC0000409, 'bf6.exe', {'hags': False, 'ram': (60, 80), 'vram': (60, 80)}),
+    ('heap', 'NVIDIA', '32.0.15.6590', [('Application Error', 1000, APP_ERROR)], [],
+     0xC0000374, 'ntdll.dll', {'hags': True, 'ram': (60, 80), 'vram': (60, 80)}),
+    # DXGI_ERROR_DEVICE_HUNG: the game quits on its own, no WER report
+    ('hot_gpu', 'NVIDIA', '32.0.15.6590', [('Display', 4101, TDR)], ['gpu_tdr', 'nvidia_driver', 'gpu_hot'],
+     0x887A0006, None, {'hags': False, 'ram': (40, 60), 'vram': (60, 80), 'temp': (90, 99)}),
+]
+
+
+def fill(rng, template):
+    return template.format(build=rng.randint(10, 14), stamp=rng.getrandbits(32), module='{module}',
+                           module_version=f"10.0.{rng.randint(19041, 22631)}.{rng.randint(1, 5000)}",
+                           code='{code}', offset=rng.getrandbits(40), pid=rng.randint(1000, 60000),
+                           start=rng.getrandbits(60), guid=str(uuid.UUID(int=rng.getrandbits(128))),
+                           driver_name='{driver_name}', count=rng.randint(1, 9))
+
+
+def synthetic_report(rng, index, start, mode):
+    name, vendor, driver, events, rules, exit_code, module, profile = mode
+    exit_time = start + index * 600 + rng.random() * 300
+    running_time = rng.expovariate(1 / 2400)
+    total_vram = 16384
+    logs = []
+    for source, event_id, template in events:
+        for _ in range(rng.randint(1, 3)):
+            message = fill(rng, template).format(module=module or 'bf6.exe', code=f"{exit_code:08x}",
+                                                 driver_name='amduw23g' if vendor == 'AMD' else 'nvlddmkm')
+            logs.append({'Channel': 'System' if source != 'Application Error' else 'Application',
+                         'Source': source, 'EventID': event_id, 'Level': 'Error', 'Message': message,
+                         'timestamp': exit_time - rng.random() * 5})
+    for source, event_id, template in rng.sample(NOISE, rng.randint(0, 4)):
+        logs.append({'Channel': 'System', 'Source': source, 'EventID': event_id, 'Level': 'Warning',
+                     'Message': fill(rng, template), 'timestamp': exit_time - rng.random() * 600})
+    logs.sort(key=lambda event: event['timestamp'])
+
+    dumps = []
+    if module:
+        dumps.append({'kind': 'wer_report', 'process': 'bf6.exe', 'wer': {'event_type': 'APPCRASH', 'signature': {
+            'Application Name': 'bf6.exe', 'Fault Module Name': module, 'Exception Code': f"{exit_code:08x}"}}})
+    return {
+        'crash_number': 1,
+        'target': 'bf6',
+        'crash_time': time.strftime("%Y%m%d_%H%M%S", time.localtime(exit_time)),
+        'game_exit': {'pid': 1000 + index, 'exit_code': exit_code, 'exit_timestamp': exit_time,
+                      'running_time': running_time},
+        'pre_crash_snapshot': {
+            'memory': {'percent': rng.uniform(*profile['ram'])},
+            'gpu_info': {'Name': f"{vendor} GPU", 'DriverVersion': driver, 'Vendor': vendor},
+            'gpu_telemetry': {'memory_used_mb': total_vram * rng.uniform(*profile['vram']) / 100,
+                              'memory_total_mb': total_vram,
+                              'temperature_c': rng.uniform(*profile.get('temp', (55, 80)))},
+            'hags_enabled': profile['hags'],
+            'anticheat_process': None if profile.get('no_anticheat') else {'name': 'JavelinAC.exe'},
+            'memory_trend': {'game_rss': {'slope_mb_per_min': rng.uniform(40, 90) if profile.get('growing')
+                                          else rng.uniform(-5, 5)}},
+            'bf6_process': {'running_time': running_time}
+        },
+        'windows_event_logs': logs,
+        'crash_dumps': dumps,
+        'quick_analysis': {'issues': [], 'recommendations': [], 'findings': [
+            {'rule': rule, 'issue': rule, 'recommendation': None, 'count': 1} for rule in rules]},
+        'mode': name
+    }
+
+
+def build_store(tmp, count, rng):
+    start = time.time() - count * 600
+    store = CrashStore(Path(tmp) / "crash_history.db")
+    reports = {}
+    build_start = time.perf_counter()
+    for index in range(count):
+        # A few failure modes make up most crashes
+        mode = MODES[min(int(rng.paretovariate(1.2)) - 1, len(MODES) - 1)] if rng.random() < 0.7 else rng.choice(MODES)
+        report = synthetic_report(rng, index, start, mode)
+        source = f"synthetic_{index}.json"
+        reports[source] = report
+        store.save(report, source)
+    store.sync(wait=True, timeout=3600)
+    build_s = time.perf_counter() - build_start
+    return store, reports, build_s
+
+
+def linear_similar(conn, crash_id, limit=10, threshold=0.3):
+    """--similar without the index: compare against every stored signature"""
+    signature = None
+    rows = conn.execute("SELECT crash_id, signature FROM crash_fingerprints").fetchall()
+    for other_id, blob in rows:
+        if other_id == crash_id:
+            signature = unpack_signature(blob)
+    scored = [(similarity(signature, unpack_signature(blob)), other_id) for other_id, blob in rows
+              if other_id != crash_id]
+    return sorted((item for item in scored if item[0] >= threshold), reverse=True)[:limit]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def event_log_bytes(reports):
+    """Compressed event log entries stored whole in every report vs with shared message templates"""
+    whole, split, templates = 0, 0, {}
+    for report in reports:
+        whole += len(zlib.compress(json.dumps(report['windows_event_logs']).encode('utf-8')))
+        stored, payloads = split_payloads(report)
+        split += len(zlib.compress(json.dumps(stored['windows_event_logs']).encode('utf-8')))
+        templates.update(payloads)
+    return whole, split + sum(len(zlib.compress(text.encode('utf-8'))) for text in templates.values())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store, reports, build_s = build_store(tmp, count, rng)
+        try:
+            sample = list(reports.values())[:500]
+            sign_ms = timed(lambda: [minhash(crash_features(report)) for report in sample], 3) / len(sample)
+
+            conn = store.connect()
+            ids = {row['source']: row['id'] for row in conn.execute("SELECT id, source FROM crashes")}
+            modes = {ids[source]: report['mode'] for source, report in reports.items()}
+            clusters = dict(conn.execute("SELECT crash_id, cluster_id FROM crash_fingerprints"))
+
+            probes = rng.sample(sorted(ids.values()), 50)
+            index_ms = timed(lambda: [similar_crashes(conn, crash_id) for crash_id in probes], 3) / len(probes)
+            linear_ms = timed(lambda: [linear_similar(conn, crash_id) for crash_id in probes[:5]], 1) / 5
+            groups_ms = timed(lambda: crash_groups(conn), 5)
+            groups = crash_groups(conn, limit=1000)
+            whole_events, shared_events = event_log_bytes(reports.values())
+
+            print("=" * 60)
+            print(f"Crash history: {count} reports, {len(MODES)} failure modes, stored in {build_s:.1f} s")
+            print("=" * 60)
+            print(f"fingerprint one report:         {sign_ms:>10.2f} ms")
+            print(f"--similar, LSH index:           {index_ms:>10.2f} ms")
+            print(f"--similar, every signature:     {linear_ms:>10.2f} ms")
+            print(f"--crash-groups:                 {groups_ms:>10.2f} ms ({len(groups)} groups)")
+            print(f"event logs stored whole:        {whole_events / 1024 ** 2:>10.2f} MB")
+            print(f"event logs, shared templates:   {shared_events / 1024 ** 2:>10.2f} MB")
+            for row in groups[:8]:
+                print(f"  #{row['group']:<6} {row['crashes']:>5}  {row['label']}")
+            print()
+
+            print("Grouping")
+            members = {}
+            for crash_id, cluster_id in clusters.items():
+                members.setdefault(cluster_id, []).append(modes[crash_id])
+            mixed = sum(len(names) - max(names.count(name) for name in set(names)) for names in members.values())
+            check("groups don't mix failure modes", mixed / count < 0.01, f"{mixed} of {count} crashes misplaced")
+            by_mode = {}
+            for crash_id, name in modes.items():
+                by_mode.setdefault(name, {}).setdefault(clusters[crash_id], 0)
+                by_mode[name][clusters[crash_id]] += 1
+            split = {name: max(counts.values()) / sum(counts.values()) for name, counts in by_mode.items()}
+            worst = min(split, key=split.get)
+            check("each failure mode lands mostly in one group", split[worst] > 0.9,
+                  f"worst {worst}: {split[worst]:.0%} in its biggest group")
+
+            print("Similar crashes")
+            same, found, index_best, scan_best = 0, 0, [], []
+            for crash_id in probes:
+                matches = similar_crashes(conn, crash_id)
+                found += len(matches)
+                same += sum(1 for match in matches if modes[match['crash_id']] == modes[crash_id])
+                if crash_id in probes[:5]:
+                    index_best += [match['similarity'] for match in matches]
+                    scan_best += [score for score, _ in linear_similar(conn, crash_id)]
+            check("matches share the failure mode", found and same / found > 0.98, f"{same} of {found}")
+            # Big groups hold hundreds of near-identical crashes: which ten come
+            # back differs, how close they are shouldn't
+            check("matches are as close as a full scan's",
+                  statistics.mean(index_best) >= statistics.mean(scan_best) - 0.02, f"mean {statistics.mean(index_best):.3f} vs {statistics.mean(scan_best):.3f}")
+            check("the index beats a full scan", index_ms * 5 < linear_ms, f"{linear_ms / index_ms:.0f}x")
+
+            print("Stored once")
+            templates = conn.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+            check("event messages share their templates", shared_events < whole_events * 0.8,
+                  f"{templates} templates, {shared_events / whole_events:.0%} of storing them whole")
+            source = rng.choice(sorted(reports))
+            check("reports read back unchanged", store.load_report(ids[source]) == reports[source])
+            conn.close()
+
+            # An older store: same reports, no fingerprints until first use
+            conn = store.connect()
+            with conn:
+                conn.execute("DELETE FROM crash_fingerprints")
+                conn.execute("DELETE FROM crash_lsh")
+            conn.close()
+            start = time.perf_counter()
+            backfilled = store.fingerprint_missing()
+            backfill_s = time.perf_counter() - start
+            conn = store.connect()
+            regrouped = conn.execute("SELECT COUNT(DISTINCT cluster_id) FROM crash_fingerprints").fetchone()[0]
+            conn.close()
+            check("crashes from older versions are fingerprinted on first use",
+                  backfilled == count and abs(regrouped - len(groups)) <= len(groups) // 4 + 1,
+                  f"{backfill_s:.1f} s, {regrouped} groups")
+        finally:
+            store.close()
+
+        print("CLI")
+        for argv in (['--crash-groups', '--limit', '3'], ['--similar', str(probes[0]), '--limit', '3']):
+            crash_monitor.main(argv + ['--log-dir', tmp])
+
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark: the old substring-chain analyze_crash vs the compiled CrashRuleEngine
+Run: python benchmarks/bench_crash_rules.py [events]
+
+Every synthetic message is unique so the engine's per-message memo doesn't
+flatter it; a second pass adds filler rules to show how each scales. Also
+checks that keywords overlapping or contained in others still count; exits 1
+if they don't.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crash_rules import CrashRuleEngine, EventRule, EVENT_RULES
+from checks import check, finish
+
+PRE_CRASH = {
+    'gpu_info': {'Vendor': 'AMD'},
+    'hags_enabled': True,
+    'anticheat_process': {'name': 'JavelinAC.exe'},
+    'memory': {'percent': 70.0}
+}
+
+TEMPLATES = [
+    "Faulting application name: bf6.exe, version: 1.0.{n}, faulting module: ntdll.dll",
+    "Display driver amduw23g stopped responding and has successfully recovered ({n})",
+    "Activation context generation failed for \"C:\\Program Files\\App{n}\\app.exe\"",
+    "The EAAntiCheat.GameService service terminated unexpectedly ({n} times)",
+    "The description for Event ID {n} from source Application Hang cannot be found",
+    "Windows Error Reporting fault bucket {n}, type 0, event name: APPCRASH",
+]
+
+
+def legacy_analyze(pre_crash, event_logs, extra_rules=()):
+    """analyze_crash as it was before the rule table, plus optional filler checks"""
+    issues = []
+    recommendations = []
+
+    gpu_info = pre_crash.get('gpu_info') or {}
+    gpu_vendor = gpu_info.get('Vendor', 'Unknown')
+
+    if pre_crash.get('hags_enabled'):
+        issues.append("⚠️ HAGS is ENABLED - disable it!")
+        if gpu_vendor == 'AMD':
+            recommendations.append("AMD + HAGS = frequent crashes")
+
+    if not pre_crash.get('anticheat_process'):
+        issues.append("⚠️ EA Javelin was NOT running")
+        recommendations.append("Game needs EA Javelin to run")
+
+    if pre_crash['memory']['percent'] > 90:
+        issues.append(f"⚠️ High RAM usage: {pre_crash['memory']['percent']:.0f}%")
+        recommendations.append("Close background apps or add more RAM")
+
+    for event in event_logs:
+        msg = (event.get('Message') or '').lower()
+
+        if 'tdr' in msg or 'timeout' in msg:
+            issues.append("⚠️ GPU Timeout (TDR) detected")
+            recommendations.append("Increase TDR timeout in registry")
+
+        if gpu_vendor == 'AMD':
+            if 'amduw' in msg or 'atikmdag' in msg or 'amdvlk' in msg:
+                issues.append("⚠️ AMD driver crash detected")
+                recommendations.append("Clean reinstall AMD drivers with DDU")
+        elif gpu_vendor == 'NVIDIA':
+            if 'nvlddmkm' in msg or 'nvidia' in msg:
+                issues.append("⚠️ NVIDIA driver crash detected")
+                recommendations.append("Update/rollback NVIDIA drivers")
+
+        if 'eaanticheat' in msg or 'javelin' in msg:
+            issues.append("⚠️ EA Javelin error detected")
+            recommendations.append("Reinstall EA Javelin anticheat")
+
+        for rule in extra_rules:
+            if any(keyword in msg for keyword in rule.keywords):
+                issues.append(rule.issue)
+                recommendations.append(rule.recommendation)
+
+    return {'issues': issues, 'recommendations': recommendations}
+
+
+def synthetic_events(count, seed=7):
+    rng = random.Random(seed)
+    return [{'Message': rng.choice(TEMPLATES).format(n=i)} for i in range(count)]
+
+
+def filler_rules(count, seed=11):
+    """Rules whose keywords never appear, so only scan cost is measured"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        keywords = tuple(''.join(rng.choice('bcfgjkpqvwxz') for _ in range(8)) for _ in range(3))
+        rules.append(EventRule(f'filler_{i}', keywords, f"Filler issue {i}", f"Filler fix {i}", None))
+    return rules
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def check_overlaps():
+    """Every rule whose keyword appears counts, however the keywords overlap"""
+    rules = tuple(EventRule(keyword, (keyword,), keyword, None, None)
+                  for keyword in ('nvidia', 'nvidia driver', 'driver stop', 'timeout', 'outage'))
+    engine = CrashRuleEngine(rules, snapshot_rules=())
+    print("\nOverlapping keywords")
+    counts = engine.match_events([{'Message': "NVIDIA driver stopped responding"}])
+    check("a keyword that is a prefix of another still counts",
+          {'nvidia', 'nvidia driver', 'driver stop'} <= set(counts), ', '.join(sorted(counts)))
+    counts = engine.match_events([{'Message': "Watchdog timeoutage"}])
+    check("a keyword overlapping the end of another still counts",
+          {'timeout', 'outage'} <= set(counts), ', '.join(sorted(counts)))
+
+
+def check_no_keywords():
+    """A table without keywords matches nothing instead of everything"""
+    print("\nNo keywords")
+    events = [{'Message': "Display driver nvlddmkm stopped responding"}]
+    for label, rules in (("no event rules", ()),
+                         ("only empty keywords", (EventRule('blank', ('',), 'blank', None, None),))):
+        try:
+            counts = CrashRuleEngine(rules, snapshot_rules=()).match_events(events)
+        except KeyError as e:
+            counts = f"KeyError {e}"
+        check(f"{label} match no events", counts == {}, str(counts))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    events = synthetic_events(count)
+
+    print(f"{count} unique events")
+    print(f"{'rules':>6}{'legacy ms':>12}{'engine ms':>12}{'legacy lines':>14}{'engine lines':>14}")
+    for extra in (0, 20, 100, 400):
+        fillers = filler_rules(extra)
+        engine = CrashRuleEngine(EVENT_RULES + tuple(fillers))
+        legacy_ms, legacy = timed(legacy_analyze, PRE_CRASH, events, fillers)
+        engine_ms, result = timed(engine.analyze, PRE_CRASH, events)
+        legacy_lines = len(legacy['issues']) + len(legacy['recommendations'])
+        engine_lines = len(result['issues']) + len(result['recommendations'])
+        print(f"{len(EVENT_RULES) + extra:>6}{legacy_ms:>12.1f}{engine_ms:>12.1f}"
+              f"{legacy_lines:>14}{engine_lines:>14}")
+
+    engine = CrashRuleEngine()
+    print("\nEngine findings:")
+    for finding in engine.analyze(PRE_CRASH, events)['findings']:
+        print(f"  {finding['rule']:<16}{finding['count']:>7}")
+
+    check_overlaps()
+    check_no_keywords()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
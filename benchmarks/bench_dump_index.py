@@ -0,0 +1,213 @@
+"""
+Benchmark: rescanning crash dump folders with a stat index vs walking them
+Run: python benchmarks/bench_dump_index.py [wer_folders]
+
+Builds temporary WER stores, a CrashDumps folder and a nested game dump
+folder, then compares a full os.walk + stat with DumpIndex rescans (no
+change, one new crash, after a restart). Also checks deletions, dumps still
+being written, matching dumps to a crash's exit time and --attach-dumps;
+exits 1 if any check fails.
+"""
+
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import crash_monitor
+from crash_store import CrashStore
+from dump_index import DumpIndex
+from fake_backends import write_minidump, write_wer_report
+from checks import check, finish
+
+WEEK_AGO = time.time() - 7 * 86400
+
+
+def build_tree(root, wer_folders):
+    """Old, settled crash evidence spread over the usual places"""
+    archive, queue_dir = root / 'ReportArchive', root / 'ReportQueue'
+    crash_dumps, game_dumps = root / 'CrashDumps', root / 'GameDumps'
+    apps = ['chrome.exe', 'Discord.exe', 'bf6.exe', 'explorer.exe']
+    for index in range(wer_folders):
+        write_wer_report(archive, apps[index % len(apps)], when=WEEK_AGO - index * 60)
+    queue_dir.mkdir()
+    for index in range(wer_folders // 10):
+        write_minidump(crash_dumps, apps[index % len(apps)], pid=1000 + index, when=WEEK_AGO - index * 60)
+    for session in range(20):
+        write_minidump(game_dumps / f"session_{session:02d}" / "dumps", 'bf6.exe', pid=5000 + session,
+                       when=WEEK_AGO - session * 3600)
+    # Deepest first, so setting a folder's mtime doesn't touch one already set
+    folders = [Path(folder) for top in (game_dumps, crash_dumps) for folder, _, _ in os.walk(top)]
+    for path in sorted(folders, key=lambda folder: -len(folder.parts)) + [archive, queue_dir]:
+        os.utime(path, (WEEK_AGO, WEEK_AGO))
+    return [archive, queue_dir, crash_dumps, game_dumps]
+
+
+def walk_all(roots):
+    """What a scan without an index does: every folder listed, every file stat'ed"""
+    found = 0
+    for root in roots:
+        for folder, _, files in os.walk(root):
+            for name in files:
+                os.stat(os.path.join(folder, name))
+                found += 1
+    return found
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_rescan(wer_folders):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        roots = build_tree(tmp, wer_folders)
+        state = str(tmp / 'dump_index.db')
+
+        walk_ms = timed(lambda: walk_all(roots))
+        index = DumpIndex(roots, state)
+        start = time.perf_counter()
+        index.scan()
+        cold_ms = (time.perf_counter() - start) * 1000
+        cold = index.stats()
+
+        listed = index.dirs_listed
+        warm_ms = timed(index.scan)
+        warm_listed = (index.dirs_listed - listed) / 5
+
+        # One new crash: a WER folder and a LocalDumps minidump
+        now = time.time()
+        write_wer_report(roots[1], 'bf6.exe', when=now)
+        write_minidump(roots[2], 'bf6.exe', pid=4242, when=now)
+        start = time.perf_counter()
+        added = index.scan()
+        change_ms = (time.perf_counter() - start) * 1000
+
+        restarted = DumpIndex(roots, state)
+        start = time.perf_counter()
+        restarted.scan()
+        restart_ms = (time.perf_counter() - start) * 1000
+        restart_stats = restarted.stats()
+
+        print("=" * 60)
+        print(f"Dump folders: {wer_folders} WER reports, {cold['files']} indexed files, {cold['dirs']} folders")
+        print("=" * 60)
+        print(f"os.walk + stat everything:  {walk_ms:>10.2f} ms")
+        print(f"index, first scan:          {cold_ms:>10.2f} ms")
+        print(f"index, nothing changed:     {warm_ms:>10.2f} ms ({warm_listed:.0f} folders listed)")
+        print(f"index, one new crash:       {change_ms:>10.2f} ms")
+        print(f"index, after a restart:     {restart_ms:>10.2f} ms "
+              f"({restart_stats['dirs_listed']} listed, {restart_stats['files_indexed']} files re-read)")
+        print()
+
+        print("Incremental scans")
+        # ReportArchive, GameDumps and its 20 session folders
+        check("nothing changed lists only folders holding folders", warm_listed == 22,
+              f"{warm_listed:.0f} of {cold['dirs']}")
+        # On Linux every folder entry still costs a stat; on Windows scandir returns it for free
+        check("an unchanged rescan beats walking everything", warm_ms < walk_ms / 2,
+              f"{walk_ms / max(warm_ms, 0.001):.0f}x")
+        check("the new crash's files are found", sorted(Path(path).suffix for path in added) == ['.dmp', '.hdmp', '.wer'],
+              ', '.join(Path(path).name for path in added))
+        check("a restart re-reads no files", restart_stats['files_indexed'] == 0)
+
+        # Deleting a report folder (WER cleans up) drops its files
+        folder = Path(next(path for path in added if path.endswith('Report.wer'))).parent
+        shutil.rmtree(folder)
+        before = len(index.files)
+        index.scan()
+        check("deleted report folders leave the index", len(index.files) == before - 2 and str(folder) not in index.dirs)
+
+        # A dump still being written is re-read once it grows
+        growing = write_minidump(roots[2], 'bf6.exe', pid=4343, size=4096)
+        index.scan()
+        with open(growing, 'ab') as f:
+            f.write(bytes(1 << 16))
+        index.scan()
+        check("a dump still being written is re-read", index.files[str(growing)]['size'] == 4096 + (1 << 16))
+
+
+def check_matching():
+    print("Matching dumps to a crash")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        crash = time.time() - 3600
+        dumps, game = tmp / 'CrashDumps', tmp / 'GameDumps'
+        write_minidump(dumps, 'bf6.exe', pid=777, when=crash + 20)
+        write_minidump(dumps, 'bf6.exe', pid=778, when=crash + 2)
+        write_minidump(dumps, 'chrome.exe', pid=779, when=crash + 1)
+        write_minidump(dumps, 'bf6.exe', pid=780, when=crash + 900)
+        wer = write_wer_report(tmp / 'ReportQueue', 'bf6.exe', when=crash + 5)
+        (game / 'session').mkdir(parents=True)
+        own = game / 'session' / 'crash.mdmp'
+        own.write_bytes(b'MDMP')
+        os.utime(own, (crash - 4, crash - 4))
+
+        index = DumpIndex([dumps, tmp / 'ReportQueue', game], str(tmp / 'dump_index.db'))
+        found = index.crash_dumps(crash, ['bf6.exe'], pid=777, dirs=[str(game)])
+        names = [Path(dump['path']).name for dump in found]
+        check("the crashed pid's dump comes first", names[:1] == ['bf6.exe.777.dmp'], ', '.join(names))
+        # Report.wer (by its fault time) and its dump (by mtime) are a tie
+        check("then the closest in time", names[1:3] == ['bf6.exe.778.dmp', 'crash.mdmp']
+              and set(names[3:]) == {'Report.wer', 'memory.hdmp'}, ', '.join(names[1:]))
+        check("other processes and old dumps are left out",
+              not {'chrome.exe.779.dmp', 'bf6.exe.780.dmp'} & set(names))
+        report = [dump for dump in found if dump['kind'] == 'wer_report']
+        check("WER report fields ride along", report and report[0]['wer']['signature']['Application Name'] == 'bf6.exe'
+              and report[0]['path'].startswith(str(wer)))
+
+
+def check_attach_cli():
+    print("--attach-dumps")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        game = tmp / 'GameDumps'
+        crash = time.time() - 600
+        write_minidump(game, 'bf6.exe', pid=31337, when=crash + 3)
+        config = tmp / 'targets.json'
+        config.write_text(json.dumps({'targets': [
+            {'name': 'bf6', 'kind': 'game', 'processes': ['bf6.exe'], 'dump_dirs': [str(game)]}]}))
+
+        store = CrashStore(tmp / 'crash_history.db')
+        for offset, pid in ((0, 31337), (-86400, 1)):
+            when = crash + offset
+            store.save({'crash_time': time.strftime("%Y%m%d_%H%M%S", time.localtime(when)), 'target': 'bf6',
+                        'game_exit': {'pid': pid, 'exit_timestamp': when, 'exit_code': 1}})
+        store.sync(wait=True)
+        store.close()
+
+        crash_monitor.main(['--attach-dumps', '--log-dir', str(tmp), '--targets', str(config)])
+        store = CrashStore(tmp / 'crash_history.db')
+        try:
+            conn = store.connect()
+            ids = [row[0] for row in conn.execute("SELECT id FROM crashes ORDER BY crash_time DESC")]
+            conn.close()
+            reports = [store.load_report(crash_id) for crash_id in ids]
+        finally:
+            store.close()
+        attached = reports[0].get('crash_dumps') or []
+        check("the crash near the dump gets it", [dump['pid'] for dump in attached] == [31337])
+        check("the crash a day earlier does not", 'crash_dumps' not in reports[1])
+
+
+def main():
+    wer_folders = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    bench_rescan(wer_folders)
+    check_matching()
+    check_attach_cli()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: the old '-Newest 30' crash-time query vs the incremental EventLogReader
+Run: python benchmarks/bench_event_log_reader.py [noise_events]
+
+Replays a TDR followed by a flood of unrelated Application errors through
+FakeEventLogShell, then checks what each approach sees at crash time. The
+recorded fixtures under benchmarks/fixtures are parsed first as a sanity check.
+Fails (exit code 1) if the reader misses the TDR or the game's error, lets
+the flood past the per-channel cap, writes state on the crash-time path,
+keeps stale events behind fresh ones from another channel, or loses its
+watermark or window across a restart.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from event_log_reader import REPORT_LIMIT, REPORT_PER_SOURCE, EventLogReader, parse_events
+from fake_backends import FakeEventLogShell
+from checks import check, finish
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+QUERY_LATENCY = 0.005
+
+
+def check_fixtures():
+    for path in sorted(FIXTURES.glob('event_log_*.json')):
+        with open(path, encoding='utf-8') as f:
+            events = parse_events(json.load(f), 'System')
+        assert events, path.name
+        assert all(event['timestamp'] for event in events), path.name
+        print(f"  {path.name}: {len(events)} events parsed")
+
+
+def legacy_check(shell):
+    """The old query: newest 30 Application errors, filtered to 10 minutes"""
+    rows = shell.query("Get-WinEvent -LogName 'Application' -MaxEvents 30")
+    cutoff = time.time() - 600
+    return [row for row in rows
+            if int(row['TimeCreated'][6:-2]) / 1000.0 > cutoff]
+
+
+def read_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def check_trim_order():
+    """A fresh batch from one channel must not shield stale events of another"""
+    shell = FakeEventLogShell()
+    for i in range(20):
+        shell.add('Application', 'SideBySide', 33, f"old ({i})", when=time.time() - 1800)
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = EventLogReader(shell, str(Path(tmp) / 'event_log_state.json'),
+                                channels=('System', 'Application'), window_seconds=600)
+        shell.add('System', 'Display', 4101, "Display driver stopped responding", level="Warning")
+        reader.poll()
+        kept = reader.recent(minutes=60)
+    check("stale events are trimmed behind a fresh batch from another channel",
+          [event['Source'] for event in kept] == ['Display'], f"{len(kept)} events kept")
+
+
+def main():
+    noise = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print("Fixtures:")
+    check_fixtures()
+
+    shell = FakeEventLogShell(latency=QUERY_LATENCY)
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = str(Path(tmp) / 'event_log_state.json')
+        reader = EventLogReader(shell, state_path)
+        reader.poll()
+
+        # Mid-session: a TDR, the game's crash entry, then noise floods Application
+        shell.add('System', 'Display', 4101, "Display driver nvlddmkm stopped responding", level="Warning")
+        shell.add('Application', 'Application Error', 1000, "Faulting application name: bf6.exe")
+        for i in range(noise):
+            shell.add('Application', 'SideBySide', 33, f"Activation context generation failed ({i})")
+        reader.poll()
+
+        start = time.perf_counter()
+        legacy = legacy_check(shell)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        shell.add('System', 'nvlddmkm', 153, "Error occurred on GPUID: 100")
+        saved_state = read_file(state_path)
+        queries_before = shell.queries
+        start = time.perf_counter()
+        incremental = reader.check_windows_event_logs()
+        reader_ms = (time.perf_counter() - start) * 1000
+        crash_queries = shell.queries - queries_before
+
+        shell.add('System', 'nvlddmkm', 153, "Error occurred on GPUID: 100")
+        channel_events = reader.check_channel('System')
+        watermark = reader.watermarks['System']['record_id']
+        crash_path_writes = read_file(state_path) != saved_state or os.path.exists(reader.window_path)
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            reader.recent(minutes=10)
+        lookup_us = (time.perf_counter() - start) / 1000 * 1e6
+
+        # A restarted monitor resumes from the watermark and window saved at shutdown
+        reader.stop()
+        resumed = EventLogReader(shell, state_path)
+        rows_before = shell.rows_returned
+        resumed.poll()
+        reread = shell.rows_returned - rows_before - len(resumed.channels)
+        restored = len(resumed.recent(minutes=10))
+
+    def sees(events, source):
+        return any(event.get('Source', event.get('ProviderName')) == source for event in events)
+
+    print(f"\n{noise} noise errors after a TDR (simulated query latency {QUERY_LATENCY * 1000:.0f} ms)")
+    print(f"{'':<22}{'ms at crash':>12}{'events':>8}{'sees TDR':>10}{'sees bf6':>10}")
+    print(f"{'Newest 30 (old)':<22}{legacy_ms:>12.2f}{len(legacy):>8}"
+          f"{str(sees(legacy, 'Display')):>10}{str(sees(legacy, 'Application Error')):>10}")
+    print(f"{'EventLogReader':<22}{reader_ms:>12.2f}{len(incremental):>8}"
+          f"{str(sees(incremental, 'Display')):>10}{str(sees(incremental, 'Application Error')):>10}")
+    print(f"\nCrash-time catch-up: {crash_queries} queries; memory lookup alone: {lookup_us:.1f} us")
+    print(f"After restart: {reread} events re-read, {restored} restored from the saved window")
+    print()
+
+    application = [event for event in incremental if event['Channel'] == 'Application']
+    noisy = [event for event in application if event['Source'] == 'SideBySide']
+    check("the reader sees the TDR and the game's error past the flood",
+          sees(incremental, 'Display') and sees(incremental, 'Application Error'))
+    check(f"at most {REPORT_LIMIT} events per channel, {REPORT_PER_SOURCE} of one provider and id",
+          len(application) <= REPORT_LIMIT and len(noisy) <= REPORT_PER_SOURCE,
+          f"{len(application)} Application events, {len(noisy)} SideBySide")
+    check("crash-time reads write no state", not crash_path_writes)
+    check("check_channel advances the watermark to the newest record",
+          watermark == shell.next_record['System'] - 1 and sees(channel_events, 'nvlddmkm'), f"record {watermark}")
+    check("a restart re-reads nothing and restores the window", reread == 0 and restored > 0)
+    check_trim_order()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
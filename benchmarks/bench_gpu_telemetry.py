@@ -0,0 +1,157 @@
+"""
+Benchmark: a GPU query process per snapshot vs one streaming query process
+Run: python benchmarks/bench_gpu_telemetry.py [snapshots]
+
+Runs GpuTelemetry against fake_gpu_stream.py, so it works on Linux. Besides
+the timings it checks parsing, multi-GPU selection, restarts after the
+child exits, staleness when it hangs, and that readings reach snapshots,
+the pre-crash window and the crash rules; exits 1 if any check fails.
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gpu_telemetry import GpuTelemetry, parse_nvidia_smi_line
+from monitor_engine import MonitorEngine
+from sample_ring import PreCrashRecorder
+from fake_backends import GPU_STREAM, FakeProcessTable, fake_backends, fake_gpu_telemetry
+from checks import check, finish
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def spawn_per_snapshot():
+    """Like the old wmic call: start a process, read its answer, let it exit"""
+    result = subprocess.run([sys.executable, str(GPU_STREAM), '--exit-after', '1'],
+                            capture_output=True, text=True, timeout=15)
+    return parse_nvidia_smi_line(result.stdout.splitlines()[0])
+
+
+def bench_latency(snapshots):
+    start = time.perf_counter()
+    for _ in range(snapshots):
+        spawn_per_snapshot()
+    spawn_ms = (time.perf_counter() - start) / snapshots * 1000
+
+    telemetry = fake_gpu_telemetry()
+    telemetry.start()
+    wait_for(lambda: telemetry.latest() is not None)
+    timings = []
+    for _ in range(snapshots * 100):
+        start = time.perf_counter()
+        telemetry.latest()
+        timings.append((time.perf_counter() - start) * 1e6)
+    telemetry.close()
+
+    print("=" * 60)
+    print(f"GPU reading per snapshot over {snapshots} snapshots")
+    print("=" * 60)
+    print(f"process per snapshot:   {spawn_ms:>10.2f} ms")
+    print(f"streaming latest():     {statistics.median(timings):>10.2f} us (p50)")
+    print()
+
+
+def check_parsing():
+    print("Parsing")
+    telemetry = fake_gpu_telemetry(extra_args=('--noise', '--gpus', '2'))
+    telemetry.start()
+    ok = wait_for(lambda: telemetry.lines >= 12)
+    reading = telemetry.latest()
+    telemetry.close()
+    check("first readings arrive", ok and reading is not None)
+    if reading:
+        check("name and driver", reading['name'] == "NVIDIA GeForce RTX 4080" and reading['driver_version'] == "560.94")
+        check("numeric fields", reading['temperature_c'] is not None and reading['memory_total_mb'] == 16376,
+              f"{reading['temperature_c']} C, {reading['memory_total_mb']} MB")
+        check("the larger of two GPUs is reported", reading['index'] == 0 and reading['gpu_count'] == 2)
+    check("banner lines are skipped, not parsed", telemetry.bad_lines >= 1, f"{telemetry.bad_lines} skipped")
+
+    lines = [telemetry.parse_line(f"0, X, 1, 5, 10, 20, 30, 40, 50, {value}") for value in ("[N/A]", "[Not Supported]")]
+    check("[N/A] sensors become None", all(line and line['power_w'] is None for line in lines))
+
+    telemetry = fake_gpu_telemetry('json')
+    telemetry.start()
+    wait_for(lambda: telemetry.latest() is not None)
+    reading = telemetry.latest()
+    telemetry.close()
+    check("WDDM counter lines", reading is not None and reading['utilization_percent'] is not None
+          and reading['temperature_c'] is None)
+
+
+def check_failures():
+    print("Restarts and staleness")
+    telemetry = fake_gpu_telemetry(extra_args=('--exit-after', '5'), max_backoff=0.2)
+    telemetry.start()
+    ok = wait_for(lambda: telemetry.restarts >= 2 and telemetry.latest() is not None, timeout=10)
+    telemetry.close()
+    check("restarted after the child exited", ok, f"{telemetry.restarts} restarts, {telemetry.lines} lines")
+
+    telemetry = fake_gpu_telemetry(extra_args=('--hang-after', '3'), stale_after=0.5)
+    telemetry.start()
+    wait_for(lambda: telemetry.lines >= 3)
+    fresh = telemetry.latest() is not None
+    time.sleep(0.8)
+    stale = telemetry.latest()
+    telemetry.close()
+    check("a hung child's readings go stale", fresh and stale is None)
+
+    telemetry = GpuTelemetry(['no-such-gpu-tool-xyz'], parse_nvidia_smi_line, 'missing', max_backoff=0.1)
+    telemetry.start()
+    wait_for(lambda: telemetry.restarts >= 1)
+    telemetry.close()
+    check("a missing tool is reported, not raised", telemetry.latest() is None and bool(telemetry.last_error),
+          telemetry.last_error)
+
+
+def check_engine():
+    print("Engine")
+    with tempfile.TemporaryDirectory() as tmp:
+        table = FakeProcessTable(100, planted=['bf6.exe', 'EAAntiCheat.GameService.exe'])
+        engine = MonitorEngine(backends=fake_backends(table, tmp, gpu_telemetry=fake_gpu_telemetry()), log_dir=tmp)
+        try:
+            wait_for(lambda: engine.backends.gpu_telemetry.latest() is not None)
+            snapshot = engine.get_system_snapshot()
+            check("snapshot carries gpu_telemetry", bool(snapshot.get('gpu_telemetry')))
+
+            recorder = PreCrashRecorder(engine.sample_ring, engine.process_scanner, process_factory=table.process,
+                                        gpu_telemetry=engine.backends.gpu_telemetry)
+            engine.process_scanner.scan()
+            for _ in range(5):
+                recorder.sample()
+            _, report = engine.save_crash_report(snapshot)
+            window = report['pre_crash_window']
+            check("pre-crash window has GPU series",
+                  window and all(value is not None for value in window['gpu_temp_c']), str(window and window['gpu_temp_c']))
+
+            hot = dict(snapshot, gpu_telemetry=dict(snapshot['gpu_telemetry'], temperature_c=93.0,
+                                                   memory_used_mb=16000.0))
+            rules = {finding['rule'] for finding in engine.analyze_crash(hot, [])['findings']}
+            check("gpu_hot and vram_full rules fire", {'gpu_hot', 'vram_full'} <= rules, ', '.join(sorted(rules)))
+        finally:
+            engine.close()
+
+
+def main():
+    snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bench_latency(snapshots)
+    check_parsing()
+    check_failures()
+    check_engine()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
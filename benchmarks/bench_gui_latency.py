@@ -0,0 +1,179 @@
+"""
+Benchmark: Tk frame latency while the monitor engine runs slow probes
+Run: python benchmarks/bench_gui_latency.py [seconds]
+
+Runs the real GUI on a MonitorEngine over fake backends whose GPU, registry,
+file version and event log queries are slow, with the game launching and
+crashing halfway through. Fails (exit code 1) when any frame runs more than
+one frame late, when more than one frame in a thousand misses the 16 ms
+budget, or when p99 lateness is over budget. The engine side of that path
+is checked without Tk first: the GUI's engine subscriber feeds its queue
+from the engine threads and one drain keeps the newest snapshot and every
+other event in order. The timed run needs a display and exits with the skip
+status (77) without one.
+"""
+
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tkinter as tk
+
+from frame_latency import FRAME_BUDGET_MS
+from monitor_engine import MonitorEngine
+from monitor_gui import BF6CrashMonitorGUI, drain_events
+from probe_scheduler import IDLE, GAME
+from fake_backends import FakeProcessTable, fake_backends
+from checks import check, finish, skip
+
+# Roughly what wmic / CIM, the registry, file version reads and Get-WinEvent cost on a busy machine
+PROBE_LATENCY = {'gpu': 0.3, 'registry': 0.05, 'file_info': 0.2}
+EVENT_LOG_LATENCY = 0.2
+
+# A frame may slip by at most one more frame, and only rarely past the budget
+MAX_LATE_MS = 2 * FRAME_BUDGET_MS
+OVER_BUDGET_PER_MILLE = 1
+
+
+class HeadlessGUI:
+    """The parts of the GUI an engine subscriber touches, without Tk"""
+
+    def __init__(self):
+        self.ui_events = queue.Queue()
+        self.log_lines = []
+        self.log_view = self
+
+    def post(self, line, level):
+        self.log_lines.append(line)
+
+    on_engine_event = BF6CrashMonitorGUI.on_engine_event
+
+
+def check_engine_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = FakeProcessTable(200, planted=['EAAntiCheat.GameService.exe'])
+        engine = MonitorEngine(backends=fake_backends(table, tmp), log_dir=tmp)
+        engine.probe_intervals['snapshot'] = {IDLE: 0.05, GAME: 0.05}
+        gui = HeadlessGUI()
+        published = []
+        started, crashed = threading.Event(), threading.Event()
+
+        def on_event(event, payload):
+            if event == 'snapshot':
+                published.append(payload)
+            elif event == 'game_started':
+                started.set()
+            elif event == 'crash':
+                crashed.set()
+
+        engine.subscribe(gui.on_engine_event)
+        engine.subscribe(on_event)
+        try:
+            engine.start()
+            pid = table.spawn('bf6.exe')
+            started.wait(10)
+            time.sleep(0.3)
+            table.kill(pid)
+            crashed.wait(30)
+            engine.stop()
+        finally:
+            engine.close()
+
+        queued = gui.ui_events.qsize()
+        start = time.perf_counter()
+        latest, events = drain_events(gui.ui_events)
+        drain_ms = (time.perf_counter() - start) * 1000
+        print(f"Engine run without Tk: {len(published)} snapshots, {queued} queued events, "
+              f"drained in {drain_ms:.2f} ms")
+
+        names = [event for event, _ in events]
+        crash_at = names.index('crash') if 'crash' in names else None
+        check("one drain leaves the queue empty", gui.ui_events.empty())
+        check("the drain keeps only the newest snapshot",
+              bool(published) and latest is published[-1] and 'snapshot' not in names,
+              f"{len(published)} published")
+        check("the crash reaches the GUI queue after its progress updates",
+              crash_at is not None and 'crash_progress' in names[:crash_at],
+              ', '.join(dict.fromkeys(names)))
+        check("monitoring start and stop bracket the other events",
+              names[:1] == ['monitoring'] and names[-1:] == ['monitoring']
+              and [payload for event, payload in events if event == 'monitoring'] == [True, False])
+        check("log lines go to the log view, not the event queue",
+              bool(gui.log_lines) and 'log' not in names, f"{len(gui.log_lines)} lines")
+    print()
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+
+    check_engine_events()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        finish()
+        skip(f"no display available ({e})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        table = FakeProcessTable(500, planted=['EAAntiCheat.GameService.exe'])
+        engine = MonitorEngine(backends=fake_backends(table, tmp, probe_latency=PROBE_LATENCY,
+                                                      event_log_latency=EVENT_LOG_LATENCY),
+                               log_dir=tmp)
+        engine.probe_intervals['snapshot'] = {IDLE: 0.25, GAME: 0.25}
+        counts = {'snapshot': 0, 'crash': 0}
+
+        def on_event(event, payload):
+            if event in counts:
+                counts[event] += 1
+
+        engine.subscribe(on_event)
+
+        gui = BF6CrashMonitorGUI(root, engine)
+        gui.frame_latency.keep = 100000
+        game = []
+
+        def launch():
+            game.append(table.spawn('bf6.exe'))
+
+        def crash():
+            if game:
+                table.kill(game[0])
+
+        root.after(100, gui.start_monitoring)
+        root.after(int(seconds * 250), launch)
+        root.after(int(seconds * 600), crash)
+        root.after(int(seconds * 1000), root.quit)
+        root.mainloop()
+        gui.frame_latency.stop()
+        engine.close()
+        root.destroy()
+
+        stats = gui.frame_latency.stats()
+        print("=" * 60)
+        print(f"GUI frame latency over {seconds:.0f}s with the engine running")
+        print("=" * 60)
+        print(f"Snapshots applied:  {counts['snapshot']}")
+        print(f"Crashes reported:   {counts['crash']}")
+        print(f"Frames:             {stats['frames']}")
+        print(f"p99 lateness:       {stats['p99_ms']:.2f} ms")
+        print(f"Max lateness:       {stats['max_ms']:.2f} ms")
+        print(f"Over budget:        {stats['over_budget']}")
+        print()
+
+        check("the game crash was reported during the run", counts['crash'] == 1, f"{counts['crash']} crashes")
+        check(f"p99 frame lateness under {FRAME_BUDGET_MS:.0f} ms", stats['p99_ms'] <= FRAME_BUDGET_MS,
+              f"{stats['p99_ms']:.2f} ms")
+        check(f"no frame more than {MAX_LATE_MS:.0f} ms late", stats['max_ms'] <= MAX_LATE_MS,
+              f"max {stats['max_ms']:.2f} ms")
+        allowed = stats['frames'] * OVER_BUDGET_PER_MILLE // 1000
+        check(f"at most {OVER_BUDGET_PER_MILLE} in 1000 frames over budget", stats['over_budget'] <= allowed,
+              f"{stats['over_budget']} of {stats['frames']}, {allowed} allowed")
+    finish()
+
+
+if __name__ == "__main__":
+    main()
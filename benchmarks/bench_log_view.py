@@ -0,0 +1,113 @@
+"""
+Stress test: push 100k messages through the bounded Activity Log view
+Run: python benchmarks/bench_log_view.py [messages]
+
+The batching checks run without Tk; the stress run needs a display and
+exits with the skip status (77) when there is none. Exits 1 if any check
+fails.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tkinter as tk
+
+from log_view import BoundedLogView, coalesce
+from checks import check, finish, skip
+
+LEVELS = ['INFO', 'INFO', 'INFO', 'WARNING', 'CRITICAL', 'ERROR']
+
+
+def check_coalesce():
+    batch = [("a\n", 'INFO'), ("b\n", 'INFO'), ("c\n", 'ERROR'), ("d\n", 'INFO'), ("e\nf\n", 'INFO')]
+    args, added = coalesce(batch, 100)
+    check("consecutive messages of one level become one chunk, in order",
+          args == ["a\nb\n", 'INFO', "c\n", 'ERROR', "d\ne\nf\n", 'INFO'], repr(args))
+    check("added counts lines, not messages", added == 6, str(added))
+
+    batch = [(f"{i}\n", 'INFO') for i in range(10)]
+    args, added = coalesce(batch, 3)
+    check("a batch over the cap keeps only its newest lines", args == ["7\n8\n9\n", 'INFO'] and added == 3,
+          repr(args))
+    check("an empty batch inserts nothing", coalesce([], 10) == ([], 0))
+
+
+def main():
+    check_coalesce()
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    threads = 4
+    per_thread = total // (threads + 1)
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        finish()
+        skip(f"no display available ({e})")
+
+    view = BoundedLogView(root, max_lines=5000, wrap=tk.WORD, font=('Consolas', 9))
+    view.pack(fill='both', expand=True)
+
+    flush_times = []
+    original_flush = view.flush
+
+    def timed_flush():
+        start = time.perf_counter()
+        original_flush()
+        flush_times.append((time.perf_counter() - start) * 1000)
+
+    view.flush = timed_flush
+
+    def producer(name):
+        for i in range(per_thread):
+            view.post(f"[12:00:00] [{LEVELS[i % len(LEVELS)]}] {name} message {i}\n", LEVELS[i % len(LEVELS)])
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=producer, args=(f"thread{n}",)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    # Main thread posts too, like the GUI's own log() calls
+    def post_from_gui(i=0):
+        for _ in range(500):
+            if i >= per_thread:
+                break
+            view.post(f"[12:00:00] [INFO] gui message {i}\n", "INFO")
+            i += 1
+        if i < per_thread:
+            root.after(1, post_from_gui, i)
+
+    root.after(1, post_from_gui)
+
+    def wait_done():
+        if any(w.is_alive() for w in workers) or view.pending:
+            root.after(50, wait_done)
+        else:
+            root.after(200, root.quit)
+
+    root.after(50, wait_done)
+    root.mainloop()
+    elapsed = time.perf_counter() - started
+
+    lines = int(view.text.index('end-1c').split('.')[0]) - 1
+    ordered = sorted(flush_times) or [0.0]
+    print("=" * 60)
+    print(f"Bounded log view stress test: {per_thread * (threads + 1)} messages")
+    print("=" * 60)
+    print(f"Elapsed:         {elapsed:.2f} s")
+    print(f"Batches:         {view.batches}")
+    print(f"Lines in widget: {lines} (cap {view.max_lines})")
+    print(f"Flush p50/max:   {ordered[len(ordered) // 2]:.2f} / {ordered[-1]:.2f} ms")
+    root.destroy()
+
+    print()
+    check("the widget stays within its line cap", lines <= view.max_lines, f"{lines} lines")
+    finish()
+
+
+if __name__ == "__main__":
+    main()
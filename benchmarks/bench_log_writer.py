@@ -0,0 +1,140 @@
+"""
+Benchmark: open/append/close per log line vs the BufferedLogWriter
+Run: python benchmarks/bench_log_writer.py [lines]
+
+Checks that close() flushes what is still batched, that a quiet writer
+flushes on its interval, that size rotation keeps every line in order and
+that lines it can't write are counted and reported once; exits 1 if any
+check fails.
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from log_writer import BufferedLogWriter
+from checks import check, finish
+
+
+def legacy_log(log_dir, log_msg):
+    """The original BF6CrashMonitorGUI.log file write"""
+    log_file = log_dir / f"monitor_{datetime.now().strftime('%Y%m%d')}.log"
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(log_msg)
+
+
+def make_lines(count):
+    return [f"[12:00:00] [WARNING]   ⚠️ GPU Timeout (TDR) detected #{i}\n" for i in range(count)]
+
+
+def read_logs(log_dir):
+    """Every log line in the directory, parts in rotation order"""
+    def part(path):
+        stem = path.stem.split('_')
+        return int(stem[2]) if len(stem) > 2 else 0
+    paths = sorted(Path(log_dir).glob('monitor_*.log'), key=part)
+    return [line for path in paths for line in path.read_text(encoding='utf-8').splitlines(keepends=True)], paths
+
+
+def check_flushing():
+    lines = make_lines(50)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Thresholds the test never reaches, so only close() can flush
+        writer = BufferedLogWriter(tmp, flush_interval=3600, flush_lines=10**6, flush_bytes=10**9)
+        for line in lines:
+            writer.write(line)
+        writer.close()
+        written, _ = read_logs(tmp)
+        check("close() writes out the lines still batched", written == lines and not writer.thread.is_alive(),
+              f"{len(written)} of {len(lines)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = BufferedLogWriter(tmp, flush_interval=0.1, flush_lines=10**6, flush_bytes=10**9)
+        writer.write(lines[0])
+        time.sleep(0.5)
+        written, _ = read_logs(tmp)
+        check("a lone line is flushed once the interval passes", written == lines[:1])
+        writer.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        size = len(lines[0].encode('utf-8'))
+        writer = BufferedLogWriter(tmp, flush_lines=1, max_bytes=size * 10)
+        for line in lines:
+            writer.write(line)
+        writer.close()
+        written, paths = read_logs(tmp)
+        check("rotation keeps every line in order", written == lines, f"{len(written)} lines")
+        check("no part grows past max_bytes",
+              len(paths) > 1 and all(path.stat().st_size <= size * 10 for path in paths), f"{len(paths)} parts")
+
+
+def check_failed_writes():
+    lines = make_lines(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        # A file where the log folder should be: every open() fails
+        log_dir = Path(tmp) / 'logs'
+        log_dir.write_text('')
+        errors = []
+        writer = BufferedLogWriter(str(log_dir), flush_lines=1, on_error=errors.append)
+        for line in lines:
+            writer.write(line)
+        writer.sync(wait=True)
+        check("lines that can't be written are counted", writer.lines_dropped == 3, str(writer.lines_dropped))
+        check("the failure is reported once, not per batch", len(errors) == 1, '; '.join(errors))
+
+        log_dir.unlink()
+        log_dir.mkdir()
+        writer.write(lines[0])
+        writer.close()
+        written, _ = read_logs(log_dir)
+        check("writing resumes once the folder is back", written == lines[:1])
+        check("the recovery says how many lines were lost",
+              len(errors) == 2 and '3 lines were dropped' in errors[1], errors[-1])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lines = make_lines(count)
+
+    legacy_dir = Path(tempfile.mkdtemp())
+    buffered_dir = Path(tempfile.mkdtemp())
+    try:
+        start = time.perf_counter()
+        for line in lines:
+            legacy_log(legacy_dir, line)
+        legacy_s = time.perf_counter() - start
+
+        writer = BufferedLogWriter(str(buffered_dir))
+        start = time.perf_counter()
+        for line in lines:
+            writer.write(line)
+        caller_s = time.perf_counter() - start
+        writer.sync(wait=True, timeout=60)
+        buffered_s = time.perf_counter() - start
+        writer.close()
+
+        print("=" * 60)
+        print(f"Log throughput for {count} lines")
+        print("=" * 60)
+        print(f"open/append/close: {count / legacy_s:>12,.0f} lines/s")
+        print(f"buffered (caller): {count / caller_s:>12,.0f} lines/s")
+        print(f"buffered (fsynced):{count / buffered_s:>12,.0f} lines/s")
+        print(f"Lines on disk:     {writer.lines_written}")
+        print()
+        check("every line reached the file", writer.lines_written == count, f"{writer.lines_written} of {count}")
+    finally:
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+        shutil.rmtree(buffered_dir, ignore_errors=True)
+
+    check_flushing()
+    check_failed_writes()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark: slow system probes collected every snapshot vs served by ProbeRegistry
+Run: python benchmarks/bench_probe_registry.py [snapshots]
+
+Fake probes sleep like a CIM query and count their collections. Timings use
+the real clock; the checks drive the registry with an injected clock and a
+temp file's mtime to cover cache hits, misses, TTL expiry, file triggers,
+manual invalidation, peek() and the hit/miss counters. Exits 1 if any check
+fails.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from probe_registry import FileMtimeTrigger, ProbeRegistry
+from checks import check, finish
+
+PROBE_LATENCY = 0.005
+
+
+class FakeProbe:
+    """A collector that returns its collection number"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        return self.calls
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def bench(snapshots):
+    probe = FakeProbe(PROBE_LATENCY)
+    start = time.perf_counter()
+    for _ in range(snapshots):
+        probe()
+    uncached_ms = (time.perf_counter() - start) * 1000
+
+    registry = ProbeRegistry()
+    cached = FakeProbe(PROBE_LATENCY)
+    registry.register('gpu_info', cached, ttl=300)
+    start = time.perf_counter()
+    for _ in range(snapshots):
+        registry.get('gpu_info')
+    cached_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{snapshots} snapshots, probe latency {PROBE_LATENCY * 1000:.0f} ms")
+    print(f"  collected every time:  {uncached_ms:>9.1f} ms ({probe.calls} collections)")
+    print(f"  ProbeRegistry:         {cached_ms:>9.1f} ms ({cached.calls} collection)")
+    print()
+    check("a TTL probe is collected once across the run", cached.calls == 1, f"{cached.calls} collections")
+
+
+def check_ttl():
+    clock = FakeClock()
+    registry = ProbeRegistry(clock=clock)
+    probe = FakeProbe()
+    registry.register('hags_enabled', probe, ttl=60)
+
+    first = registry.get('hags_enabled')
+    clock.now += 59
+    cached = registry.get('hags_enabled')
+    check("a value inside its TTL is served from cache", (first, cached, probe.calls) == (1, 1, 1))
+
+    clock.now += 1
+    check("the value is re-collected once its TTL is up", registry.get('hags_enabled') == 2)
+
+    stats = registry.stats()['hags_enabled']
+    check("hits and misses are counted", (stats['hits'], stats['misses']) == (1, 2), str(stats))
+    clock.now += 12
+    check("stats report the value's age", registry.stats()['hags_enabled']['age_seconds'] == 12.0)
+
+    uncached = FakeProbe()
+    registry.register('file_info', uncached, ttl=0)
+    registry.get('file_info')
+    registry.get('file_info')
+    check("ttl=0 collects every time", uncached.calls == 2)
+
+
+def check_trigger():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'EAAntiCheat.GameService.exe'
+        registry = ProbeRegistry(clock=FakeClock())
+        probe = FakeProbe()
+        registry.register('ea_javelin', probe, triggers=[FileMtimeTrigger(str(path))])
+
+        registry.get('ea_javelin')
+        registry.get('ea_javelin')
+        check("no TTL caches until a trigger fires", probe.calls == 1)
+
+        path.write_bytes(b'MZ')
+        check("a file appearing re-collects", registry.get('ea_javelin') == 2)
+
+        stamp = os.stat(path).st_mtime_ns
+        os.utime(path, ns=(stamp + 10**9, stamp + 10**9))
+        check("a changed mtime re-collects", registry.get('ea_javelin') == 3)
+        check("an unchanged file is served from cache", registry.get('ea_javelin') == 3)
+
+        path.unlink()
+        check("a file disappearing re-collects", registry.get('ea_javelin') == 4)
+
+
+def check_invalidate():
+    registry = ProbeRegistry(clock=FakeClock())
+    gpu, hags = FakeProbe(), FakeProbe()
+    registry.register('gpu_info', gpu)
+    registry.register('hags_enabled', hags)
+    check("peek() is None before the first collection and never collects",
+          registry.peek('gpu_info') is None and gpu.calls == 0)
+
+    registry.get('gpu_info')
+    registry.get('hags_enabled')
+    registry.invalidate('gpu_info')
+    check("peek() keeps serving the old value after invalidate()", registry.peek('gpu_info') == 1)
+    check("invalidate(name) re-collects only that probe",
+          (registry.get('gpu_info'), registry.get('hags_enabled')) == (2, 1))
+
+    registry.invalidate()
+    check("invalidate() re-collects every probe",
+          (registry.get('gpu_info'), registry.get('hags_enabled')) == (3, 2))
+
+    check("refresh() collects at once", registry.refresh('hags_enabled') == 3 and registry.peek('hags_enabled') == 3)
+
+
+def main():
+    snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bench(snapshots)
+    check_ttl()
+    check_trigger()
+    check_invalidate()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: the original process_iter read vs ProcessSampler on a live process
+Run: python benchmarks/bench_process_sampler.py [ticks]
+
+Starts a child Python process with a few busy threads standing in for the
+game, then reads it each tick the way get_process_info used to (a fresh
+process_iter walk with attrs) and with a persistent ProcessSampler.
+Checks the priming sample, the CPU and busiest-thread rates against the
+child's spinning threads, denied reads on a protected fake process and that
+an exited or replaced process samples as None; exits 1 if any check fails.
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from process_sampler import ProcessSampler
+from fake_backends import FakeProcessTable
+from checks import check, finish
+
+CHILD = r"""
+import threading, time
+def spin(share):
+    while True:
+        end = time.perf_counter() + share * 0.01
+        while time.perf_counter() < end:
+            pass
+        time.sleep((1 - share) * 0.01)
+for share in (0.9, 0.5, 0.2):
+    threading.Thread(target=spin, args=(share,), daemon=True).start()
+time.sleep(3600)
+"""
+
+ATTRS = ['pid', 'name', 'cpu_percent', 'memory_info', 'create_time']
+
+
+def legacy_read(pid):
+    """Walk the table and read the target's attrs, as get_process_info did"""
+    for proc in psutil.process_iter(ATTRS):
+        if proc.info['pid'] == pid:
+            return {'cpu_percent': proc.info['cpu_percent'],
+                    'memory_mb': proc.info['memory_info'].rss / 1024 / 1024}
+    return None
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    child = subprocess.Popen([sys.executable, '-c', CHILD])
+    try:
+        time.sleep(0.5)
+        sampler = ProcessSampler(psutil.Process(child.pid))
+        first = sampler.sample()
+        check("the first sample only primes the rates",
+              first['cpu_percent'] is None and first['busiest_threads'] is None
+              and (first['io'] is None or first['io']['read_mb_s'] is None))
+
+        legacy_ms, sampler_ms = [], []
+        legacy_cpu, sample = None, None
+        for _ in range(ticks):
+            time.sleep(0.5)
+            start = time.perf_counter()
+            legacy = legacy_read(child.pid)
+            legacy_ms.append((time.perf_counter() - start) * 1000)
+            legacy_cpu = legacy['cpu_percent']
+
+            start = time.perf_counter()
+            sample = sampler.sample()
+            sampler_ms.append((time.perf_counter() - start) * 1000)
+
+        replaced = ProcessSampler(psutil.Process(child.pid), create_time=sample['create_time'] - 60)
+        check("a PID that now belongs to another start time samples as None", replaced.sample() is None)
+    finally:
+        child.kill()
+        child.wait()
+    check("an exited process samples as None", sampler.sample() is None)
+
+    print(f"{len(psutil.pids())} processes, {ticks} ticks, busy child with 3 spinning threads")
+    print(f"{'':<18}{'ms/tick':>10}{'cpu %':>10}  fields")
+    print(f"{'process_iter':<18}{sum(legacy_ms) / ticks:>10.3f}{legacy_cpu:>10.1f}  cpu, rss")
+    print(f"{'ProcessSampler':<18}{sum(sampler_ms) / ticks:>10.3f}{sample['cpu_percent']:>10.1f}  "
+          f"{', '.join(key for key, value in sample.items() if value is not None)}")
+    print(f"\nBusiest threads: {sample['busiest_threads']}")
+    print(f"IO: {sample['io']}")
+    print()
+
+    # The spinning threads share one GIL, so together they stay under a core
+    check("CPU comes from the delta since the previous sample", sample['cpu_percent'] > 30,
+          f"{sample['cpu_percent']:.1f}%")
+    rates = [thread['cpu_percent'] for thread in sample['busiest_threads'] or []]
+    check("the spinning threads are listed busiest first", len(rates) >= 3 and rates == sorted(rates, reverse=True)
+          and rates[0] > rates[2], str(rates))
+    check_denied()
+    finish()
+
+
+def check_denied():
+    table = FakeProcessTable(10, planted=['EAAntiCheat.GameService.exe'])
+    pid = next(pid for pid, proc in table.procs.items() if proc._name == 'EAAntiCheat.GameService.exe')
+    proc = table.process(pid)
+    proc.protected = True
+    sampler = ProcessSampler(proc, name='EAAntiCheat.GameService.exe', create_time=table.procs[pid]._create_time)
+    sampler.sample()
+    sample = sampler.sample()
+    check("denied reads are named and the readable ones kept",
+          sorted(sample['unavailable']) == ['create_time', 'memory_mb'] and sample['memory_mb'] is None and sample['num_threads'] == 64,
+          str(sample['unavailable']))
+    check("the walk's name and start time stand in for denied ones",
+          sample['name'] == 'EAAntiCheat.GameService.exe' and sample['create_time'] == sampler.create_time
+          and sample['running_time'] is not None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: array-backed SampleRing vs a deque of dicts for pre-crash samples
+Run: python benchmarks/bench_sample_ring.py
+
+Checks that the ring's memory doesn't grow with the session, that it reads
+back in order after wrapping around and that missing values come out as
+None, and that the recorder leaves the priming CPU reading of each newly
+attached game out; exits 1 if any check fails.
+"""
+
+import sys
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sample_ring import NAN, PreCrashRecorder, SampleRing, SAMPLE_FIELDS
+from fake_backends import FakeProcessTable
+from checks import check, finish
+
+WINDOW_SAMPLES = 240  # 60 s at 250 ms
+SESSION_HOURS = (1, 4, 8)
+SAMPLES_PER_HOUR = 4 * 3600
+
+
+def sample_values(i):
+    return (1_700_000_000.0 + i * 0.25, 40.0 + i % 50, 60.0 + i % 30,
+            8000.0 + i % 900, 90.0 + i % 10, 2500.0 + i % 200,
+            9500.0 + i % 700, 180.0 + i % 20, 4_000_000.0 + i * 50, 1.0,
+            95.0 + i % 5, 14000.0 + i % 300, 2700.0 + i % 60, 75.0 + i % 8, 300.0 + i % 40)
+
+
+def fill_ring(ring, count):
+    for i in range(count):
+        ring.append(*sample_values(i))
+
+
+def fill_deque(buffer, count):
+    for i in range(count):
+        buffer.append(dict(zip(SAMPLE_FIELDS, sample_values(i))))
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    holder = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, holder
+
+
+def check_ring():
+    ring = SampleRing(5, fields=('timestamp', 'value'))
+    check("an empty ring has no report", ring.to_report() is None and len(ring) == 0)
+
+    for i in range(3):
+        ring.append(100.0 + i, float(i))
+    check("a partly filled ring reads back oldest first", ring.series()['value'] == [0.0, 1.0, 2.0])
+
+    for i in range(3, 12):
+        ring.append(100.0 + i, float(i))
+    series = ring.series()
+    check("after wrapping around it keeps the newest samples, oldest first",
+          series['value'] == [7.0, 8.0, 9.0, 10.0, 11.0] and len(ring) == 5, str(series['value']))
+
+    ring.append(112.0, NAN)
+    report = ring.to_report()
+    check("missing values are reported as None", report['value'][-1] is None and report['value'][0] == 8.0,
+          str(report['value']))
+    check("offsets count back from the newest sample",
+          report['offset_seconds'] == [-4.0, -3.0, -2.0, -1.0, 0.0] and report['samples'] == 5,
+          str(report['offset_seconds']))
+
+
+def check_recorder():
+    table = FakeProcessTable(10)
+    scanner = SimpleNamespace(cache={})
+    ring = SampleRing(10)
+    recorder = PreCrashRecorder(ring, scanner, process_factory=table.process)
+
+    first = table.spawn('bf6.exe')
+    scanner.cache['bf6'] = table.process(first)
+    recorder.sample()
+    recorder.sample()
+    table.kill(first)
+    scanner.cache['bf6'] = table.process(table.spawn('bf6.exe'))
+    recorder.sample()
+    recorder.sample()
+
+    game_cpu = ring.series()['game_cpu_percent']
+    check("a newly attached game's priming CPU reading is missing, not 0%", game_cpu == [None, 0.0, None, 0.0],
+          str(game_cpu))
+
+
+def main():
+    check_ring()
+    check_recorder()
+    print()
+
+    print("=" * 60)
+    print(f"Retained memory for a {WINDOW_SAMPLES}-sample window (KB)")
+    print("=" * 60)
+    print(f"{'session':>8} | {'SampleRing':>12} | {'deque[dict]':>12}")
+    ring_sizes = []
+    for hours in SESSION_HOURS:
+        count = hours * SAMPLES_PER_HOUR
+
+        def build_ring():
+            ring = SampleRing(WINDOW_SAMPLES)
+            fill_ring(ring, count)
+            return ring
+
+        def build_deque():
+            buffer = deque(maxlen=WINDOW_SAMPLES)
+            fill_deque(buffer, count)
+            return buffer
+
+        ring_bytes, _ = measure_memory(build_ring)
+        deque_bytes, _ = measure_memory(build_deque)
+        ring_sizes.append(ring_bytes)
+        print(f"{hours:>7}h | {ring_bytes / 1024:>12.1f} | {deque_bytes / 1024:>12.1f}")
+    check("the ring's memory doesn't grow with the session", max(ring_sizes) - min(ring_sizes) < 1024,
+          f"{min(ring_sizes)}..{max(ring_sizes)} bytes")
+
+    print("\n" + "=" * 60)
+    print("Per-sample append cost (µs)")
+    print("=" * 60)
+    count = SAMPLES_PER_HOUR * 4
+    values = [sample_values(i) for i in range(1000)]
+
+    ring = SampleRing(WINDOW_SAMPLES)
+    start = time.perf_counter()
+    for i in range(count):
+        ring.append(*values[i % 1000])
+    ring_us = (time.perf_counter() - start) / count * 1e6
+
+    buffer = deque(maxlen=WINDOW_SAMPLES)
+    start = time.perf_counter()
+    for i in range(count):
+        buffer.append(dict(zip(SAMPLE_FIELDS, values[i % 1000])))
+    deque_us = (time.perf_counter() - start) / count * 1e6
+
+    print(f"SampleRing:  {ring_us:.3f} µs/sample")
+    print(f"deque[dict]: {deque_us:.3f} µs/sample")
+
+    start = time.perf_counter()
+    report = ring.to_report()
+    print(f"\nto_report() for {report['samples']} samples: {(time.perf_counter() - start) * 1000:.2f} ms")
+    check("the report holds one full window", report['samples'] == WINDOW_SAMPLES)
+    finish()
+
+
+if __name__ == "__main__":
+    main()
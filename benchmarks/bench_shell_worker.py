@@ -0,0 +1,122 @@
+"""
+Benchmark: a new shell process per query vs the persistent ShellWorker
+Run: python benchmarks/bench_shell_worker.py [queries]
+
+Uses the Python stand-in worker, so it runs anywhere; on Windows the gap to
+powershell.exe startup is much larger. Also checks that a query's timeout
+covers waiting for a busy pool and that a request that isn't valid JSON is
+answered with an error instead of ending the worker; exits 1 if either fails.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shell_worker import ShellTimeout, ShellWorker, ShellWorkerPool, python_transport
+from checks import check, finish
+
+STAND_IN = Path(__file__).resolve().parent / 'fake_shell_worker.py'
+
+
+def spawn_per_query(command):
+    """Like the old subprocess.run(['powershell', '-Command', ...]) calls"""
+    request = json.dumps({'id': 1, 'command': command})
+    result = subprocess.run([sys.executable, str(STAND_IN)], input=request + "\n",
+                            capture_output=True, text=True, timeout=15)
+    return json.loads(result.stdout.splitlines()[-1])['result']
+
+
+def check_busy_pool():
+    """A query waiting for a free worker gives up at its own timeout"""
+    pool = ShellWorkerPool(lambda: python_transport(STAND_IN), size=1)
+    pool.start()
+    pool.query('echo 1')
+    busy = threading.Thread(target=pool.query, args=('sleep 2', 5.0))
+    busy.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    try:
+        pool.query('echo 1', timeout=0.3)
+        timed_out = False
+    except ShellTimeout:
+        timed_out = True
+    waited = time.perf_counter() - start
+    busy.join()
+    print("\nBusy pool")
+    check("a query times out while every worker is busy", timed_out and waited < 1.0, f"{waited:.2f} s")
+    check("the busy worker finished and was kept", pool.restarts() == 0 and pool.query('echo 1') == [1])
+    pool.close()
+
+
+def check_bad_request():
+    """A malformed request line gets an error answer and the worker lives on"""
+    transport = python_transport(STAND_IN)
+    transport.start()
+
+    def answer():
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            line = transport.read_line(deadline - time.monotonic())
+            if line and line.startswith('{'):
+                return json.loads(line)
+        return None
+
+    transport.send_line('{"id": 7, "command": "echo 1"')
+    response = answer()
+    print("\nMalformed request")
+    check("a request that doesn't parse is answered with an error under its id",
+          response is not None and response['id'] == 7 and not response['ok'], str(response))
+    transport.send_line(json.dumps({'id': 8, 'command': 'echo 1'}))
+    check("the worker keeps answering afterwards", answer() == {'id': 8, 'ok': True, 'result': 1})
+    transport.close()
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    command = 'echo [{"Source": "Display", "EventID": 4101}]'
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        spawn_per_query(command)
+    spawn_ms = (time.perf_counter() - start) / queries * 1000
+
+    worker = ShellWorker(lambda: python_transport(STAND_IN))
+    worker.start()
+    start = time.perf_counter()
+    for _ in range(queries):
+        worker.query(command)
+    worker_ms = (time.perf_counter() - start) / queries * 1000
+    worker.close()
+
+    # Concurrent slow queries: a single worker serializes, a pool overlaps
+    pool = ShellWorkerPool(lambda: python_transport(STAND_IN), size=4)
+    pool.start()
+    pool.query('echo 1')
+    start = time.perf_counter()
+    threads = [threading.Thread(target=pool.query, args=('sleep 0.2',)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool_s = time.perf_counter() - start
+    pool.close()
+
+    print("=" * 60)
+    print(f"Shell query latency over {queries} queries")
+    print("=" * 60)
+    print(f"spawn per query:   {spawn_ms:>8.2f} ms/query")
+    print(f"persistent worker: {worker_ms:>8.2f} ms/query")
+    print(f"4 x 0.2 s queries on a pool of 4: {pool_s:.2f} s")
+
+    check_busy_pool()
+    check_bad_request()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: time to first paint and to all initial probes done
+Run: python benchmarks/bench_startup.py [--runs N] [--exe path\\to\\BF6CrashMonitor.exe]
+
+Measures `python crash_monitor.py` and the PyInstaller build from build.py
+(dist/BF6CrashMonitor.exe). The default build path is only measured once it
+has been built and the run says so when it hasn't; an --exe that doesn't
+exist is a failure. The StartupTrace checks run anywhere; the timed runs need
+a display and exit with the skip status (77) without one. Exits 1 if any
+check fails.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from startup_trace import StartupTrace
+from checks import check, finish, skip
+
+DEFAULT_EXE = ROOT / 'dist' / 'BF6CrashMonitor.exe'
+
+
+def measure(command, runs):
+    results = []
+    for _ in range(runs):
+        fd, trace_path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(trace_path)
+
+        env = dict(os.environ, BF6_STARTUP_TRACE=trace_path, BF6_STARTUP_EXIT='1')
+        with tempfile.TemporaryDirectory() as work_dir:
+            launched = time.time()
+            proc = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, timeout=120)
+
+        if not os.path.exists(trace_path):
+            print(f"  run failed (exit {proc.returncode}): {proc.stderr.decode(errors='replace')[-300:]}")
+            continue
+        with open(trace_path, encoding='utf-8') as f:
+            marks = json.load(f)
+        os.remove(trace_path)
+
+        results.append({
+            'first_paint_ms': (marks['first_paint'] - launched) * 1000,
+            'probes_done_ms': (marks['probes_done'] - launched) * 1000
+        })
+    return results
+
+
+def report(label, results):
+    print(f"\n{label}")
+    if not results:
+        print("  no successful runs")
+        return
+    for key in ('first_paint_ms', 'probes_done_ms'):
+        values = sorted(r[key] for r in results)
+        print(f"  {key:<15} median {values[len(values) // 2]:>8.0f} ms   best {values[0]:>8.0f} ms")
+
+
+def check_trace():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trace.json')
+        saved = {key: os.environ.pop(key, None) for key in ('BF6_STARTUP_TRACE', 'BF6_STARTUP_EXIT')}
+        try:
+            check("no trace without BF6_STARTUP_TRACE", not StartupTrace().enabled)
+            os.environ['BF6_STARTUP_TRACE'] = path
+            os.environ['BF6_STARTUP_EXIT'] = '1'
+            trace = StartupTrace()
+        finally:
+            for key, value in saved.items():
+                os.environ.pop(key, None)
+                if value is not None:
+                    os.environ[key] = value
+
+        trace.mark('first_paint')
+        first = trace.marks['first_paint']
+        time.sleep(0.01)
+        trace.mark('first_paint')
+        check("a milestone keeps its first time", trace.marks['first_paint'] == first)
+        trace.mark('probes_done')
+        trace.write()
+        with open(path, encoding='utf-8') as f:
+            marks = json.load(f)
+        check("the trace file has both milestones and the process start",
+              {'process_start', 'first_paint', 'probes_done'} <= set(marks) and trace.exit_when_done, str(sorted(marks)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--exe', help=f"build to measure (default: {DEFAULT_EXE.relative_to(ROOT)} if built)")
+    args = parser.parse_args()
+
+    check_trace()
+    if sys.platform != 'win32' and not os.environ.get('DISPLAY'):
+        finish()
+        skip("no display available")
+
+    print("=" * 60)
+    print(f"Startup timing over {args.runs} runs (from process launch)")
+    print("=" * 60)
+
+    results = measure([sys.executable, str(ROOT / 'crash_monitor.py')], args.runs)
+    report("python crash_monitor.py", results)
+    check("every source run wrote its trace", len(results) == args.runs, f"{len(results)} of {args.runs}")
+
+    exe = args.exe or str(DEFAULT_EXE)
+    if os.path.exists(exe):
+        results = measure([exe], args.runs)
+        report(f"PyInstaller build ({exe})", results)
+        check("every build run wrote its trace", len(results) == args.runs, f"{len(results)} of {args.runs}")
+    elif args.exe:
+        check("the build given with --exe exists", False, exe)
+    else:
+        print(f"\nPyInstaller build: NOT MEASURED - {exe} hasn't been built (run build.py first)")
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark: memory trend updates per snapshot, checked on synthetic series
+Run: python benchmarks/bench_trend_predictor.py [samples]
+
+Feeds MemoryTrendMonitor snapshots from a fake clock: a game leaking at a
+fixed rate, free RAM falling, a flat series and a game restart. Checks the
+fitted slope and level, the min_span/min_samples gating, the minutes to
+exhaustion, the warning text and throttling, and reset_game(); exits 1 if
+any check fails.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from trend_predictor import MemoryTrendMonitor, OnlineTrend
+from checks import check, finish
+
+INTERVAL = 1.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def snapshot(available_mb, game_mb=None, pid=4242, create_time=500.0, commit_mb=None, commit_limit_mb=32768):
+    memory = {'available_gb': available_mb / 1024}
+    if commit_mb is not None:
+        memory['commit_used_gb'] = commit_mb / 1024
+        memory['commit_limit_gb'] = commit_limit_mb / 1024
+    game = None
+    if game_mb is not None:
+        game = {'pid': pid, 'create_time': create_time, 'memory_mb': game_mb}
+    return {'memory': memory, 'bf6_process': game}
+
+
+def feed(monitor, clock, seconds, make, label='Battlefield 6'):
+    """Snapshots every INTERVAL seconds; make(elapsed) builds each one"""
+    estimates, warnings = None, []
+    for step in range(int(seconds / INTERVAL)):
+        clock.now += INTERVAL
+        estimates = monitor.update(make(step * INTERVAL), label)
+        warnings.extend(monitor.pending_warnings)
+    return estimates, warnings
+
+
+def near(value, expected, tolerance):
+    return value is not None and abs(value - expected) <= tolerance
+
+
+def bench(samples):
+    monitor = MemoryTrendMonitor(clock=FakeClock())
+    snapshots = [snapshot(8192 - i * 0.5, 3000 + i * 0.5, commit_mb=16000 + i) for i in range(samples)]
+    start = time.perf_counter()
+    for item in snapshots:
+        monitor.clock.now += INTERVAL
+        monitor.update(item, 'Battlefield 6')
+    elapsed = time.perf_counter() - start
+    print(f"{samples} snapshots: {elapsed / samples * 1e6:.1f} us per update")
+    print()
+
+
+def check_online_trend():
+    trend = OnlineTrend(halflife=600)
+    check("no slope from one sample", (trend.update(0, 1000.0), trend.slope) == (None, None))
+    for t in range(1, 601):
+        trend.update(t, 1000 + 2.0 * t)
+    check("a straight line's slope is recovered", near(trend.slope, 2.0, 1e-6), f"{trend.slope:.6f}")
+    check("the level is the line at the newest sample", near(trend.level, 2200.0, 1e-3), f"{trend.level:.3f}")
+    check("span covers the samples", trend.span == 600)
+    trend.update(600, 0.0)
+    check("a sample at the same time is ignored", trend.samples == 601)
+
+
+def check_leak():
+    clock = FakeClock()
+    monitor = MemoryTrendMonitor(min_span=300, min_samples=10, warn_minutes=60, clock=clock)
+
+    # Game RSS grows 60 MB/min with 2 GB free that stays put
+    early, _ = feed(monitor, clock, 120, lambda t: snapshot(2048, 3000 + t))
+    check("no estimate before min_span", early['game_rss']['slope_mb_per_min'] is None)
+
+    estimates, warnings = feed(monitor, clock, 300, lambda t: snapshot(2048, 3120 + t))
+    rss = estimates['game_rss']
+    check("the game's growth rate is reported per minute", near(rss['slope_mb_per_min'], 60.0, 0.01),
+          f"{rss['slope_mb_per_min']} MB/min")
+    check("minutes until free RAM is gone", near(rss['minutes_to_exhaustion'], 2048 / 60, 0.1),
+          f"{rss['minutes_to_exhaustion']} min")
+    check("flat free RAM has no exhaustion time", estimates['available_memory']['minutes_to_exhaustion'] is None)
+    check("the leak warning names the game and is raised once per warn_every",
+          len(warnings) == 1 and warnings[0].startswith("Battlefield 6 memory is growing 60 MB/min"),
+          warnings[0] if warnings else "no warning")
+
+    # A new process of the same game starts its trend over
+    estimates, _ = feed(monitor, clock, 5, lambda t: snapshot(2048, 1000 + t, pid=5151))
+    check("a new game process resets the RSS trend",
+          monitor.game_rss.samples == 5 and estimates['game_rss']['slope_mb_per_min'] is None)
+
+    estimates, _ = feed(monitor, clock, 5, lambda t: snapshot(2048))
+    check("the game exiting drops its trend",
+          monitor.game_key is None and monitor.game_rss.samples == 0 and 'game_rss' not in estimates)
+
+
+def check_falling_and_flat():
+    clock = FakeClock()
+    monitor = MemoryTrendMonitor(min_span=300, min_samples=10, warn_minutes=40, clock=clock)
+    # Free RAM falls 100 MB/min from 4 GB; commit charge climbs 50 MB/min towards 32 GB
+    estimates, warnings = feed(monitor, clock, 600,
+                               lambda t: snapshot(4096 - t * 100 / 60, commit_mb=30000 + t * 50 / 60))
+    available = estimates['available_memory']
+    check("falling free RAM is extrapolated to zero",
+          near(available['minutes_to_exhaustion'], (4096 - 1000) / 100, 0.2),
+          f"{available['minutes_to_exhaustion']} min")
+    commit = estimates['commit']
+    check("commit charge is extrapolated to its limit",
+          near(commit['minutes_to_exhaustion'], (32768 - 30500) / 50, 0.2), f"{commit['minutes_to_exhaustion']} min")
+    check("a falling resource only warns when it is close", len(warnings) == 1 and 'Free RAM' in warnings[0],
+          '; '.join(warnings))
+
+    clock = FakeClock()
+    monitor = MemoryTrendMonitor(min_span=300, min_samples=10, clock=clock)
+    estimates, warnings = feed(monitor, clock, 600, lambda t: snapshot(8192, 3000, commit_mb=16000))
+    check("a flat series has zero slope and no exhaustion time",
+          near(estimates['game_rss']['slope_mb_per_min'], 0.0, 1e-6)
+          and all(estimates[key]['minutes_to_exhaustion'] is None
+                  for key in ('game_rss', 'available_memory', 'commit'))
+          and not warnings)
+
+    clock = FakeClock()
+    monitor = MemoryTrendMonitor(min_span=0, min_samples=50, clock=clock)
+    estimates, _ = feed(monitor, clock, 40, lambda t: snapshot(8192 - t * 10))
+    check("no estimate before min_samples", estimates['available_memory']['slope_mb_per_min'] is None)
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bench(samples)
+    check_online_trend()
+    check_leak()
+    check_falling_and_flat()
+    finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Pass/fail checks shared by the BF6 Crash Monitor benchmarks
+Each check prints one line; finish() exits 1 if any of them failed. A bench
+that can't run here (no display, nothing built) calls skip(), which exits
+with SKIPPED so runners can tell it apart from a pass.
+"""
+
+import sys
+
+# The automake/ctest convention for "test skipped"
+SKIPPED = 77
+
+failures = []
+
+
+def check(name, ok, detail=""):
+    print(f"  {'ok  ' if ok else 'FAIL'} {name}{f' ({detail})' if detail else ''}")
+    if not ok:
+        failures.append(name)
+
+
+def finish():
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+
+
+def skip(reason):
+    print(f"Skipped: {reason}")
+    sys.exit(SKIPPED)
@@ -0,0 +1,353 @@
+"""
+Fake platform backends for the BF6 Crash Monitor benchmarks
+Synthetic stand-ins for psutil and the event log so hot paths can be measured on any OS
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from event_log_reader import EventLogReader
+from gpu_telemetry import GpuTelemetry, parse_json_line, parse_nvidia_smi_line
+from platform_backends import PlatformBackends
+from dump_index import DumpIndex
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+GPU_STREAM = Path(__file__).resolve().parent / 'fake_gpu_stream.py'
+
+FakeMemInfo = namedtuple('FakeMemInfo', ['rss', 'vms'])
+
+# STATUS_ACCESS_VIOLATION, as psutil reports it on Windows
+CRASH_EXIT_CODE = 0xC0000005
+
+FILLER_NAMES = [
+    "svchost.exe", "chrome.exe", "explorer.exe", "RuntimeBroker.exe",
+    "conhost.exe", "Discord.exe", "steam.exe", "dwm.exe", "audiodg.exe",
+    "SearchHost.exe", "msedgewebview2.exe", "iCUE.exe", "OneDrive.exe"
+]
+
+
+class FakeProcess:
+    """Minimal psutil.Process look-alike backed by a FakeProcessTable"""
+
+    def __init__(self, table, pid, name, create_time, rss):
+        self.table = table
+        self.pid = pid
+        self._name = name
+        self._create_time = create_time
+        self._rss = rss
+        self.info = {}
+        # Like an anticheat service: handle-based calls raise AccessDenied
+        self.protected = False
+        # What wait() returns once the process is killed
+        self.exit_code = None
+
+    def is_running(self):
+        live = self.table.procs.get(self.pid)
+        return live is not None and live._create_time == self._create_time
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def _check(self):
+        if not self.is_running():
+            raise psutil.NoSuchProcess(self.pid, self._name)
+
+    def _deny(self):
+        self._check()
+        if self.protected:
+            raise psutil.AccessDenied(self.pid, self._name)
+
+    def name(self):
+        self._check()
+        return self._name
+
+    def create_time(self):
+        if self.protected:
+            raise psutil.AccessDenied(self.pid, self._name)
+        return self._create_time
+
+    def cpu_percent(self, interval=None):
+        self._check()
+        return 0.0
+
+    def memory_info(self):
+        self._deny()
+        return FakeMemInfo(self._rss, self._rss * 2)
+
+    def num_threads(self):
+        self._check()
+        return 64
+
+    def wait(self, timeout=None):
+        """Poll the table until the process is killed, like psutil's wait on a non-child"""
+        self._deny()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_running():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise psutil.TimeoutExpired(timeout, self.pid, self._name)
+            time.sleep(0.01)
+        return self.exit_code
+
+
+class FakeProcessTable:
+    """Synthetic process table exposing process_iter() and Process()"""
+
+    def __init__(self, size, planted=(), seed=1234):
+        self.rng = random.Random(seed)
+        self.procs = {}
+        self.next_pid = 4
+        for _ in range(size - len(planted)):
+            self.spawn(self.rng.choice(FILLER_NAMES))
+        for name in planted:
+            self.spawn(name)
+
+    def spawn(self, name, rss=None):
+        """Add a process and return its PID"""
+        pid = self.next_pid
+        self.next_pid += 4
+        rss = rss if rss is not None else self.rng.randint(1, 4096) * 1024 * 1024
+        self.procs[pid] = FakeProcess(self, pid, name, time.time() - self.rng.random() * 3600, rss)
+        return pid
+
+    def kill(self, pid, exit_code=CRASH_EXIT_CODE):
+        """End a process; its watcher sees exit_code (an access violation by default, 0 for a clean quit)"""
+        proc = self.procs.pop(pid, None)
+        if proc is not None:
+            proc.exit_code = exit_code
+
+    def pids_named(self, name):
+        return [pid for pid, proc in self.procs.items() if proc._name == name]
+
+    def process_iter(self, attrs=None):
+        # Mirrors psutil: fill .info with the requested attributes
+        for proc in list(self.procs.values()):
+            if attrs:
+                info = {}
+                for attr in attrs:
+                    if attr == 'pid':
+                        info[attr] = proc.pid
+                    elif attr == 'name':
+                        info[attr] = proc._name
+                    elif attr == 'create_time':
+                        # psutil fills in None for attributes it was denied
+                        info[attr] = None if proc.protected else proc._create_time
+                    elif attr == 'memory_info':
+                        info[attr] = FakeMemInfo(proc._rss, proc._rss * 2)
+                    elif attr == 'cpu_percent':
+                        info[attr] = 0.0
+                    else:
+                        info[attr] = None
+                proc.info = info
+            yield proc
+
+    def process(self, pid):
+        # Mirrors psutil.Process(pid)
+        proc = self.procs.get(pid)
+        if proc is None:
+            raise psutil.NoSuchProcess(pid)
+        return proc
+
+
+class FakeEventLogShell:
+    """Answers the EventLogReader's Get-WinEvent queries from in-memory records
+
+    Each record is a Get-WinEvent row (RecordId, TimeCreated, ProviderName,
+    Id, LevelDisplayName, Message); `latency` simulates the PowerShell cost.
+    """
+
+    def __init__(self, channels=('Application', 'System'), latency=0.0):
+        self.records = {channel: [] for channel in channels}
+        self.next_record = {channel: 1 for channel in channels}
+        self.latency = latency
+        self.queries = 0
+        self.rows_returned = 0
+
+    def add(self, channel, provider, event_id, message, level="Error", when=None):
+        record_id = self.next_record[channel]
+        self.next_record[channel] += 1
+        when = when if when is not None else time.time()
+        self.records[channel].append({
+            'RecordId': record_id,
+            'TimeCreated': f"/Date({int(when * 1000)})/",
+            'ProviderName': provider,
+            'Id': event_id,
+            'LevelDisplayName': level,
+            'Message': message
+        })
+        return record_id
+
+    def clear(self, channel):
+        """Like wevtutil cl - record numbers start over"""
+        self.records[channel] = []
+        self.next_record[channel] = 1
+
+    def query(self, command, timeout=10.0):
+        self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        channel = re.search(r"-LogName '([^']+)'", command).group(1)
+        records = self.records.get(channel, [])
+        max_events = re.search(r"-MaxEvents (\d+)", command)
+        max_events = int(max_events.group(1)) if max_events else len(records)
+        after = re.search(r"EventRecordID > (\d+)", command)
+        if after:
+            records = [r for r in records if r['RecordId'] > int(after.group(1))]
+
+        if '-Oldest' in command:
+            rows = records[:max_events]
+        else:
+            rows = list(reversed(records))[:max_events]
+        if command.rstrip().endswith("Select-Object RecordId"):
+            rows = [{'RecordId': r['RecordId']} for r in rows]
+        self.rows_returned += len(rows)
+        return rows
+
+
+class FakeGpu:
+    """GPU probe with a scripted CIM query latency"""
+
+    def __init__(self, latency=0.0, vendor='AMD'):
+        self.latency = latency
+        self.vendor = vendor
+        self.calls = 0
+
+    def get_gpu_info(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        name = "AMD Radeon RX 7900 XTX" if self.vendor == 'AMD' else "NVIDIA GeForce RTX 4080"
+        return {'Name': name, 'DriverVersion': "32.0.21013.1000", 'Vendor': self.vendor}
+
+
+class FakeRegistry:
+    """HAGS lookup with a scripted registry latency"""
+
+    def __init__(self, latency=0.0, hags=True):
+        self.latency = latency
+        self.hags = hags
+
+    def check_hardware_accelerated_gpu_scheduling(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.hags
+
+
+class FakeFileInfo:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def file_version(self, path):
+        if self.latency:
+            time.sleep(self.latency)
+        return "9.1.0.0"
+
+
+class FakeMemoryStatus:
+    """A steady commit charge of 24 of 48 GB"""
+
+    def commit_charge(self):
+        return 24 * 1024**3, 48 * 1024**3
+
+
+def load_fixture_events(shell):
+    """Replay the recorded Get-WinEvent payloads into a FakeEventLogShell
+
+    Records keep their message text but are re-stamped to now so they fall
+    inside the reader's recent-events window.
+    """
+    for path in sorted(FIXTURES.glob('event_log_*.json')):
+        channel = 'Application' if 'application' in path.name else 'System'
+        with open(path, encoding='utf-8') as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = [rows]
+        for row in rows:
+            shell.add(channel, row['ProviderName'], row['Id'], row['Message'] or '',
+                      level=row['LevelDisplayName'] or 'Error')
+    return shell
+
+
+def fake_gpu_telemetry(fmt='nvidia', loop_ms=100, extra_args=(), **kwargs):
+    """GpuTelemetry reading fake_gpu_stream.py; extra_args go to the stream, kwargs to GpuTelemetry"""
+    argv = [sys.executable, '-u', str(GPU_STREAM), '--format', fmt, '--loop-ms', str(loop_ms)] + list(extra_args)
+    parse = parse_nvidia_smi_line if fmt == 'nvidia' else parse_json_line
+    return GpuTelemetry(argv, parse, f"fake-{fmt}", **kwargs)
+
+
+def write_wer_report(root, app='bf6.exe', when=None, files=('memory.hdmp',), exception_code='c0000005'):
+    """A WER report folder like WerFault leaves in ReportArchive/ReportQueue, modified at `when`"""
+    when = when if when is not None else time.time()
+    stem = os.path.splitext(app)[0]
+    folder = Path(root) / f"AppCrash_{stem[:20]}_{random.getrandbits(64):016x}_{int(when):x}"
+    folder.mkdir(parents=True)
+    lines = [
+        "Version=1",
+        "EventType=APPCRASH",
+        f"EventTime={int((when + 11644473600) * 1e7)}",
+        f"ReportIdentifier={random.getrandbits(64):016x}",
+        "Sig[0].Name=Application Name",
+        f"Sig[0].Value={app}",
+        "Sig[1].Name=Fault Module Name",
+        "Sig[1].Value=amdxx64.dll",
+        "Sig[2].Name=Exception Code",
+        f"Sig[2].Value={exception_code}",
+        "FriendlyEventName=Stopped working",
+        f"AppName={stem}",
+        f"AppPath=C:\\Games\\{stem}\\{app}",
+    ]
+    # WerFault writes Report.wer as UTF-16 with a BOM
+    (folder / 'Report.wer').write_bytes('\r\n'.join(lines).encode('utf-16'))
+    for name in files:
+        (folder / name).write_bytes(b'MDMP')
+    for path in list(folder.iterdir()) + [folder]:
+        os.utime(path, (when, when))
+    return folder
+
+
+def write_minidump(folder, app='bf6.exe', pid=1234, when=None, size=4096):
+    """A LocalDumps-style <exe>.<pid>.dmp modified at `when`"""
+    when = when if when is not None else time.time()
+    path = Path(folder) / f"{app}.{pid}.dmp"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'MDMP' + bytes(size - 4))
+    os.utime(path, (when, when))
+    return path
+
+
+def fake_backends(table, state_dir, probe_latency=None, event_log_latency=0.0, gpu_telemetry=None,
+                  dump_roots=None):
+    """PlatformBackends over a FakeProcessTable with scripted probe latencies
+
+    probe_latency maps 'gpu', 'registry' and 'file_info' to seconds per call;
+    the event log is an EventLogReader reading the recorded fixtures.
+    gpu_telemetry is e.g. fake_gpu_telemetry(); none by default. dump_roots
+    are directories filled with write_wer_report() / write_minidump(), indexed
+    by a DumpIndex; none by default.
+    """
+    latency = probe_latency or {}
+    shell = load_fixture_events(FakeEventLogShell(latency=event_log_latency))
+    event_log = EventLogReader(shell, str(Path(state_dir) / 'event_log_state.json'))
+    return PlatformBackends(
+        process_table=table,
+        registry=FakeRegistry(latency.get('registry', 0.0)),
+        event_log=event_log,
+        gpu=FakeGpu(latency.get('gpu', 0.0)),
+        file_info=FakeFileInfo(latency.get('file_info', 0.0)),
+        memory=FakeMemoryStatus(),
+        gpu_telemetry=gpu_telemetry,
+        dump_index=(DumpIndex(dump_roots, str(Path(state_dir) / 'dump_index.db'))
+                    if dump_roots is not None else None)
+    )
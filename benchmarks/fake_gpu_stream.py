@@ -0,0 +1,58 @@
+"""
+Stand-in for a streaming GPU query process
+Prints what `nvidia-smi --query-gpu=... --format=csv,noheader,nounits --loop-ms=N`
+prints (--format nvidia, one line per GPU per loop) or the WDDM counter
+script's JSON lines (--format json), with a temperature that climbs like a
+card heading for a TDR.
+
+--exit-after N exits after N loops, --hang-after N stops printing but keeps
+running, --noise mixes in banners and [N/A] fields.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+
+def nvidia_line(index, loop, noise):
+    power = "[N/A]" if noise and loop % 5 == 0 else f"{280 + loop % 40:.2f}"
+    # A second card is the smaller one, so readers should report GPU 0
+    total = 16376 if index == 0 else 8188
+    return (f"{index}, NVIDIA GeForce RTX 4080, 560.94, {90 + loop % 10}, {14000 + loop * 3}, {total}, "
+            f"{2700 + loop % 60}, 11201, {min(95, 70 + loop // 10)}, {power}")
+
+
+def json_line(index, loop):
+    return json.dumps({'utilization_percent': 90 + loop % 10, 'memory_used_mb': 14000 + loop * 3})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=('nvidia', 'json'), default='nvidia')
+    parser.add_argument('--loop-ms', type=int, default=100)
+    parser.add_argument('--gpus', type=int, default=1)
+    parser.add_argument('--exit-after', type=int)
+    parser.add_argument('--hang-after', type=int)
+    parser.add_argument('--noise', action='store_true')
+    args = parser.parse_args()
+
+    if args.noise:
+        print("NVIDIA-SMI has failed because it couldn't communicate with the NVIDIA driver", flush=True)
+    loop = 0
+    while True:
+        if args.exit_after is not None and loop >= args.exit_after:
+            sys.exit(3)
+        if args.hang_after is not None and loop >= args.hang_after:
+            time.sleep(3600)
+        for index in range(args.gpus):
+            line = nvidia_line(index, loop, args.noise) if args.format == 'nvidia' else json_line(index, loop)
+            print(line, flush=True)
+        if args.noise and loop % 7 == 3:
+            print("", flush=True)
+        loop += 1
+        time.sleep(args.loop_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Stand-in for the PowerShell worker loop, speaking the same JSON line protocol
+Commands: 'echo <json>', 'sleep <seconds>', 'fail <message>', 'crash',
+'events <fixture path>'
+"""
+
+import json
+import re
+import sys
+import time
+
+
+def handle(command):
+    verb, _, arg = command.partition(' ')
+    if verb == 'echo':
+        return json.loads(arg) if arg else []
+    if verb == 'sleep':
+        time.sleep(float(arg))
+        return []
+    if verb == 'fail':
+        raise RuntimeError(arg or "failed")
+    if verb == 'crash':
+        sys.exit(1)
+    if verb == 'events':
+        with open(arg, encoding='utf-8') as f:
+            return json.load(f)
+    raise RuntimeError(f"unknown command: {verb}")
+
+
+def main():
+    # Real PowerShell can print banners/warnings; the client must skip them
+    print("Windows PowerShell stand-in", flush=True)
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = None
+        try:
+            request = json.loads(line)
+            result = handle(request['command'])
+            response = {'id': request['id'], 'ok': True, 'result': result}
+        except Exception as e:
+            # Like the PowerShell loop: answer a request that doesn't parse under the id it carries
+            if isinstance(request, dict):
+                request_id = request.get('id')
+            else:
+                found = re.search(r'"id"\s*:\s*(\d+)', line)
+                request_id = int(found.group(1)) if found else None
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+        print(json.dumps(response), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Benchmark suite: the monitoring hot paths against fake platform backends
+Run: python benchmarks/run_benchmarks.py [--quick] [--sizes 100,1000,10000]
+                                         [--compare [BASELINE]] [--threshold 25] [--no-save]
+                                         [--min-delta-ms 0.1]
+
+Runs anywhere psutil installs: process tables are synthetic, GPU/registry/
+file probes sleep for scripted latencies and the event log replays the
+recorded fixtures. The Tk benchmarks run as scripts afterwards and are
+reported as passed, failed or skipped (no display). Each run is saved to benchmarks/results/ named after the
+commit; --compare diffs it against a saved run (the newest by default) and
+exits 1 if any metric got worse by more than --threshold percent. A failed
+Tk benchmark also exits 1; a skipped one doesn't.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from monitor_engine import MonitorEngine
+from sample_ring import PreCrashRecorder
+from fake_backends import FakeProcessTable, fake_backends
+from checks import SKIPPED
+
+RESULTS = Path(__file__).resolve().parent / 'results'
+SIZES = (100, 1000, 10000)
+PROBE_LATENCY = {'gpu': 0.05, 'registry': 0.005, 'file_info': 0.002}
+
+# Scripts that drive the real Tk window, as (full args, --quick args)
+GUI_BENCHES = {
+    'bench_log_view.py': ([], ['20000']),
+    'bench_gui_latency.py': ([], ['4']),
+    'bench_startup.py': ([], ['--runs', '1'])
+}
+
+
+class Suite:
+    """Collects metrics as name -> {'value', 'unit', 'better'}"""
+
+    def __init__(self, quick=False):
+        self.quick = quick
+        self.metrics = {}
+        self.scripts = {}
+
+    def add(self, name, value, unit='ms', better='lower'):
+        self.metrics[name] = {'value': round(value, 4), 'unit': unit, 'better': better}
+        print(f"  {name:<40}{value:>12.3f} {unit}")
+
+    def repeat(self, full, quick):
+        return quick if self.quick else full
+
+
+def make_engine(tmp, size, game=True):
+    planted = ['bf6.exe', 'EAAntiCheat.GameService.exe'] if game else []
+    table = FakeProcessTable(size, planted=planted)
+    engine = MonitorEngine(backends=fake_backends(table, tmp, PROBE_LATENCY), log_dir=tmp)
+    return engine, table
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def time_calls(fn, count):
+    fn()  # warm-up, not timed
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_snapshot_tick(suite, sizes):
+    """get_system_snapshot with the game running: warm caches, then a cold probe refresh"""
+    print("Snapshot tick")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, _ = make_engine(tmp, size)
+            try:
+                engine.get_system_snapshot()
+                timings = time_calls(engine.get_system_snapshot, suite.repeat(200, 40))
+                suite.add(f"snapshot_tick.p50@{size}", statistics.median(timings))
+                suite.add(f"snapshot_tick.p95@{size}", percentile(timings, 0.95))
+
+                # Every cached probe re-collected, as after the Refresh button
+                engine.probe_registry.invalidate()
+                engine.process_scanner.invalidate()
+                start = time.perf_counter()
+                engine.get_system_snapshot()
+                suite.add(f"snapshot_tick.cold@{size}", (time.perf_counter() - start) * 1000)
+            finally:
+                engine.close()
+
+
+def bench_launch_check(suite, sizes):
+    """The idle-mode probe: a full table walk that finds no game"""
+    print("Idle launch check")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, _ = make_engine(tmp, size, game=False)
+            try:
+                # No game to find, so the scheduler is never touched
+                timings = time_calls(lambda: engine.check_game_launch(None), suite.repeat(100, 20))
+                suite.add(f"launch_check.p50@{size}", statistics.median(timings))
+            finally:
+                engine.close()
+
+
+def bench_crash_detection(suite, size=1000):
+    """Wall time from the game starting/dying to the engine noticing, with the scheduler running"""
+    print("Crash detection")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, table = make_engine(tmp, size, game=False)
+        started = threading.Event()
+        crashed = threading.Event()
+
+        def on_event(event, payload):
+            if event == 'game_started':
+                started.set()
+            elif event == 'crash':
+                crashed.set()
+
+        engine.subscribe(on_event)
+        engine.start()
+        launch_ms, detect_ms = [], []
+        try:
+            for _ in range(suite.repeat(5, 2)):
+                started.clear()
+                crashed.clear()
+                t0 = time.perf_counter()
+                pid = table.spawn('bf6.exe')
+                if not started.wait(10):
+                    raise RuntimeError("game launch was not detected")
+                launch_ms.append((time.perf_counter() - t0) * 1000)
+
+                time.sleep(0.3)
+                t0 = time.perf_counter()
+                table.kill(pid)
+                if not crashed.wait(10):
+                    raise RuntimeError("crash was not detected")
+                detect_ms.append((time.perf_counter() - t0) * 1000)
+        finally:
+            engine.close()
+
+    # Launch detection is bounded by the idle launch_check interval
+    suite.add("launch_detection.mean", statistics.mean(launch_ms))
+    suite.add("crash_detection.mean", statistics.mean(detect_ms))
+
+
+def bench_analyze_crash(suite):
+    """Rule engine throughput on the recorded events plus unique synthetic noise"""
+    print("analyze_crash")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _ = make_engine(tmp, 100)
+        try:
+            snapshot = engine.get_system_snapshot()
+            recorded = engine.check_windows_event_logs()
+            events = list(recorded)
+            for i in range(500 - len(events)):
+                event = dict(recorded[i % len(recorded)])
+                event['Message'] = f"{event['Message']} ({i})"
+                events.append(event)
+
+            count = suite.repeat(200, 40)
+            start = time.perf_counter()
+            for _ in range(count):
+                engine.analyze_crash(snapshot, events)
+            elapsed = time.perf_counter() - start
+            suite.add("analyze_crash.throughput@500events", count / elapsed, unit='reports/s', better='higher')
+        finally:
+            engine.close()
+
+
+def bench_save_crash_report(suite):
+    """Crash-path cost of save_crash_report and the time until the row is durable"""
+    print("save_crash_report")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, table = make_engine(tmp, 100)
+        try:
+            snapshot = engine.get_system_snapshot()
+            # A full pre-crash window, as in a real report
+            recorder = PreCrashRecorder(engine.sample_ring, engine.process_scanner,
+                                        process_factory=table.process)
+            for _ in range(engine.sample_ring.capacity):
+                recorder.sample()
+            enqueue_ms, durable_ms = [], []
+            for _ in range(suite.repeat(50, 10)):
+                start = time.perf_counter()
+                engine.save_crash_report(snapshot)
+                enqueue_ms.append((time.perf_counter() - start) * 1000)
+                engine.crash_store.sync()
+                durable_ms.append((time.perf_counter() - start) * 1000)
+            suite.add("save_crash_report.p50", statistics.median(enqueue_ms))
+            suite.add("save_crash_report.durable_p50", statistics.median(durable_ms))
+        finally:
+            engine.close()
+
+
+def run_gui_benches(suite):
+    """Run the Tk benchmarks as scripts; a missing display is a skip, not a pass"""
+    print("GUI benchmarks")
+    for script, (full, quick) in GUI_BENCHES.items():
+        proc = subprocess.run([sys.executable, str(Path(__file__).resolve().parent / script),
+                               *suite.repeat(full, quick)],
+                              cwd=ROOT, capture_output=True, text=True, timeout=600)
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode == SKIPPED:
+            status = 'skipped'
+            detail = next((line[len('Skipped: '):] for line in reversed(lines) if line.startswith('Skipped: ')), '')
+        elif proc.returncode == 0:
+            status, detail = 'passed', ''
+        else:
+            status = 'failed'
+            failed = [line.strip() for line in lines if line.lstrip().startswith('FAIL')]
+            detail = '; '.join(failed) or (proc.stderr.strip().splitlines() or [f"exit {proc.returncode}"])[-1]
+        suite.scripts[script] = status
+        print(f"  {script:<40}{status.upper():>12}{f'  {detail}' if detail else ''}")
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def save_results(suite):
+    commit, dirty = git_revision()
+    result = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': suite.quick,
+        'metrics': suite.metrics,
+        'scripts': suite.scripts
+    }
+    RESULTS.mkdir(exist_ok=True)
+    path = RESULTS / f"{datetime.now():%Y%m%d_%H%M%S}_{commit}{'-dirty' if dirty else ''}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved {path.relative_to(ROOT)}")
+    return path
+
+
+def latest_result(exclude=None):
+    runs = sorted(path for path in RESULTS.glob('*.json') if path != exclude) if RESULTS.exists() else []
+    return runs[-1] if runs else None
+
+
+def compare(suite, baseline_path, threshold, min_delta_ms):
+    """Print the change per metric; returns the names that regressed
+
+    Millisecond metrics must also move by more than min_delta_ms, so jitter
+    on sub-millisecond paths isn't reported as a regression.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path.name} (commit {baseline['commit']}):")
+    if baseline.get('quick') != suite.quick:
+        print("  Note: one of the runs used --quick, expect more noise")
+    metrics = suite.metrics
+    regressions = []
+    for name, metric in metrics.items():
+        old = baseline['metrics'].get(name)
+        if not old or not old['value']:
+            continue
+        change = (metric['value'] - old['value']) / old['value'] * 100
+        worse = change if metric['better'] == 'lower' else -change
+        noise = metric['unit'] == 'ms' and abs(metric['value'] - old['value']) <= min_delta_ms
+        flag = "  REGRESSION" if worse > threshold and not noise else ""
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<40}{old['value']:>12.3f} -> {metric['value']:>12.3f} {metric['unit']:<10}{change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BF6 Crash Monitor benchmark suite")
+    parser.add_argument('--quick', action='store_true', help='fewer repetitions, for a smoke run')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='process table sizes (default: %(default)s)')
+    parser.add_argument('--compare', nargs='?', const='latest', metavar='BASELINE',
+                        help='compare against a saved result (default: the newest one)')
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help='percent slowdown that counts as a regression (default: %(default)s)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help='ignore millisecond changes smaller than this (default: %(default)s)')
+    parser.add_argument('--no-save', action='store_true', help="don't write the result file")
+    parser.add_argument('--no-gui', action='store_true', help="don't run the Tk benchmark scripts")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    suite = Suite(quick=args.quick)
+    bench_snapshot_tick(suite, sizes)
+    bench_launch_check(suite, sizes)
+    bench_crash_detection(suite)
+    bench_analyze_crash(suite)
+    bench_save_crash_report(suite)
+    if not args.no_gui:
+        run_gui_benches(suite)
+
+    saved = None if args.no_save else save_results(suite)
+    if args.compare:
+        baseline = latest_result(exclude=saved) if args.compare == 'latest' else Path(args.compare)
+        if baseline is None:
+            print("\nNo saved result to compare with yet")
+        elif compare(suite, baseline, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+    if 'failed' in suite.scripts.values():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Crash history analytics for BF6 Crash Monitor
+Aggregates the crash store with SQL over its indexed columns, so tens of
+thousands of reports are summarized without decompressing or loading them.
+"""
+
+import time
+
+# Every game exit is saved as a report; exit code 0 is a normal quit
+CRASH = "(exit_code IS NULL OR exit_code != 0)"
+
+
+def _where(since, target):
+    clauses, params = [], ()
+    if since is not None:
+        clauses.append("crash_time >= ?")
+        params += (since,)
+    if target is not None:
+        clauses.append("target = ?")
+        params += (target,)
+    return " AND ".join(clauses) or "1", params
+
+
+def _percentile(conn, where, params, count, fraction):
+    """Nearest-rank percentile walked off the running_time index"""
+    if not count:
+        return None
+    offset = min(count - 1, int(fraction * count))
+    row = conn.execute(
+        f"SELECT running_time FROM crashes WHERE {where} AND {CRASH} AND running_time IS NOT NULL "
+        "ORDER BY running_time LIMIT 1 OFFSET ?", params + (offset,)).fetchone()
+    return row[0] if row else None
+
+
+def _minutes(seconds):
+    return None if seconds is None else round(seconds / 60, 1)
+
+
+def crash_analytics(conn, since=None, bucket_minutes=10, target=None):
+    """Crash rate, time-to-crash distribution and crash counts by configuration
+
+    target limits everything to one watched title; by_target always splits
+    the crashes across titles.
+    """
+    where, params = _where(since, target)
+
+    reports, crashes, clean_exits, timed_crashes, play_seconds, mean_seconds, max_seconds = conn.execute(
+        f"""SELECT COUNT(*),
+                   COALESCE(SUM({CRASH}), 0),
+                   COALESCE(SUM(exit_code = 0), 0),
+                   COALESCE(SUM({CRASH} AND running_time IS NOT NULL), 0),
+                   COALESCE(SUM(running_time), 0),
+                   AVG(CASE WHEN {CRASH} THEN running_time END),
+                   MAX(CASE WHEN {CRASH} THEN running_time END)
+            FROM crashes WHERE {where}""", params).fetchone()
+
+    play_hours = play_seconds / 3600
+    bucket = bucket_minutes * 60
+    histogram = [
+        {'minutes': int(start) * bucket_minutes, 'crashes': count}
+        for start, count in conn.execute(
+            f"SELECT CAST(running_time / ? AS INTEGER) AS b, COUNT(*) FROM crashes "
+            f"WHERE {where} AND {CRASH} AND running_time IS NOT NULL GROUP BY b ORDER BY b",
+            (bucket,) + params)
+    ]
+
+    def grouped(columns, labels):
+        rows = conn.execute(
+            f"SELECT {columns}, COUNT(*) AS n FROM crashes WHERE {where} AND {CRASH} "
+            f"GROUP BY {columns} ORDER BY n DESC", params)
+        return [dict(zip(labels + ('crashes',), row)) for row in rows]
+
+    by_hags = []
+    for hags, count in conn.execute(
+            f"SELECT hags_enabled, COUNT(*) FROM crashes WHERE {where} AND {CRASH} GROUP BY hags_enabled",
+            params):
+        by_hags.append({'hags': {1: 'on', 0: 'off'}.get(hags, 'unknown'), 'crashes': count})
+
+    top_issues = [
+        {'rule': rule, 'crashes': count, 'events': events}
+        for rule, count, events in conn.execute(
+            f"SELECT i.rule, COUNT(DISTINCT i.crash_id), SUM(i.count) FROM crash_issues i "
+            f"JOIN crashes c ON c.id = i.crash_id WHERE {where} AND {CRASH} "
+            f"GROUP BY i.rule ORDER BY 2 DESC", params)
+    ]
+
+    return {
+        'since': since,
+        'target': target,
+        'reports': reports,
+        'crashes': crashes,
+        'clean_exits': clean_exits,
+        'play_hours': round(play_hours, 2),
+        'crashes_per_play_hour': round(timed_crashes / play_hours, 3) if play_hours else None,
+        'time_to_crash': {
+            'count': timed_crashes,
+            'mean_minutes': _minutes(mean_seconds),
+            'p50_minutes': _minutes(_percentile(conn, where, params, timed_crashes, 0.5)),
+            'p90_minutes': _minutes(_percentile(conn, where, params, timed_crashes, 0.9)),
+            'max_minutes': _minutes(max_seconds),
+            'bucket_minutes': bucket_minutes,
+            'histogram': histogram
+        },
+        'by_target': grouped("target", ('target',)),
+        'by_host': grouped("host", ('host',)),
+        'by_driver': grouped("gpu_vendor, gpu_driver", ('vendor', 'driver')),
+        'by_hags': by_hags,
+        'by_javelin': grouped("javelin_version", ('javelin_version',)),
+        'top_issues': top_issues
+    }
+
+
+def format_analytics(result, bar_width=30):
+    """Human-readable summary lines for the CLI and the GUI panel"""
+    lines = []
+    since = result['since']
+    scope = f"since {time.strftime('%Y-%m-%d', time.localtime(since))}" if since else "all time"
+    if result.get('target'):
+        scope += f", {result['target']} only"
+    lines.append(f"📊 Crash history ({scope})")
+    lines.append(f"Reports: {result['reports']} | Crashes: {result['crashes']} | "
+                 f"Clean exits: {result['clean_exits']}")
+    rate = result['crashes_per_play_hour']
+    rate_text = f"{rate:.2f}" if rate is not None else "n/a"
+    lines.append(f"Play time: {result['play_hours']:.1f} h | Crashes per play-hour: {rate_text}")
+
+    ttc = result['time_to_crash']
+    if ttc['count']:
+        lines.append("")
+        lines.append(f"⏱ Time to crash ({ttc['count']} crashes): median {ttc['p50_minutes']} min, "
+                     f"p90 {ttc['p90_minutes']} min, mean {ttc['mean_minutes']} min, max {ttc['max_minutes']} min")
+        peak = max(row['crashes'] for row in ttc['histogram'])
+        for row in ttc['histogram']:
+            bar = '█' * max(1, round(row['crashes'] / peak * bar_width))
+            span = f"{row['minutes']}-{row['minutes'] + ttc['bucket_minutes']} min"
+            lines.append(f"  {span:>14} {bar} {row['crashes']}")
+
+    def section(title, rows, label):
+        if not rows:
+            return
+        lines.append("")
+        lines.append(title)
+        for row in rows[:10]:
+            lines.append(f"  {label(row):<40} {row['crashes']:>6}")
+
+    if len(result.get('by_target') or []) > 1:
+        section("🎯 Crashes by target", result['by_target'], lambda row: row['target'] or 'unknown')
+    # Only an aggregator's store holds crashes from more than one machine
+    if any(row['host'] for row in result.get('by_host') or []):
+        section("🖥 Crashes by machine", result['by_host'], lambda row: row['host'] or 'local')
+    section("🎮 Crashes by GPU driver", result['by_driver'],
+            lambda row: f"{row['vendor'] or 'Unknown'} {row['driver'] or '?'}")
+    section("⚡ Crashes by HAGS", result['by_hags'], lambda row: row['hags'])
+    section("🛡 Crashes by Javelin version", result['by_javelin'],
+            lambda row: row['javelin_version'] or 'unknown')
+
+    if result['top_issues']:
+        lines.append("")
+        lines.append("🔍 Most common findings")
+        for row in result['top_issues'][:10]:
+            lines.append(f"  {row['rule']:<40} {row['crashes']:>6} crashes ({row['events']} events)")
+
+    return lines
@@ -0,0 +1,75 @@
+"""
+Crash-time evidence capture for BF6 Crash Monitor
+Runs every collector (event logs, crash dumps, GPU state, the pre-crash
+window) at the same moment on a thread pool under one shared deadline, and
+hands each result over as soon as it arrives
+"""
+
+import time
+from concurrent.futures import TimeoutError as FuturesTimeout, as_completed
+
+OK = 'ok'
+ERROR = 'error'
+TIMEOUT = 'timeout'
+
+
+def _timed(collect):
+    started = time.perf_counter()
+    try:
+        value = collect()
+    except Exception as e:
+        return {'status': ERROR, 'ms': _ms(started), 'error': f"{type(e).__name__}: {e}", 'value': None}
+    return {'status': OK, 'ms': _ms(started), 'value': value}
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+class CrashCapture:
+    """Collects crash evidence in parallel under one deadline
+
+    The executor is shared between crashes, so it should have a worker per
+    collector or more. A collector still running at the deadline is marked
+    'timeout' and left to finish on its own; its result is ignored.
+    """
+
+    def __init__(self, executor, deadline=15.0, timer=None):
+        self.executor = executor
+        self.deadline = deadline
+        # timer(name, seconds) receives every finished collector's duration
+        self.timer = timer
+
+    def run(self, collectors, on_result=None):
+        """Run [(name, collect)] and return {name: outcome}
+
+        An outcome is {'status', 'ms', 'value'} plus 'error' for failures;
+        on_result(name, outcome) is called on this thread as each one
+        finishes, in completion order.
+        """
+        started = time.perf_counter()
+        futures = {self.executor.submit(_timed, collect): name for name, collect in collectors}
+        outcomes = {}
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                name = futures[future]
+                outcomes[name] = future.result()
+                if self.timer:
+                    self.timer(f"capture.{name}", outcomes[name]['ms'] / 1000)
+                if on_result:
+                    on_result(name, outcomes[name])
+        except FuturesTimeout:
+            for future, name in futures.items():
+                if name in outcomes:
+                    continue
+                future.cancel()
+                outcomes[name] = {'status': TIMEOUT, 'ms': _ms(started), 'value': None}
+                if on_result:
+                    on_result(name, outcomes[name])
+        return outcomes
+
+
+def capture_summary(outcomes):
+    """{name: {'status', 'ms'[, 'error']}} for a report - the outcomes without their values"""
+    return {name: {key: value for key, value in outcome.items() if key != 'value'}
+            for name, outcome in outcomes.items()}
@@ -0,0 +1,386 @@
+"""
+Crash fingerprints for BF6 Crash Monitor
+Each report is reduced to a set of features (normalized event sources and
+messages, quick analysis findings, GPU driver, exit code, WER fault module
+and a bucketed pre-crash resource profile), hashed into a MinHash
+signature and banded into LSH buckets. The crash store keeps the buckets in
+an index, so finding crashes like one and grouping the history by failure
+mode look at a handful of candidates instead of every report.
+"""
+
+import hashlib
+import math
+import operator
+import re
+import time
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity for "the same crash" and for --similar results;
+# with 16 bands of 4 rows, pairs at 0.65 share a bucket 96% of the time
+CLUSTER_THRESHOLD = 0.65
+SIMILAR_THRESHOLD = 0.3
+
+# A feature counts this many times in the Jaccard estimate; the faulting
+# module weighs most, as it does in WER's own bucketing
+WEIGHTS = {
+    'target': 4,
+    'rule': 6,
+    'driver': 6,
+    'vendor': 2,
+    'exit': 3,
+    'module': 16,
+    'exception': 4,
+    'profile': 1,
+    'event': 1,
+    'msg': 1,
+}
+
+# Word shingles kept per distinct message, so a chatty log doesn't drown the findings
+MAX_SHINGLES = 10
+SHINGLE = 3
+
+# Only events this close to the exit count; the rest of the 10-minute
+# window is mostly other programs' noise
+EVENT_WINDOW = 60
+
+# Bin values are 64-bit hashes shifted right by log2(NUM_PERM)
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_EMPTY = (1 << 64) - 1
+
+_GUID = re.compile(r"\{?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\}?")
+_TOKEN = re.compile(r"0x[0-9a-f]+|[a-z_][a-z0-9_.\-]*[a-z0-9_]|[a-z]|\d+")
+# NTSTATUS-style exception codes name the failure; other hex is addresses and offsets
+_STATUS = re.compile(r"0x[8c][0-9a-f]{7}")
+
+
+def normalize_message(message):
+    """Lowercase tokens with GUIDs, addresses, offsets and numbers masked
+
+    Two crashes of the same kind then log the same text even though pids,
+    addresses and timestamps differ.
+    """
+    text = _GUID.sub(' <guid> ', (message or '').lower())
+    tokens = []
+    for token in _TOKEN.findall(text):
+        if token.startswith('0x'):
+            tokens.append(token[2:] if _STATUS.fullmatch(token) else '<hex>')
+        elif token.isdigit():
+            tokens.append('#')
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _bucket(value, step):
+    return None if value is None else int(value // step * step)
+
+
+def _exit_code(code):
+    if code is None:
+        return None
+    # Crash exit codes are NTSTATUS values, shown the way WER and the event log print them
+    return f"{code & 0xFFFFFFFF:08x}" if code < 0 or code > 0xFFFF else str(code)
+
+
+def resource_profile(report):
+    """Coarse buckets of the pre-crash state: similar crashes fall in the same ones"""
+    snapshot = report.get('pre_crash_snapshot') or {}
+    memory = snapshot.get('memory') or {}
+    telemetry = snapshot.get('gpu_telemetry') or {}
+    exit_info = report.get('game_exit') or {}
+    window = report.get('pre_crash_window') or {}
+
+    profile = {}
+    if memory.get('percent') is not None:
+        profile['ram'] = _bucket(memory['percent'], 10)
+    used, total = telemetry.get('memory_used_mb'), telemetry.get('memory_total_mb')
+    if used is not None and total:
+        profile['vram'] = _bucket(used / total * 100, 10)
+    if telemetry.get('temperature_c') is not None:
+        profile['gpu_temp'] = _bucket(telemetry['temperature_c'], 10)
+    load = [value for value in window.get('gpu_util_percent') or [] if value is not None]
+    if load:
+        profile['gpu_load'] = _bucket(load[-1], 25)
+
+    running_time = exit_info.get('running_time')
+    if running_time is None:
+        running_time = (snapshot.get('bf6_process') or {}).get('running_time')
+    if running_time is not None:
+        # Doubling buckets: a crash at launch and one after hours are different stories
+        profile['uptime'] = int(math.log2(running_time / 60 + 1))
+
+    slope = ((snapshot.get('memory_trend') or {}).get('game_rss') or {}).get('slope_mb_per_min')
+    if slope is not None:
+        profile['rss'] = 'growing' if slope > 20 else 'flat'
+    if snapshot:
+        profile['hags'] = bool(snapshot.get('hags_enabled'))
+        profile['anticheat'] = bool(snapshot.get('anticheat_process'))
+    return profile
+
+
+def crash_features(report):
+    """{feature: category} for a report; categories weight it in the signature"""
+    features = {}
+    snapshot = report.get('pre_crash_snapshot') or {}
+    gpu_info = snapshot.get('gpu_info') or {}
+
+    features[f"target:{report.get('target') or 'bf6'}"] = 'target'
+    for finding in (report.get('quick_analysis') or {}).get('findings', []):
+        features[f"rule:{finding['rule']}"] = 'rule'
+    if gpu_info.get('Vendor'):
+        features[f"vendor:{gpu_info['Vendor']}"] = 'vendor'
+    if gpu_info.get('DriverVersion'):
+        features[f"driver:{gpu_info.get('Vendor')} {gpu_info['DriverVersion']}"] = 'driver'
+
+    code = _exit_code((report.get('game_exit') or {}).get('exit_code'))
+    if code is not None:
+        features[f"exit:{code}"] = 'exit'
+    for dump in report.get('crash_dumps') or []:
+        signature = (dump.get('wer') or {}).get('signature') or {}
+        for name, key in (('Fault Module Name', 'module'), ('Exception Code', 'exception')):
+            if signature.get(name):
+                features[f"{key}:{signature[name].lower()}"] = key
+
+    for name, value in resource_profile(report).items():
+        features[f"{name}:{value}"] = 'profile'
+
+    crashed_at = (report.get('game_exit') or {}).get('exit_timestamp')
+    seen = set()
+    for event in report.get('windows_event_logs') or []:
+        if crashed_at and event.get('timestamp') and abs(event['timestamp'] - crashed_at) > EVENT_WINDOW:
+            continue
+        features[f"event:{event.get('Source')}/{event.get('EventID')}"] = 'event'
+        message = event.get('Message') or ''
+        if message in seen:
+            continue
+        seen.add(message)
+        tokens = normalize_message(message)
+        for start in range(min(MAX_SHINGLES, max(1, len(tokens) - SHINGLE + 1))):
+            shingle = ' '.join(tokens[start:start + SHINGLE])
+            if shingle:
+                features[f"msg:{shingle}"] = 'msg'
+    return features
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def feature_digest(features):
+    """Changes whenever the feature set does - the store skips re-signing unchanged reports"""
+    return hashlib.blake2b('\n'.join(sorted(features)).encode('utf-8'), digest_size=16).digest()
+
+
+def minhash(features):
+    """NUM_PERM-value MinHash signature of the weighted feature set
+
+    One-permutation hashing: every feature is hashed once, the low bits pick
+    its bin and each bin keeps its smallest value, which costs one hash per
+    feature instead of NUM_PERM. Empty bins borrow the next filled bin's
+    value (offset by the distance), so sparse reports still compare fairly.
+    """
+    bins = [_EMPTY] * NUM_PERM
+    for feature, category in features.items():
+        for copy in range(WEIGHTS[category]):
+            value = _hash64(f"{feature}#{copy}")
+            index = value & (NUM_PERM - 1)
+            value >>= _BIN_BITS
+            if value < bins[index]:
+                bins[index] = value
+    if _EMPTY not in bins or all(value == _EMPTY for value in bins):
+        return bins
+    dense = list(bins)
+    for index, value in enumerate(bins):
+        if value == _EMPTY:
+            distance = next(step for step in range(1, NUM_PERM) if bins[(index + step) % NUM_PERM] != _EMPTY)
+            # Above any real bin value (those fit in 64 - _BIN_BITS bits)
+            dense[index] = (distance << (64 - _BIN_BITS)) + bins[(index + distance) % NUM_PERM]
+    return dense
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures' feature sets"""
+    return sum(map(operator.eq, signature, other)) / NUM_PERM
+
+
+def lsh_buckets(signature):
+    """One signed 64-bit bucket key per band"""
+    buckets = []
+    for band in range(BANDS):
+        rows = array('Q', signature[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def pack_signature(signature):
+    return array('Q', signature).tobytes()
+
+
+def unpack_signature(blob):
+    signature = array('Q')
+    signature.frombytes(blob)
+    return signature.tolist()
+
+
+def describe(report, features=None):
+    """Short label for a crash group: target, findings, driver, fault and top event"""
+    if features is None:
+        features = crash_features(report)
+    parts = [report.get('target') or 'bf6']
+    rules = [feature[5:] for feature, category in features.items() if category == 'rule']
+    if rules:
+        parts.append(', '.join(rules))
+    gpu_info = (report.get('pre_crash_snapshot') or {}).get('gpu_info') or {}
+    if gpu_info.get('DriverVersion'):
+        parts.append(f"{gpu_info.get('Vendor') or '?'} {gpu_info['DriverVersion']}")
+    faults = [feature.split(':', 1)[1] for category in ('module', 'exception', 'exit')
+              for feature, feature_category in features.items() if feature_category == category]
+    if faults:
+        parts.append(' '.join(dict.fromkeys(faults)))
+    # The event logged closest to the exit, rather than the window's chattiest source
+    crashed_at = (report.get('game_exit') or {}).get('exit_timestamp')
+    events = [event for event in report.get('windows_event_logs') or [] if event.get('timestamp')]
+    if events:
+        if crashed_at:
+            event = min(events, key=lambda event: abs(event['timestamp'] - crashed_at))
+        else:
+            event = events[-1]
+        parts.append(f"{event.get('Source')}/{event.get('EventID')}")
+    return ' · '.join(parts)
+
+
+# Lookups ---------------------------------------------------------------
+
+def candidates(conn, signature, exclude=None, per_bucket=50, limit=200):
+    """[(similarity, crash_id, cluster_id)] of indexed crashes sharing a bucket, best first
+
+    Each bucket is read newest first and capped: a failure mode seen
+    thousands of times fills its buckets with near-identical crashes, and a
+    sample of them answers as well as all of them.
+    """
+    buckets = lsh_buckets(signature)
+    per_band = " UNION ALL ".join(
+        ["SELECT crash_id FROM (SELECT crash_id FROM crash_lsh WHERE bucket = ? ORDER BY crash_id DESC LIMIT ?)"]
+        * len(buckets))
+    params = [value for bucket in buckets for value in (bucket, per_bucket)]
+    # Shared bands already rank by similarity; only the best are compared in full
+    best = [row[0] for row in conn.execute(
+        f"SELECT crash_id FROM ({per_band}) WHERE crash_id != ? "
+        f"GROUP BY crash_id ORDER BY COUNT(*) DESC, crash_id DESC LIMIT ?",
+        params + [-1 if exclude is None else exclude, limit])]
+    if not best:
+        return []
+
+    rows = conn.execute(
+        f"SELECT crash_id, cluster_id, signature FROM crash_fingerprints "
+        f"WHERE crash_id IN ({', '.join('?' * len(best))})", best).fetchall()
+    scored = [(similarity(signature, unpack_signature(row[2])), row[0], row[1]) for row in rows]
+    scored.sort(key=lambda item: (-item[0], -item[1]))
+    return scored
+
+
+def similar_crashes(conn, crash_id, limit=10, threshold=SIMILAR_THRESHOLD):
+    """The stored crashes most like crash_id, or None if it has no fingerprint"""
+    row = conn.execute("SELECT signature FROM crash_fingerprints WHERE crash_id = ?", (crash_id,)).fetchone()
+    if row is None:
+        return None
+    matches = [match for match in candidates(conn, unpack_signature(row[0]), exclude=crash_id)
+               if match[0] >= threshold][:limit]
+    if not matches:
+        return []
+
+    ids = [match[1] for match in matches]
+    info = {row[0]: row for row in conn.execute(
+        f"SELECT c.id, c.source, c.crash_time, c.target, c.gpu_driver, f.label FROM crashes c "
+        f"JOIN crash_fingerprints f ON f.crash_id = c.id WHERE c.id IN ({', '.join('?' * len(ids))})", ids)}
+    return [{
+        'crash_id': match_id,
+        'similarity': round(score, 3),
+        'cluster_id': cluster_id,
+        'source': info[match_id][1],
+        'crash_time': info[match_id][2],
+        'target': info[match_id][3],
+        'gpu_driver': info[match_id][4],
+        'label': info[match_id][5]
+    } for score, match_id, cluster_id in matches if match_id in info]
+
+
+def crash_groups(conn, since=None, target=None, limit=20):
+    """Crash groups (same failure mode) by size, off the cluster index"""
+    clauses, params = ["(c.exit_code IS NULL OR c.exit_code != 0)"], ()
+    if since is not None:
+        clauses.append("c.crash_time >= ?")
+        params += (since,)
+    if target is not None:
+        clauses.append("c.target = ?")
+        params += (target,)
+
+    rows = conn.execute(
+        f"SELECT f.cluster_id, COUNT(*) AS n, MIN(c.crash_time), MAX(c.crash_time), "
+        f"COUNT(DISTINCT c.gpu_driver), COUNT(DISTINCT c.host) "
+        f"FROM crash_fingerprints f JOIN crashes c ON c.id = f.crash_id "
+        f"WHERE {' AND '.join(clauses)} GROUP BY f.cluster_id ORDER BY n DESC, f.cluster_id LIMIT ?",
+        params + (limit,)).fetchall()
+    if not rows:
+        return []
+    ids = [row[0] for row in rows]
+    labels = dict(conn.execute(
+        f"SELECT crash_id, label FROM crash_fingerprints WHERE crash_id IN ({', '.join('?' * len(ids))})", ids))
+    return [{
+        'group': cluster_id,
+        'crashes': count,
+        'first_time': first,
+        'last_time': last,
+        'drivers': drivers,
+        'hosts': hosts,
+        'label': labels.get(cluster_id)
+    } for cluster_id, count, first, last, drivers, hosts in rows]
+
+
+def crash_group(conn, source):
+    """The group a stored crash fell into: {'group', 'crashes', 'first_time', 'label'}, or None"""
+    row = conn.execute(
+        "SELECT f.cluster_id FROM crashes c JOIN crash_fingerprints f ON f.crash_id = c.id WHERE c.source = ?",
+        (source,)).fetchone()
+    if row is None:
+        return None
+    count, first = conn.execute(
+        "SELECT COUNT(*), MIN(c.crash_time) FROM crash_fingerprints f JOIN crashes c ON c.id = f.crash_id "
+        "WHERE f.cluster_id = ?", (row[0],)).fetchone()
+    label = conn.execute("SELECT label FROM crash_fingerprints WHERE crash_id = ?", (row[0],)).fetchone()
+    return {'group': row[0], 'crashes': count, 'first_time': first, 'label': label[0] if label else None}
+
+
+def _day(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def format_groups(groups):
+    """Human-readable lines for --crash-groups and the Crash History panel"""
+    lines = ["🧬 Recurring crashes"]
+    if not groups:
+        lines.append("  No fingerprinted crashes yet")
+        return lines
+    for row in groups:
+        span = _day(row['first_time'])
+        if _day(row['last_time']) != span:
+            span += f" .. {_day(row['last_time'])}"
+        lines.append(f"  #{row['group']:<6} {row['crashes']:>5} crashes  {span:<24} {row['label'] or ''}")
+    return lines
+
+
+def format_similar(crash_id, matches):
+    lines = [f"🧬 Crashes similar to #{crash_id}"]
+    if not matches:
+        lines.append("  None above the similarity threshold")
+        return lines
+    for row in matches:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['crash_time']))
+        lines.append(f"  #{row['crash_id']:<6} {row['similarity']:>5.0%}  {when}  "
+                     f"group #{row['cluster_id']:<6} {row['label'] or ''}")
+    return lines
@@ -0,0 +1,205 @@
+"""
+Crash analysis rules for BF6 Crash Monitor
+The heuristics behind quick_analysis as declarative tables: event rules are
+keyword lists compiled into one regex, snapshot rules are checks on the
+pre-crash snapshot. Findings are deduplicated and counted.
+"""
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import accumulate
+
+# keywords are lowercase literals searched for in event messages (empty ones
+# are ignored);
+# vendor limits a rule to crashes on that GPU vendor (None = any)
+EventRule = namedtuple('EventRule', ['name', 'keywords', 'issue', 'recommendation', 'vendor'])
+
+# check(facts) -> bool; issue/recommendation are format strings over facts
+# and either may be None
+SnapshotRule = namedtuple('SnapshotRule', ['name', 'check', 'issue', 'recommendation', 'vendor'])
+
+EVENT_RULES = (
+    EventRule('gpu_tdr', ('tdr', 'timeout'),
+              "⚠️ GPU Timeout (TDR) detected", "Increase TDR timeout in registry", None),
+    EventRule('amd_driver', ('amduw', 'atikmdag', 'amdvlk'),
+              "⚠️ AMD driver crash detected", "Clean reinstall AMD drivers with DDU", 'AMD'),
+    EventRule('nvidia_driver', ('nvlddmkm', 'nvidia'),
+              "⚠️ NVIDIA driver crash detected", "Update/rollback NVIDIA drivers", 'NVIDIA'),
+    EventRule('javelin_error', ('eaanticheat', 'javelin'),
+              "⚠️ EA Javelin error detected", "Reinstall EA Javelin anticheat", None),
+)
+
+SNAPSHOT_RULES = (
+    SnapshotRule('hags_enabled', lambda facts: facts['hags_enabled'],
+                 "⚠️ HAGS is ENABLED - disable it!", None, None),
+    SnapshotRule('amd_hags', lambda facts: facts['hags_enabled'],
+                 None, "AMD + HAGS = frequent crashes", 'AMD'),
+    SnapshotRule('javelin_missing', lambda facts: facts['anticheat_running'] is False,
+                 "⚠️ EA Javelin was NOT running", "Game needs EA Javelin to run", None),
+    SnapshotRule('high_ram', lambda facts: facts['ram_percent'] > 90,
+                 "⚠️ High RAM usage: {ram_percent:.0f}%", "Close background apps or add more RAM", None),
+    SnapshotRule('vram_full', lambda facts: (facts['vram_percent'] or 0) >= 95,
+                 "⚠️ VRAM nearly full: {vram_used_mb:.0f} of {vram_total_mb:.0f} MB",
+                 "Lower texture quality or resolution", None),
+    SnapshotRule('gpu_hot', lambda facts: (facts['gpu_temp_c'] or 0) >= 90,
+                 "⚠️ GPU running hot: {gpu_temp_c:.0f}°C", "Check GPU cooling and fan curve", None),
+)
+
+# General tips added after every crash on that vendor
+VENDOR_TIPS = {
+    'AMD': "AMD: Disable Anti-Lag, Boost, Enhanced Sync",
+    'NVIDIA': "NVIDIA: Check for shader cache issues",
+}
+
+
+def keyword_pattern(keywords):
+    """Alternation of literals with shared prefixes factored into a trie
+
+    The regex engine then checks one character class per position instead of
+    trying every keyword in turn, so scan cost stays flat as rules are added.
+    Without keywords the pattern never matches.
+    """
+    trie = {}
+    for keyword in filter(None, keywords):
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = node.get('') is True
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # A keyword ends here but longer ones continue - keep the longest;
+            # CrashRuleEngine credits the shorter ones it contains as a prefix
+            return '(?:' + body + ')?'
+        return body
+
+    # An empty pattern would match at every position
+    return build(trie) or '(?!)'
+
+
+class CrashRuleEngine:
+    """Compiles the rule tables once and applies them to a crash"""
+
+    def __init__(self, event_rules=EVENT_RULES, snapshot_rules=SNAPSHOT_RULES, vendor_tips=None):
+        self.event_rules = {rule.name: rule for rule in event_rules}
+        self.snapshot_rules = tuple(snapshot_rules)
+        self.vendor_tips = VENDOR_TIPS if vendor_tips is None else vendor_tips
+
+        # keyword -> names of the rules it belongs to
+        self.keyword_rules = {}
+        for rule in event_rules:
+            for keyword in filter(None, rule.keywords):
+                self.keyword_rules.setdefault(keyword.lower(), []).append(rule.name)
+        # The matcher reports the longest keyword starting at a position, so
+        # it stands for every keyword that is a prefix of it as well
+        self.match_rules = {}
+        for keyword in self.keyword_rules:
+            self.match_rules[keyword] = {name for prefix, names in self.keyword_rules.items()
+                                         if keyword.startswith(prefix) for name in names}
+        self.matcher = re.compile(keyword_pattern(self.keyword_rules))
+
+    def match_events(self, event_logs):
+        """{rule name: number of events it matched}"""
+        # Floods of identical messages are scanned once
+        messages = {}
+        for event in event_logs:
+            msg = event.get('Message') or ''
+            messages[msg] = messages.get(msg, 0) + 1
+        if not messages:
+            return {}
+
+        # One scan over all distinct messages instead of a regex call per
+        # event; keywords never contain newlines, so matches can't straddle two
+        distinct = list(messages)
+        lowered = [msg.lower() for msg in distinct]
+        starts = [0]
+        starts.extend(accumulate(len(msg) + 1 for msg in lowered))
+
+        text = '\n'.join(lowered)
+        hits = {}
+        for match in self.matcher.finditer(text):
+            index = bisect_right(starts, match.start()) - 1
+            names = hits.setdefault(index, set())
+            names.update(self.match_rules[match.group()])
+            # finditer resumes after the match, so look for keywords starting
+            # inside it too ("outage" in "timeoutage"), and inside those
+            position, end = match.start() + 1, match.end()
+            while position < end:
+                inner = self.matcher.match(text, position)
+                if inner:
+                    names.update(self.match_rules[inner.group()])
+                    end = max(end, inner.end())
+                position += 1
+
+        counts = {}
+        for index, names in hits.items():
+            events = messages[distinct[index]]
+            for name in names:
+                counts[name] = counts.get(name, 0) + events
+        return counts
+
+    def analyze(self, pre_crash, event_logs):
+        """Quick crash analysis"""
+        gpu_info = pre_crash.get('gpu_info') or {}
+        telemetry = pre_crash.get('gpu_telemetry') or {}
+        vram_used, vram_total = telemetry.get('memory_used_mb'), telemetry.get('memory_total_mb')
+        facts = {
+            'gpu_vendor': gpu_info.get('Vendor', 'Unknown'),
+            'hags_enabled': bool(pre_crash.get('hags_enabled')),
+            # None when no anticheat target is configured
+            'anticheat_running': (bool(pre_crash['anticheat_process'])
+                                  if 'anticheat_process' in pre_crash else None),
+            'ram_percent': pre_crash['memory']['percent'],
+            'vram_used_mb': vram_used,
+            'vram_total_mb': vram_total,
+            'vram_percent': vram_used / vram_total * 100 if vram_used is not None and vram_total else None,
+            'gpu_temp_c': telemetry.get('temperature_c'),
+        }
+        vendor = facts['gpu_vendor']
+
+        findings = []
+        for rule in self.snapshot_rules:
+            if rule.vendor not in (None, vendor) or not rule.check(facts):
+                continue
+            findings.append({
+                'rule': rule.name,
+                'issue': rule.issue.format(**facts) if rule.issue else None,
+                'recommendation': rule.recommendation.format(**facts) if rule.recommendation else None,
+                'count': 1
+            })
+
+        counts = self.match_events(event_logs)
+        for name, rule in self.event_rules.items():
+            if name not in counts or rule.vendor not in (None, vendor):
+                continue
+            findings.append({
+                'rule': name,
+                'issue': rule.issue,
+                'recommendation': rule.recommendation,
+                'count': counts[name]
+            })
+
+        issues = []
+        recommendations = []
+        for finding in findings:
+            if finding['issue']:
+                count = finding['count']
+                issues.append(finding['issue'] if count == 1 else f"{finding['issue']} ({count} events)")
+            if finding['recommendation'] and finding['recommendation'] not in recommendations:
+                recommendations.append(finding['recommendation'])
+
+        tip = self.vendor_tips.get(vendor)
+        if tip:
+            recommendations.append(tip)
+
+        return {
+            'issues': issues if issues else ["ℹ️ No obvious issues detected"],
+            'recommendations': recommendations if recommendations else ["Check full crash report for details"],
+            'findings': findings
+        }
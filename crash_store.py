@@ -0,0 +1,619 @@
+"""
+Crash history store for BF6 Crash Monitor
+Every crash report goes into one SQLite database with indexed columns for the
+facts worth querying across crashes (time, GPU driver, HAGS, Javelin, issues)
+and the full report kept as compressed JSON in a separate table, so queries
+over the indexed columns never page through report blobs. Long event log
+messages keep only their changing parts; the rest of the text is a template
+stored once in payloads. Every crash gets a MinHash fingerprint filed under
+LSH buckets (crash_fingerprint.py) for finding similar crashes. An
+aggregator stores every sender's crashes here too, along with a compact row
+per snapshot in host_snapshots.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from crash_fingerprint import (CLUSTER_THRESHOLD, candidates, crash_features, describe, feature_digest,
+                               lsh_buckets, minhash, pack_signature, unpack_signature)
+from crash_rules import EVENT_RULES, SNAPSHOT_RULES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crashes (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    crash_time REAL NOT NULL,
+    gpu_vendor TEXT,
+    gpu_name TEXT,
+    gpu_driver TEXT,
+    hags_enabled INTEGER,
+    javelin_version TEXT,
+    anticheat_running INTEGER,
+    exit_code INTEGER,
+    running_time REAL,
+    ram_percent REAL,
+    rss_slope_mb_per_min REAL,
+    predicted_minutes REAL,
+    target TEXT,
+    host TEXT
+);
+CREATE TABLE IF NOT EXISTS crash_reports (
+    crash_id INTEGER PRIMARY KEY REFERENCES crashes(id),
+    report BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crash_issues (
+    crash_id INTEGER NOT NULL REFERENCES crashes(id),
+    rule TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_crashes_time ON crashes(crash_time);
+CREATE INDEX IF NOT EXISTS idx_crashes_gpu ON crashes(gpu_vendor, gpu_driver);
+CREATE INDEX IF NOT EXISTS idx_crashes_hags ON crashes(hags_enabled);
+CREATE INDEX IF NOT EXISTS idx_crashes_running_time ON crashes(running_time);
+CREATE INDEX IF NOT EXISTS idx_crash_issues_rule ON crash_issues(rule, crash_id);
+CREATE TABLE IF NOT EXISTS payloads (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crash_fingerprints (
+    crash_id INTEGER PRIMARY KEY REFERENCES crashes(id),
+    cluster_id INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    signature BLOB NOT NULL,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_crash_fingerprints_cluster ON crash_fingerprints(cluster_id);
+CREATE TABLE IF NOT EXISTS crash_lsh (
+    bucket INTEGER NOT NULL,
+    crash_id INTEGER NOT NULL,
+    PRIMARY KEY (bucket, crash_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS host_snapshots (
+    host TEXT NOT NULL,
+    snapshot_time REAL NOT NULL,
+    cpu_percent REAL,
+    ram_percent REAL,
+    commit_used_gb REAL,
+    game TEXT,
+    game_memory_mb REAL,
+    game_cpu_percent REAL
+);
+CREATE INDEX IF NOT EXISTS idx_host_snapshots ON host_snapshots(host, snapshot_time);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    snapshots INTEGER NOT NULL DEFAULT 0,
+    last_snapshot BLOB
+);
+"""
+
+ROW_COLUMNS = ('source', 'crash_time', 'gpu_vendor', 'gpu_name', 'gpu_driver', 'hags_enabled',
+               'javelin_version', 'anticheat_running', 'exit_code', 'running_time', 'ram_percent',
+               'rss_slope_mb_per_min', 'predicted_minutes', 'target', 'host')
+
+SNAPSHOT_COLUMNS = ('host', 'snapshot_time', 'cpu_percent', 'ram_percent', 'commit_used_gb',
+                    'game', 'game_memory_mb', 'game_cpu_percent')
+
+# Columns added after the first release, created on databases that lack them
+ADDED_COLUMNS = {
+    'rss_slope_mb_per_min': 'REAL',
+    'predicted_minutes': 'REAL',
+    'target': 'TEXT',
+    'host': 'TEXT',
+}
+
+# Reports saved before multi-target monitoring were all for BF6
+DEFAULT_TARGET = 'bf6'
+
+# Event messages this long or longer are kept in payloads, once per distinct template
+MIN_PAYLOAD = 64
+
+# The parts of a message that change between otherwise identical events:
+# GUIDs, hex values (addresses, offsets, timestamps) and decimal numbers (pids, counts)
+_VARIABLE = re.compile(r"(\{?[0-9A-Fa-f]{8}-(?:[0-9A-Fa-f]{4}-){3}[0-9A-Fa-f]{12}\}?|0[xX][0-9A-Fa-f]+|\d+)")
+
+# Issue text -> rule name, for reports saved before findings were recorded
+_ISSUE_PREFIXES = [(rule.issue.split('{')[0], rule.name)
+                   for rule in SNAPSHOT_RULES + EVENT_RULES if rule.issue]
+
+
+def report_source(report):
+    """Stable name for a report, matching the old crash_report_<time>.json files
+
+    Targets other than BF6 get their name in it, so two titles crashing in
+    the same second don't collide.
+    """
+    target = report.get('target') or DEFAULT_TARGET
+    if target == DEFAULT_TARGET:
+        return f"crash_report_{report.get('crash_time')}.json"
+    return f"crash_report_{target}_{report.get('crash_time')}.json"
+
+
+def report_time(report):
+    exit_info = report.get('game_exit') or {}
+    if exit_info.get('exit_timestamp'):
+        return float(exit_info['exit_timestamp'])
+    try:
+        return datetime.strptime(report.get('crash_time', ''), "%Y%m%d_%H%M%S").timestamp()
+    except ValueError:
+        return time.time()
+
+
+def report_issues(report):
+    """[(rule, count)] from a report's quick analysis"""
+    analysis = report.get('quick_analysis') or {}
+    if 'findings' in analysis:
+        return [(finding['rule'], finding['count']) for finding in analysis['findings']]
+
+    counts = {}
+    for issue in analysis.get('issues', []):
+        for prefix, name in _ISSUE_PREFIXES:
+            if issue.startswith(prefix):
+                counts[name] = counts.get(name, 0) + 1
+                break
+    return list(counts.items())
+
+
+def _flag(value):
+    return None if value is None else int(bool(value))
+
+
+def report_row(report, source=None):
+    """Indexed column values for a report"""
+    snapshot = report.get('pre_crash_snapshot') or {}
+    gpu_info = snapshot.get('gpu_info') or {}
+    javelin = snapshot.get('ea_javelin') or {}
+    exit_info = report.get('game_exit') or {}
+    game = snapshot.get('bf6_process') or {}
+    memory = snapshot.get('memory') or {}
+
+    running_time = exit_info.get('running_time')
+    if running_time is None:
+        running_time = game.get('running_time')
+
+    # The memory trend estimate at crash time, to check predictions against crashes
+    trend = snapshot.get('memory_trend') or {}
+    rss_trend = trend.get('game_rss') or {}
+    predictions = [estimate.get('minutes_to_exhaustion') for estimate in trend.values()
+                   if isinstance(estimate, dict)]
+    predictions = [minutes for minutes in predictions if minutes is not None]
+
+    return {
+        'source': source or report_source(report),
+        'crash_time': report_time(report),
+        'gpu_vendor': gpu_info.get('Vendor'),
+        'gpu_name': gpu_info.get('Name'),
+        'gpu_driver': gpu_info.get('DriverVersion'),
+        'hags_enabled': _flag(snapshot.get('hags_enabled')),
+        'javelin_version': javelin.get('version'),
+        'anticheat_running': (int(bool(snapshot['anticheat_process']))
+                              if 'anticheat_process' in snapshot else None),
+        'exit_code': exit_info.get('exit_code'),
+        'running_time': running_time,
+        'ram_percent': memory.get('percent'),
+        'rss_slope_mb_per_min': rss_trend.get('slope_mb_per_min'),
+        'predicted_minutes': min(predictions) if predictions else None,
+        'target': report.get('target') or DEFAULT_TARGET,
+        'host': report.get('host')
+    }
+
+
+def snapshot_row(host, snapshot, snapshot_time):
+    """host_snapshots column values for a snapshot received from host"""
+    memory = snapshot.get('memory') or {}
+    game = snapshot.get('bf6_process') or {}
+    running = [name for name, status in (snapshot.get('targets') or {}).items()
+               if status.get('running') and status.get('kind') == 'game']
+    return (host, snapshot_time, snapshot.get('cpu_percent'), memory.get('percent'),
+            memory.get('commit_used_gb'), running[0] if running else None,
+            game.get('memory_mb'), game.get('cpu_percent'))
+
+
+def pack_report(report):
+    return zlib.compress(json.dumps(report, separators=(',', ':')).encode('utf-8'))
+
+
+def unpack_report(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def split_payloads(report):
+    """(report with long event messages swapped for a template hash and arguments, {hash: template})
+
+    The same crash logs the same driver and application error text every
+    time, differing only in pids, addresses and ids, so a history of one
+    failure mode holds each message template once. Templates are the
+    message's literal parts joined by NUL; the arguments go between them.
+    """
+    events = report.get('windows_event_logs')
+    if not events:
+        return report, {}
+    payloads = {}
+    digests = {}
+    stored = []
+    for event in events:
+        message = event.get('Message')
+        if isinstance(message, str) and len(message) >= MIN_PAYLOAD and '\0' not in message:
+            parts = _VARIABLE.split(message)
+            template = '\0'.join(parts[0::2])
+            digest = digests.get(template)
+            if digest is None:
+                digest = digests[template] = hashlib.blake2b(template.encode('utf-8'), digest_size=16).digest()
+                payloads[digest] = template
+            event = dict(event, Message=None, message_hash=digest.hex(), message_args=parts[1::2])
+        stored.append(event)
+    return dict(report, windows_event_logs=stored), payloads
+
+
+def join_message(template, args):
+    """The original message from split_payloads() parts"""
+    literals = template.split('\0')
+    return ''.join(literal + arg for literal, arg in zip(literals, args)) + literals[-1]
+
+
+def _chunks(items, size=500):
+    # SQLite builds of Python 3.7 allow 999 parameters per statement
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class CrashStoreError(Exception):
+    """A crash report the store failed to write; the report is kept on the error"""
+
+    def __init__(self, source, report, reason):
+        super().__init__(f"{source} was not stored: {reason}")
+        self.source = source
+        self.report = report
+
+
+class CrashStore:
+    """SQLite crash history with a background writer thread
+
+    save() and update() only queue the report; the writer commits each one
+    in its own transaction, so the caller never waits on disk. The writer
+    also fingerprints each report as it stores it. A failed write is passed
+    to on_error(message) and remembered for write_error(source).
+    """
+
+    def __init__(self, path, on_error=None):
+        self.path = str(path)
+        self.on_error = on_error
+        self.queue = queue.Queue()
+        self.saved = 0
+        self.errors = 0
+        self.fingerprinted = 0
+        # source -> why its latest save or update failed, until write_error() takes it
+        self.failed = {}
+
+        # Create the schema up front so readers can connect immediately
+        conn = self.connect()
+        try:
+            conn.executescript(SCHEMA)
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(crashes)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE crashes ADD COLUMN {column} {column_type}")
+                    if column == 'target':
+                        conn.execute("UPDATE crashes SET target = ?", (DEFAULT_TARGET,))
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_crashes_target ON crashes(target, crash_time)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_crashes_host ON crashes(host, crash_time)")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.thread = threading.Thread(target=self._run, name="CrashStore", daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        """A new connection for reading (one per thread)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # Writing ------------------------------------------------------------
+
+    def save(self, report, source=None, done=None):
+        """Queue a report for storage - never blocks the caller
+
+        done(error), if given, is called on the writer thread once the report
+        is committed (error None) or its write failed.
+        """
+        self.queue.put(('save', (report, source, done)))
+
+    def update(self, report, source=None):
+        """Queue a newer version of a saved report - crash capture saves partial reports as evidence arrives"""
+        self.queue.put(('update', (report, source)))
+
+    def save_snapshots(self, host, rows, latest=None, done=None):
+        """Queue snapshot_row() tuples from one host, plus its newest full snapshot (done as for save())"""
+        self.queue.put(('snapshots', (host, rows, latest, done)))
+
+    def import_reports(self, paths, timeout=None):
+        """Import JSON report files; returns how many were new"""
+        result = {}
+        done = threading.Event()
+        self.queue.put(('import', (list(paths), result, done)))
+        done.wait(timeout)
+        return result.get('imported', 0)
+
+    def fingerprint_missing(self, timeout=None):
+        """Fingerprint crashes stored before fingerprinting existed; returns how many"""
+        result = {}
+        done = threading.Event()
+        self.queue.put(('fingerprint', (result, done)))
+        done.wait(timeout)
+        return result.get('fingerprinted', 0)
+
+    def sync(self, wait=False, timeout=5.0):
+        """Wait until everything queued so far is committed"""
+        done = threading.Event()
+        self.queue.put(('sync', done))
+        if wait:
+            return done.wait(timeout)
+        return True
+
+    def write_error(self, source):
+        """Why the latest save or update of source failed, or None if it was stored
+
+        Only meaningful after sync(wait=True); each failure is returned once.
+        """
+        return self.failed.pop(source, None)
+
+    def close(self, timeout=5.0):
+        self.queue.put(('stop', None))
+        self.thread.join(timeout)
+
+    def _failure(self, action, error, source=None):
+        self.errors += 1
+        reason = f"{type(error).__name__}: {error}"
+        if source is not None:
+            self.failed[source] = reason
+        if self.on_error:
+            self.on_error(f"Crash store failed to {action}: {reason}")
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            pending = None
+            while True:
+                kind, payload = pending or self.queue.get()
+                pending = None
+                if kind == 'save':
+                    report, source, done = payload
+                    source = source or report_source(report)
+                    error = None
+                    try:
+                        with conn:
+                            self._insert(conn, report, source)
+                        self.saved += 1
+                        self.failed.pop(source, None)
+                    except Exception as e:
+                        error = e
+                        self._failure(f"save {source}", e, source)
+                    if done:
+                        done(error)
+                elif kind == 'update':
+                    report, source = payload
+                    source = source or report_source(report)
+                    try:
+                        with conn:
+                            self._replace(conn, report, source)
+                        self.failed.pop(source, None)
+                    except Exception as e:
+                        self._failure(f"update {source}", e, source)
+                elif kind == 'snapshots':
+                    # Batches from many hosts arrive together: commit them in one transaction
+                    batches = [payload]
+                    while len(batches) < 1000:
+                        try:
+                            item = self.queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item[0] != 'snapshots':
+                            pending = item
+                            break
+                        batches.append(item[1])
+                    error = None
+                    try:
+                        with conn:
+                            for host, rows, latest, _ in batches:
+                                self._insert_snapshots(conn, host, rows, latest)
+                    except Exception as e:
+                        error = e
+                        self._failure(f"save {sum(len(batch[1]) for batch in batches)} snapshots", e)
+                    for batch in batches:
+                        if batch[3]:
+                            batch[3](error)
+                elif kind == 'import':
+                    paths, result, done = payload
+                    try:
+                        result['imported'] = self._import(conn, paths)
+                    except Exception as e:
+                        self._failure("import reports", e)
+                    finally:
+                        done.set()
+                elif kind == 'fingerprint':
+                    result, done = payload
+                    try:
+                        result['fingerprinted'] = self._fingerprint_missing(conn)
+                    except Exception as e:
+                        self._failure("fingerprint stored crashes", e)
+                    finally:
+                        done.set()
+                elif kind == 'sync':
+                    payload.set()
+                elif kind == 'stop':
+                    break
+        finally:
+            conn.close()
+
+    def _insert(self, conn, report, source=None):
+        row = report_row(report, source)
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO crashes ({', '.join(ROW_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(ROW_COLUMNS))})",
+            [row[column] for column in ROW_COLUMNS]
+        )
+        if not cursor.rowcount:
+            return False
+        conn.execute("INSERT INTO crash_reports (crash_id, report) VALUES (?, ?)",
+                     (cursor.lastrowid, self._pack(conn, report)))
+        conn.executemany("INSERT INTO crash_issues (crash_id, rule, count) VALUES (?, ?, ?)",
+                         [(cursor.lastrowid, rule, count) for rule, count in report_issues(report)])
+        self._fingerprint(conn, cursor.lastrowid, report)
+        return True
+
+    def _replace(self, conn, report, source=None):
+        """Rewrite a stored crash's row, report and issues in place, or insert it"""
+        row = report_row(report, source)
+        existing = conn.execute("SELECT id FROM crashes WHERE source = ?", (row['source'],)).fetchone()
+        if existing is None:
+            return self._insert(conn, report, source)
+
+        crash_id = existing[0]
+        columns = [column for column in ROW_COLUMNS if column != 'source']
+        conn.execute(f"UPDATE crashes SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                     [row[column] for column in columns] + [crash_id])
+        conn.execute("UPDATE crash_reports SET report = ? WHERE crash_id = ?", (self._pack(conn, report), crash_id))
+        conn.execute("DELETE FROM crash_issues WHERE crash_id = ?", (crash_id,))
+        conn.executemany("INSERT INTO crash_issues (crash_id, rule, count) VALUES (?, ?, ?)",
+                         [(crash_id, rule, count) for rule, count in report_issues(report)])
+        self._fingerprint(conn, crash_id, report)
+        return True
+
+    def _pack(self, conn, report):
+        """The report blob, after storing its long event messages in payloads"""
+        report, payloads = split_payloads(report)
+        if payloads:
+            known = set()
+            for chunk in _chunks(payloads):
+                known.update(row[0] for row in conn.execute(
+                    f"SELECT hash FROM payloads WHERE hash IN ({', '.join('?' * len(chunk))})", chunk))
+            conn.executemany("INSERT OR IGNORE INTO payloads (hash, data) VALUES (?, ?)",
+                             [(digest, zlib.compress(message.encode('utf-8')))
+                              for digest, message in payloads.items() if digest not in known])
+        return pack_report(report)
+
+    def _fingerprint(self, conn, crash_id, report):
+        """Sign the report, file it under its LSH buckets and put it in a group
+
+        A crash joins the group of the most similar crash already stored,
+        or starts its own. Reports updated during capture are re-signed only
+        when their features changed, and a crash others have joined keeps
+        its group so their group id stays valid.
+        """
+        features = crash_features(report)
+        digest = feature_digest(features)
+        old = conn.execute("SELECT cluster_id, digest, signature FROM crash_fingerprints WHERE crash_id = ?",
+                           (crash_id,)).fetchone()
+        if old is not None and old[1] == digest:
+            return
+        signature = minhash(features)
+        if old is not None:
+            conn.executemany("DELETE FROM crash_lsh WHERE bucket = ? AND crash_id = ?",
+                             [(bucket, crash_id) for bucket in lsh_buckets(unpack_signature(old[2]))])
+
+        # Other crashes already joined this one: it stays the head of their group
+        leads = old is not None and old[0] == crash_id and conn.execute(
+            "SELECT 1 FROM crash_fingerprints WHERE cluster_id = ? AND crash_id != ? LIMIT 1",
+            (crash_id, crash_id)).fetchone() is not None
+        cluster_id = crash_id
+        if not leads:
+            # The crashes sharing the most bands are the closest; a few are enough to pick a group
+            best = candidates(conn, signature, exclude=crash_id, limit=20)
+            if best and best[0][0] >= CLUSTER_THRESHOLD:
+                cluster_id = best[0][2]
+
+        conn.execute("INSERT OR REPLACE INTO crash_fingerprints (crash_id, cluster_id, digest, signature, label) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     (crash_id, cluster_id, digest, pack_signature(signature), describe(report, features)))
+        conn.executemany("INSERT OR IGNORE INTO crash_lsh (bucket, crash_id) VALUES (?, ?)",
+                         [(bucket, crash_id) for bucket in lsh_buckets(signature)])
+        self.fingerprinted += 1
+
+    def _fingerprint_missing(self, conn, batch=500):
+        ids = [row[0] for row in conn.execute(
+            "SELECT c.id FROM crashes c LEFT JOIN crash_fingerprints f ON f.crash_id = c.id "
+            "WHERE f.crash_id IS NULL ORDER BY c.id")]
+        for chunk in _chunks(ids, batch):
+            with conn:
+                for crash_id in chunk:
+                    report = self._read_report(conn, crash_id)
+                    if report is not None:
+                        self._fingerprint(conn, crash_id, report)
+        return len(ids)
+
+    def _insert_snapshots(self, conn, host, rows, latest):
+        conn.executemany(
+            f"INSERT INTO host_snapshots ({', '.join(SNAPSHOT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(SNAPSHOT_COLUMNS))})", rows)
+        now = time.time()
+        # Plain INSERT OR IGNORE + UPDATE: UPSERT needs a newer SQLite than some Python 3.7 builds ship
+        conn.execute("INSERT OR IGNORE INTO hosts (host, first_seen, last_seen) VALUES (?, ?, ?)",
+                     (host, now, now))
+        conn.execute(
+            "UPDATE hosts SET last_seen = ?, snapshots = snapshots + ?, "
+            "last_snapshot = COALESCE(?, last_snapshot) WHERE host = ?",
+            (now, len(rows), pack_report(latest) if latest is not None else None, host))
+
+    def _import(self, conn, paths):
+        imported = 0
+        known = {row[0] for row in conn.execute("SELECT source FROM crashes")}
+        with conn:
+            for path in paths:
+                source = os.path.basename(path)
+                if source in known:
+                    continue
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        report = json.load(f)
+                    if self._insert(conn, report, source):
+                        imported += 1
+                except Exception as e:
+                    # Unreadable or hand-edited reports are skipped, not fatal
+                    self._failure(f"import {source}", e)
+        return imported
+
+    # Reading ------------------------------------------------------------
+
+    def load_report(self, crash_id):
+        """The full report for a crash id, or None"""
+        conn = self.connect()
+        try:
+            return self._read_report(conn, crash_id)
+        finally:
+            conn.close()
+
+    def _read_report(self, conn, crash_id):
+        row = conn.execute("SELECT report FROM crash_reports WHERE crash_id = ?", (crash_id,)).fetchone()
+        if row is None:
+            return None
+        report = unpack_report(row[0])
+        events = [event for event in report.get('windows_event_logs') or [] if 'message_hash' in event]
+        if events:
+            messages = {}
+            for chunk in _chunks({bytes.fromhex(event['message_hash']) for event in events}):
+                messages.update((digest, zlib.decompress(data).decode('utf-8')) for digest, data in conn.execute(
+                    f"SELECT hash, data FROM payloads WHERE hash IN ({', '.join('?' * len(chunk))})", chunk))
+            for event in events:
+                template = messages.get(bytes.fromhex(event.pop('message_hash')), '')
+                event['Message'] = join_message(template, event.pop('message_args', []))
+        return report
+
+    def count(self):
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM crashes").fetchone()[0]
+        finally:
+            conn.close()
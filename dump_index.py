@@ -0,0 +1,424 @@
+"""
+Crash dump index for BF6 Crash Monitor
+Keeps a persistent stat index of the minidump and WER folders (CrashDumps,
+ReportArchive/ReportQueue, per-game dump dirs) so each scan only opens what
+changed, and finds the dumps written closest to a crash's exit time
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+from wer_reports import parse_report_wer, read_report_wer, wer_store_paths
+
+DUMP_EXTENSIONS = ('.dmp', '.mdmp', '.hdmp')
+
+# LocalDumps names minidumps <exe>.<pid>.dmp
+_LOCAL_DUMP_NAME = re.compile(r'^(?P<process>.+?\.exe)\.(?P<pid>\d+)\.dmp$', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dump_dirs (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    settled INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    files TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dump_files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    time REAL NOT NULL,
+    process TEXT,
+    pid INTEGER,
+    wer TEXT
+);
+"""
+
+
+def default_dump_roots():
+    """The per-user CrashDumps folder and every WER store, whether or not they exist yet"""
+    roots = []
+    local = os.environ.get('LOCALAPPDATA')
+    if local:
+        roots.append(os.path.join(local, 'CrashDumps'))
+    return roots + wer_store_paths()
+
+
+def file_kind(name):
+    """'minidump', 'wer_report' or None for files the index ignores"""
+    lower = name.lower()
+    if lower == 'report.wer':
+        return 'wer_report'
+    if lower.endswith(DUMP_EXTENSIONS):
+        return 'minidump'
+    return None
+
+
+def _under(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class DumpIndex:
+    """Incremental index of crash dumps and WER reports
+
+    A directory is listed again only when its mtime changed, when it holds
+    subdirectories (a new file deep down doesn't touch its parent's mtime),
+    or while something in it is younger than settle_seconds and may still
+    be written. Settled leaf folders - every WER report folder, after a
+    minute or two - cost nothing on later scans, so a scan's cost follows
+    what changed rather than how many reports the stores hold.
+    """
+
+    def __init__(self, roots, state_path, settle_seconds=120.0, max_depth=4, clock=None):
+        self.roots = []
+        self.state_path = state_path
+        self.settle_seconds = settle_seconds
+        self.max_depth = max_depth
+        self.clock = clock or time.time
+
+        # path -> {'mtime', 'settled', 'subdirs': [names], 'files': [names]}
+        self.dirs = {}
+        # path -> {'kind', 'size', 'mtime', 'time', 'process', 'pid'[, 'wer']}
+        self.files = {}
+        # Sorted (time, path) over self.files for time-window lookups
+        self.timeline = []
+        # Paths added, changed or dropped since the last save; only those rows are written
+        self.changed_dirs = set()
+        self.changed_files = set()
+        self.lock = threading.RLock()
+
+        self.scans = 0
+        self.dirs_listed = 0
+        self.dirs_skipped = 0
+        self.entries_seen = 0
+        self.files_indexed = 0
+        self.last_scan_ms = None
+
+        self.thread = None
+        self.timer = None
+        self._stop_event = threading.Event()
+
+        self.add_roots(roots)
+        self._load_state()
+
+    def add_roots(self, roots):
+        """Watch more folders, e.g. the dump_dirs of the configured targets"""
+        with self.lock:
+            for root in roots:
+                root = os.path.normpath(root)
+                if root not in self.roots:
+                    self.roots.append(root)
+
+    # Background scanning ------------------------------------------------
+
+    def start(self, interval=60.0, timer=None):
+        """Scan in the background so a crash-time scan only sees the last minute
+
+        timer(name, seconds) is called with the duration of every scan.
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        self.timer = timer
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(interval,), name="DumpIndex", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self, interval):
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                self.scan()
+            except Exception:
+                pass
+            if self.timer:
+                self.timer('dump_index_scan', time.perf_counter() - started)
+            self._stop_event.wait(interval)
+
+    # Scanning -----------------------------------------------------------
+
+    def scan(self):
+        """Bring the index up to date with the folders; returns the paths newly indexed"""
+        started = time.perf_counter()
+        with self.lock:
+            added = []
+            for root in self.roots:
+                try:
+                    mtime = os.stat(root).st_mtime
+                except OSError:
+                    # A root that went away (or never existed) holds nothing
+                    if root in self.dirs:
+                        self._forget_dir(root)
+                    continue
+                if os.path.isdir(root):
+                    self._visit(root, mtime, 0, added)
+            if self.changed_dirs or self.changed_files:
+                self._save_state()
+            self.scans += 1
+            self.last_scan_ms = round((time.perf_counter() - started) * 1000, 2)
+            return added
+
+    def _unchanged(self, known, mtime):
+        return known is not None and known['mtime'] == mtime and known['settled'] and not known['subdirs']
+
+    def _visit(self, path, mtime, depth, added):
+        known = self.dirs.get(path)
+        if self._unchanged(known, mtime):
+            self.dirs_skipped += 1
+            return
+
+        self.dirs_listed += 1
+        now = self.clock()
+        young = now - mtime < self.settle_seconds
+        subdirs, files = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    self.entries_seen += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < self.max_depth:
+                                subdirs.append((entry.name, entry.path, entry.stat(follow_symlinks=False).st_mtime))
+                            continue
+                        kind = file_kind(entry.name)
+                        if kind is None or not entry.is_file(follow_symlinks=False):
+                            continue
+                        # Free on Windows, where scandir already returned the stat fields
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    files.append(entry.name)
+                    if now - stat.st_mtime < self.settle_seconds:
+                        young = True
+                    indexed = self.files.get(entry.path)
+                    if indexed is None or indexed['size'] != stat.st_size or indexed['mtime'] != stat.st_mtime:
+                        self._index_file(entry.path, kind, stat)
+                        if indexed is None:
+                            added.append(entry.path)
+        except OSError:
+            self._forget_dir(path)
+            return
+
+        previous = known or {'subdirs': [], 'files': []}
+        for name in set(previous['files']) - set(files):
+            self._forget_file(os.path.join(path, name))
+        for name in set(previous['subdirs']) - {name for name, _, _ in subdirs}:
+            self._forget_dir(os.path.join(path, name))
+
+        record = {'mtime': mtime, 'settled': not young, 'subdirs': sorted(name for name, _, _ in subdirs),
+                  'files': sorted(files)}
+        if record != known:
+            self.dirs[path] = record
+            self.changed_dirs.add(path)
+        # Settled report folders are skipped here, without a call or a path join each:
+        # they are nearly all of a WER store
+        for _, sub_path, sub_mtime in subdirs:
+            if self._unchanged(self.dirs.get(sub_path), sub_mtime):
+                self.dirs_skipped += 1
+            else:
+                self._visit(sub_path, sub_mtime, depth + 1, added)
+
+    def _index_file(self, path, kind, stat):
+        self._forget_file(path)
+        record = {'kind': kind, 'size': stat.st_size, 'mtime': stat.st_mtime, 'time': stat.st_mtime,
+                  'process': None, 'pid': None}
+        if kind == 'wer_report':
+            try:
+                wer = parse_report_wer(read_report_wer(path))
+            except OSError:
+                wer = None
+            if wer:
+                record['wer'] = wer
+                record['process'] = wer['signature'].get('Application Name')
+                # The fault time, not when WER finished writing the folder
+                record['time'] = wer['event_timestamp'] or stat.st_mtime
+        else:
+            match = _LOCAL_DUMP_NAME.match(os.path.basename(path))
+            if match:
+                record['process'] = match.group('process')
+                record['pid'] = int(match.group('pid'))
+        self.files[path] = record
+        insort(self.timeline, (record['time'], path))
+        self.files_indexed += 1
+        self.changed_files.add(path)
+
+    def _forget_file(self, path):
+        record = self.files.pop(path, None)
+        if record is None:
+            return
+        index = bisect_left(self.timeline, (record['time'], path))
+        if index < len(self.timeline) and self.timeline[index] == (record['time'], path):
+            del self.timeline[index]
+        self.changed_files.add(path)
+
+    def _forget_dir(self, path):
+        record = self.dirs.pop(path, None)
+        if record is None:
+            return
+        for name in record['files']:
+            self._forget_file(os.path.join(path, name))
+        for name in record['subdirs']:
+            self._forget_dir(os.path.join(path, name))
+        self.changed_dirs.add(path)
+
+    # Lookups ------------------------------------------------------------
+
+    def near(self, when, process_names=(), pid=None, dirs=(), window=300.0, limit=5):
+        """Indexed dumps and WER reports written within `window` seconds of `when`
+
+        A file counts when its process is one of process_names - from the
+        dump's name, or the Report.wer next to it - or it lies in one of
+        dirs (a game's own dump folder). A dump carrying the crashed pid
+        comes first, the rest by distance from `when`.
+        """
+        names = {name.lower() for name in process_names}
+        dirs = [os.path.normpath(path) for path in dirs]
+        with self.lock:
+            low = bisect_left(self.timeline, (when - window,))
+            high = bisect_right(self.timeline, (when + window, chr(0x10FFFF)))
+            matches = []
+            for at, path in self.timeline[low:high]:
+                record = self.files[path]
+                process = record['process'] or self._folder_process(path)
+                if not ((process and process.lower() in names) or any(_under(path, root) for root in dirs)):
+                    continue
+                matches.append((pid is None or record['pid'] != pid, abs(at - when), path, record, process))
+
+        matches.sort(key=lambda match: match[:3])
+        results = []
+        for _, _, path, record, process in matches[:limit]:
+            result = {
+                'path': path,
+                'kind': record['kind'],
+                'size': record['size'],
+                'time': datetime.fromtimestamp(record['time']).isoformat(timespec='seconds'),
+                'delta_seconds': round(record['time'] - when, 1),
+                'process': process,
+                'pid': record['pid']
+            }
+            if 'wer' in record:
+                result['wer'] = record['wer']
+            results.append(result)
+        return results
+
+    def crash_dumps(self, when, process_names=(), pid=None, dirs=(), window=300.0, limit=5):
+        """Scan, then near() - the crash-time lookup"""
+        self.scan()
+        return self.near(when, process_names, pid, dirs, window, limit)
+
+    def _folder_process(self, path):
+        # Dumps inside a WER report folder belong to the app its Report.wer names
+        report = self.files.get(os.path.join(os.path.dirname(path), 'Report.wer'))
+        return report['process'] if report else None
+
+    def stats(self):
+        return {
+            'roots': len(self.roots),
+            'dirs': len(self.dirs),
+            'files': len(self.files),
+            'scans': self.scans,
+            'dirs_listed': self.dirs_listed,
+            'dirs_skipped': self.dirs_skipped,
+            'entries_seen': self.entries_seen,
+            'files_indexed': self.files_indexed,
+            'last_scan_ms': self.last_scan_ms
+        }
+
+    # Persistence --------------------------------------------------------
+
+    def _load_state(self):
+        """The stat index from the last run, limited to the roots watched now"""
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            conn = sqlite3.connect(self.state_path)
+            try:
+                dirs = conn.execute("SELECT path, mtime, settled, subdirs, files FROM dump_dirs").fetchall()
+                files = conn.execute("SELECT path, kind, size, mtime, time, process, pid, wer FROM dump_files").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return
+
+        def watched(path):
+            return any(_under(path, root) for root in self.roots)
+
+        for path, mtime, settled, subdirs, names in dirs:
+            if watched(path):
+                self.dirs[path] = {'mtime': mtime, 'settled': bool(settled), 'subdirs': json.loads(subdirs),
+                                   'files': json.loads(names)}
+        for path, kind, size, mtime, at, process, pid, wer in files:
+            if watched(path):
+                record = {'kind': kind, 'size': size, 'mtime': mtime, 'time': at, 'process': process, 'pid': pid}
+                if wer:
+                    record['wer'] = json.loads(wer)
+                self.files[path] = record
+        self.timeline = sorted((record['time'], path) for path, record in self.files.items())
+
+    def _save_state(self):
+        """Write the rows that changed since the last save in one transaction"""
+        dir_rows, file_rows = [], []
+        for path in self.changed_dirs:
+            record = self.dirs.get(path)
+            dir_rows.append((path, record and record['mtime'], record and int(record['settled']),
+                             record and json.dumps(record['subdirs']), record and json.dumps(record['files'])))
+        for path in self.changed_files:
+            record = self.files.get(path)
+            file_rows.append((path,) + ((record['kind'], record['size'], record['mtime'], record['time'],
+                                         record['process'], record['pid'],
+                                         json.dumps(record['wer']) if 'wer' in record else None)
+                                        if record else (None,) * 7))
+        try:
+            conn = sqlite3.connect(self.state_path, timeout=10)
+            try:
+                with conn:
+                    conn.executescript(SCHEMA)
+                    conn.executemany("DELETE FROM dump_dirs WHERE path = ?",
+                                     [(row[0],) for row in dir_rows if row[1] is None])
+                    conn.executemany("INSERT OR REPLACE INTO dump_dirs VALUES (?, ?, ?, ?, ?)",
+                                     [row for row in dir_rows if row[1] is not None])
+                    conn.executemany("DELETE FROM dump_files WHERE path = ?",
+                                     [(row[0],) for row in file_rows if row[1] is None])
+                    conn.executemany("INSERT OR REPLACE INTO dump_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     [row for row in file_rows if row[1] is not None])
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # Kept for the next save
+            return
+        self.changed_dirs.clear()
+        self.changed_files.clear()
+
+
+class NullDumpIndex:
+    """No crash dump folders to watch outside Windows"""
+
+    def add_roots(self, roots):
+        pass
+
+    def start(self, interval=60.0, timer=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def scan(self):
+        return []
+
+    def near(self, when, process_names=(), pid=None, dirs=(), window=300.0, limit=5):
+        return []
+
+    def crash_dumps(self, when, process_names=(), pid=None, dirs=(), window=300.0, limit=5):
+        return []
+
+    def stats(self):
+        return None
@@ -0,0 +1,372 @@
+"""
+Incremental Windows Event Log reader for BF6 Crash Monitor
+Follows the Application and System logs with a persistent per-channel
+watermark and keeps recent errors in memory for crash-time analysis
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+CHANNELS = ('Application', 'System')
+
+# Critical, Error, Warning - TDR (Display 4101) and nvlddmkm/amduw entries
+# are often logged as warnings in the System log
+LEVELS = (1, 2, 3)
+
+# Events per channel that go into a crash report, and per provider and event
+# id within that, so a flood of one noisy error can't push out the rest
+REPORT_LIMIT = 50
+REPORT_PER_SOURCE = 5
+
+_DOTNET_DATE = re.compile(r'/?Date\((-?\d+)(?:[+-]\d{4})?\)/?')
+
+
+def parse_event_time(value):
+    """Epoch seconds from PowerShell 5.1 '/Date(ms)/' or PowerShell 7 ISO strings"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        # ConvertTo-Json on a DateTime sometimes nests it as {value, DateTime}
+        return parse_event_time(value.get('value') or value.get('DateTime'))
+
+    text = str(value).strip()
+    match = _DOTNET_DATE.search(text)
+    if match:
+        return int(match.group(1)) / 1000.0
+
+    # Trim .NET's 7-digit fractions so fromisoformat accepts them
+    text = re.sub(r'(\.\d{6})\d+', r'\1', text.replace('Z', '+00:00'))
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.timestamp()
+    return parsed.astimezone(timezone.utc).timestamp()
+
+
+def parse_events(payload, channel):
+    """Normalize Get-WinEvent output into crash-report event dicts"""
+    if not payload:
+        return []
+    if isinstance(payload, dict):
+        payload = [payload]
+
+    events = []
+    for raw in payload:
+        if not isinstance(raw, dict):
+            continue
+        try:
+            record_id = int(raw.get('RecordId'))
+        except (TypeError, ValueError):
+            continue
+
+        timestamp = parse_event_time(raw.get('TimeCreated', raw.get('TimeGenerated')))
+        events.append({
+            'Channel': channel,
+            'RecordId': record_id,
+            'TimeGenerated': datetime.fromtimestamp(timestamp).isoformat() if timestamp else None,
+            'Source': raw.get('ProviderName') or raw.get('Source'),
+            'EventID': raw.get('Id', raw.get('EventID')),
+            'Level': raw.get('LevelDisplayName') or raw.get('Level'),
+            'Message': raw.get('Message') or '',
+            'timestamp': timestamp
+        })
+
+    events.sort(key=lambda event: event['RecordId'])
+    return events
+
+
+def cap_events(events, limit=REPORT_LIMIT, per_source=REPORT_PER_SOURCE):
+    """The newest events, at most per_source of one provider and event id and limit in all (oldest first)"""
+    kept = []
+    seen = {}
+    for event in reversed(events):
+        key = (event.get('Source'), event.get('EventID'))
+        if seen.get(key, 0) >= per_source:
+            continue
+        seen[key] = seen.get(key, 0) + 1
+        kept.append(event)
+        if len(kept) >= limit:
+            break
+    kept.reverse()
+    return kept
+
+
+def build_query(channel, after_record, batch_size):
+    """Oldest-first batch of records newer than the watermark"""
+    levels = " or ".join(f"Level={level}" for level in LEVELS)
+    xpath = f"*[System[({levels}) and EventRecordID > {int(after_record)}]]"
+    return (f"Get-WinEvent -LogName '{channel}' -FilterXPath '{xpath}' -Oldest "
+            f"-MaxEvents {int(batch_size)} -ErrorAction SilentlyContinue | "
+            "Select-Object RecordId, TimeCreated, ProviderName, Id, LevelDisplayName, Message")
+
+
+def build_backfill_query(channel, count):
+    """Newest records, used the first time a channel is read"""
+    levels = " or ".join(f"Level={level}" for level in LEVELS)
+    return (f"Get-WinEvent -LogName '{channel}' -FilterXPath '*[System[({levels})]]' "
+            f"-MaxEvents {int(count)} -ErrorAction SilentlyContinue | "
+            "Select-Object RecordId, TimeCreated, ProviderName, Id, LevelDisplayName, Message")
+
+
+def build_newest_record_query(channel):
+    return (f"Get-WinEvent -LogName '{channel}' -MaxEvents 1 -ErrorAction SilentlyContinue | "
+            "Select-Object RecordId")
+
+
+class EventLogReader:
+    """Reads only new event log records and serves recent ones from memory
+
+    Watermarks are saved to state_path after every background poll that
+    moved them; the window goes to a second file at most every
+    window_save_interval seconds and on stop(). Crash-time reads never
+    write either.
+    """
+
+    def __init__(self, shell, state_path, channels=CHANNELS, batch_size=200, max_batches=5,
+                 backfill=50, window_seconds=3600, window_max=5000, query_timeout=10.0,
+                 window_save_interval=300.0):
+        self.shell = shell
+        self.state_path = state_path
+        self.window_path = f"{os.path.splitext(state_path)[0]}_window.json"
+        self.channels = tuple(channels)
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.backfill = backfill
+        self.window_seconds = window_seconds
+        self.query_timeout = query_timeout
+        self.window_save_interval = window_save_interval
+
+        # One window per channel: each is filled in record order, so its
+        # oldest event is always on the left for trimming and eviction
+        self.windows = {channel: deque(maxlen=window_max) for channel in self.channels}
+        self.watermarks = {}
+        self.dirty = False
+        self.window_dirty = False
+        self.window_saved_at = time.monotonic()
+        self._load_state()
+        # lock guards the windows and watermarks; each channel's queries run
+        # under its own lock so two channels can be read at the same time
+        self.lock = threading.Lock()
+        self.channel_locks = {channel: threading.Lock() for channel in self.channels}
+        # The poll thread and stop() can save at the same time
+        self.save_lock = threading.Lock()
+        self.polls = 0
+        self.records_read = 0
+
+        self.thread = None
+        self.timer = None
+        self._stop_event = threading.Event()
+
+    # Background polling -------------------------------------------------
+
+    def start(self, interval=30.0, timer=None):
+        """Poll in the background so crash-time lookups are already warm
+
+        timer(name, seconds) is called with the duration of every poll.
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        self.timer = timer
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(interval,),
+                                       name="EventLogReader", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.save_state(window=True)
+
+    def _run(self, interval):
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            try:
+                self.poll()
+            except Exception:
+                pass
+            if self.timer:
+                self.timer('event_log_poll', time.perf_counter() - started)
+            self._stop_event.wait(interval)
+
+    # Reading ------------------------------------------------------------
+
+    def poll(self, catch_up=False):
+        """Fetch new records from every channel in bounded batches
+
+        catch_up reads a single batch per channel and skips the cleared-log
+        check, keeping the crash-time path to one query per channel.
+        """
+        for channel in self.channels:
+            self._poll_channel(channel, catch_up)
+        with self.lock:
+            self._trim_window()
+            self.polls += 1
+        if not catch_up:
+            self.save_state(window=time.monotonic() - self.window_saved_at >= self.window_save_interval)
+
+    def _poll_channel(self, channel, catch_up):
+        with self.channel_locks[channel]:
+            if channel not in self.watermarks:
+                self._backfill(channel)
+            elif catch_up:
+                self._read_new(channel, max_batches=1, check_cleared=False)
+            else:
+                self._read_new(channel, self.max_batches, check_cleared=True)
+
+    def _backfill(self, channel):
+        events = parse_events(self.shell.query(build_backfill_query(channel, self.backfill),
+                                               timeout=self.query_timeout), channel)
+        self._add(channel, events)
+        if channel not in self.watermarks:
+            # Empty log - start from whatever the newest record is
+            newest = self._newest_record(channel)
+            with self.lock:
+                self.watermarks[channel] = {'record_id': newest or 0, 'time': None}
+                self.dirty = True
+
+    def _read_new(self, channel, max_batches, check_cleared):
+        for _ in range(max_batches):
+            after = self.watermarks[channel]['record_id']
+            payload = self.shell.query(build_query(channel, after, self.batch_size),
+                                       timeout=self.query_timeout)
+            events = parse_events(payload, channel)
+            if not events:
+                if not check_cleared:
+                    return
+                # A cleared log restarts record numbering below our watermark
+                newest = self._newest_record(channel)
+                if newest is not None and newest < after:
+                    with self.lock:
+                        self.watermarks[channel] = {'record_id': 0, 'time': None}
+                        self.dirty = True
+                    continue
+                return
+            self._add(channel, events)
+            if len(events) < self.batch_size:
+                return
+
+    def _newest_record(self, channel):
+        result = self.shell.query(build_newest_record_query(channel), timeout=self.query_timeout)
+        try:
+            return int(result[0]['RecordId']) if result else None
+        except (TypeError, ValueError, KeyError):
+            return None
+
+    def _add(self, channel, events):
+        if not events:
+            return
+        newest = events[-1]
+        with self.lock:
+            self.windows[channel].extend(events)
+            self.records_read += len(events)
+            self.watermarks[channel] = {'record_id': newest['RecordId'], 'time': newest['timestamp']}
+            self.dirty = True
+            self.window_dirty = True
+
+    def _trim_window(self):
+        cutoff = time.time() - self.window_seconds
+        for window in self.windows.values():
+            while window and (window[0]['timestamp'] or 0) < cutoff:
+                window.popleft()
+                self.window_dirty = True
+
+    def recent(self, minutes=10, now=None, channels=None, limit=None):
+        """Events from the in-memory windows newer than `minutes` ago
+
+        With a limit, each channel is capped by cap_events().
+        """
+        cutoff = (now or time.time()) - minutes * 60
+        events = []
+        with self.lock:
+            for channel, window in self.windows.items():
+                if channels is not None and channel not in channels:
+                    continue
+                found = [event for event in window if (event['timestamp'] or 0) >= cutoff]
+                if limit is not None:
+                    found = cap_events(found, limit)
+                events.extend(dict(event) for event in found)
+        events.sort(key=lambda event: event['timestamp'] or 0)
+        return events
+
+    def check_windows_event_logs(self, limit=REPORT_LIMIT):
+        """Catch up on new records, then answer from memory"""
+        try:
+            self.poll(catch_up=True)
+        except Exception:
+            pass
+        return self.recent(minutes=10, limit=limit)
+
+    def check_channel(self, channel, minutes=10, limit=REPORT_LIMIT):
+        """Catch up on one channel only, then answer its recent events from memory
+
+        Crash capture reads the channels in parallel through this.
+        """
+        if channel in self.channel_locks:
+            try:
+                self._poll_channel(channel, catch_up=True)
+            except Exception:
+                pass
+        return self.recent(minutes=minutes, channels=(channel,), limit=limit)
+
+    # Persistence --------------------------------------------------------
+
+    def _load_state(self):
+        """Watermarks plus the saved window, so a restart neither re-reads nor forgets"""
+        state = self._read_json(self.state_path)
+        self.watermarks = {channel: mark for channel, mark in state.get('watermarks', {}).items()
+                           if isinstance(mark, dict) and 'record_id' in mark}
+        # State files from before the split kept the window next to the watermarks
+        saved = self._read_json(self.window_path).get('window', state.get('window', []))
+        for event in sorted((event for event in saved if isinstance(event, dict) and 'timestamp' in event),
+                            key=lambda event: (event['timestamp'] or 0, event.get('RecordId') or 0)):
+            if event.get('Channel') in self.windows:
+                self.windows[event['Channel']].append(event)
+        self._trim_window()
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def save_state(self, window=False):
+        """Write the watermarks if they moved, and the window too if asked and it changed"""
+        with self.save_lock:
+            self._save_state(window)
+
+    def _save_state(self, window):
+        with self.lock:
+            watermarks = dict(self.watermarks) if self.dirty else None
+            events = ([event for channel_window in self.windows.values() for event in channel_window]
+                      if window and self.window_dirty else None)
+            self.dirty = False
+            if events is not None:
+                self.window_dirty = False
+                self.window_saved_at = time.monotonic()
+        # Written outside the lock, so lookups never wait on disk
+        if watermarks is not None and not self._write_json(self.state_path, {'watermarks': watermarks}):
+            self.dirty = True
+        if events is not None and not self._write_json(self.window_path, {'window': events}):
+            self.window_dirty = True
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            return False
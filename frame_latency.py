@@ -0,0 +1,65 @@
+"""
+Frame latency tracking for BF6 Crash Monitor
+Measures how late Tk event loop callbacks run compared to their schedule
+"""
+
+import time
+
+FRAME_BUDGET_MS = 16.0
+
+
+class FrameLatencyMonitor:
+    """Heartbeat on the Tk event loop that records callback lateness"""
+
+    def __init__(self, root, interval_ms=16, budget_ms=FRAME_BUDGET_MS, keep=1000):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.keep = keep
+        self.samples = []
+        self.max_ms = 0.0
+        self.over_budget = 0
+        self.frames = 0
+        self.running = False
+        self._expected = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._schedule()
+
+    def stop(self):
+        self.running = False
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        if not self.running:
+            return
+
+        late_ms = max(0.0, (time.perf_counter() - self._expected) * 1000)
+        self.frames += 1
+        self.max_ms = max(self.max_ms, late_ms)
+        if late_ms > self.budget_ms:
+            self.over_budget += 1
+
+        self.samples.append(late_ms)
+        if len(self.samples) > self.keep:
+            del self.samples[:len(self.samples) - self.keep]
+
+        self._schedule()
+
+    def stats(self):
+        """Summary of recent frame lateness in milliseconds"""
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0
+        return {
+            'frames': self.frames,
+            'max_ms': round(self.max_ms, 2),
+            'p99_ms': round(p99, 2),
+            'over_budget': self.over_budget,
+            'budget_ms': self.budget_ms
+        }
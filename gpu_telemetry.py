@@ -0,0 +1,227 @@
+"""
+GPU telemetry for BF6 Crash Monitor
+Utilization, VRAM, clocks, temperature and power from one long-running query
+process, parsed line by line on a reader thread so a snapshot only copies
+the newest reading
+"""
+
+import json
+import subprocess
+import threading
+import time
+
+from shell_worker import powershell_argv
+
+# Per-GPU readings every backend fills in as far as it can; missing ones are None
+TELEMETRY_FIELDS = ('utilization_percent', 'memory_used_mb', 'memory_total_mb', 'core_clock_mhz',
+                    'memory_clock_mhz', 'temperature_c', 'power_w')
+
+NVIDIA_QUERY = ('index', 'name', 'driver_version', 'utilization.gpu', 'memory.used', 'memory.total',
+                'clocks.gr', 'clocks.mem', 'temperature.gpu', 'power.draw')
+
+# WDDM performance counters work for any vendor but carry no clocks,
+# temperature or power - AMD only exposes those through its SDK
+WDDM_COUNTER_SCRIPT = r"""
+$ErrorActionPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+$counters = '\GPU Engine(*engtype_3D)\Utilization Percentage', '\GPU Adapter Memory(*)\Dedicated Usage'
+Get-Counter -Counter $counters -SampleInterval __INTERVAL__ -Continuous | ForEach-Object {
+    $util = 0; $vram = 0
+    foreach ($s in $_.CounterSamples) {
+        if ($s.Path -like '*utilization percentage') { $util += $s.CookedValue }
+        elseif ($s.CookedValue -gt $vram) { $vram = $s.CookedValue }
+    }
+    $out = @{ utilization_percent = [Math]::Min(100, $util); memory_used_mb = $vram / 1MB }
+    [Console]::Out.WriteLine(($out | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+
+def nvidia_smi_argv(interval_ms=500, executable='nvidia-smi'):
+    """One nvidia-smi that prints a CSV line per GPU every interval_ms"""
+    return [executable, '--query-gpu=' + ','.join(NVIDIA_QUERY), '--format=csv,noheader,nounits',
+            f'--loop-ms={interval_ms}']
+
+
+def wddm_counter_argv(interval_seconds=1):
+    """PowerShell streaming the WDDM GPU counters as JSON lines (Get-Counter samples whole seconds)"""
+    return powershell_argv(WDDM_COUNTER_SCRIPT.replace('__INTERVAL__', str(max(1, int(interval_seconds)))))
+
+
+def _number(text):
+    # nvidia-smi prints [N/A] or [Not Supported] for sensors a board lacks
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_nvidia_smi_line(line):
+    """A reading from one line of nvidia_smi_argv() output, None for anything else"""
+    parts = [part.strip() for part in line.split(',')]
+    if len(parts) != len(NVIDIA_QUERY) or not parts[0].isdigit():
+        return None
+    reading = {'index': int(parts[0]), 'name': parts[1], 'driver_version': parts[2]}
+    for field, text in zip(TELEMETRY_FIELDS, parts[3:]):
+        reading[field] = _number(text)
+    return reading
+
+
+def parse_json_line(line):
+    """A reading from one JSON line of the counter script, None for anything else"""
+    try:
+        values = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(values, dict):
+        return None
+    reading = {'index': int(values.get('index') or 0)}
+    for field in TELEMETRY_FIELDS:
+        reading[field] = _number(values.get(field))
+    return reading
+
+
+class GpuTelemetry:
+    """Latest readings from one long-running query process
+
+    A reader thread parses each line as it arrives; latest() copies the
+    newest reading and never waits. The process is restarted with back-off
+    when it exits, and readings older than stale_after count as missing,
+    so a hung query never shows frozen values.
+    """
+
+    def __init__(self, argv, parse_line, backend, stale_after=5.0, max_backoff=60.0, clock=None):
+        self.argv = argv
+        self.parse_line = parse_line
+        self.backend = backend
+        self.stale_after = stale_after
+        self.max_backoff = max_backoff
+        self.clock = clock or time.monotonic
+
+        self.readings = {}
+        self.lines = 0
+        self.bad_lines = 0
+        self.restarts = 0
+        self.last_error = None
+        self.proc = None
+        self.thread = None
+        self.timer = None
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def start(self, timer=None):
+        """Start the query process on a reader thread
+
+        timer(name, seconds) receives the parse time of every line.
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        self.timer = timer
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="GpuTelemetry", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self._stop_event.set()
+        proc = self.proc
+        if proc is not None:
+            try:
+                proc.terminate()
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            except OSError:
+                pass
+
+    def latest(self):
+        """The newest reading of the main GPU, or None when there is no fresh one
+
+        With several GPUs the one with the most VRAM is the one reported,
+        which is the discrete card the game runs on.
+        """
+        now = self.clock()
+        with self.lock:
+            fresh = [(at, reading) for at, reading in self.readings.values() if now - at <= self.stale_after]
+        if not fresh:
+            return None
+        at, reading = max(fresh, key=lambda item: (item[1].get('memory_total_mb') or 0, -item[1]['index']))
+        result = dict(reading)
+        result['backend'] = self.backend
+        result['gpu_count'] = len(fresh)
+        result['age_seconds'] = round(now - at, 3)
+        return result
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'running': self.proc is not None and self.proc.poll() is None,
+            'lines': self.lines,
+            'bad_lines': self.bad_lines,
+            'restarts': self.restarts,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            started = self.clock()
+            try:
+                self.proc = subprocess.Popen(
+                    self.argv,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',
+                    bufsize=1,
+                    creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+                )
+            except OSError as e:
+                self.last_error = str(e)
+            else:
+                self._read(self.proc)
+                self.proc.wait()
+                self.last_error = f"query process exited with code {self.proc.returncode}"
+            if self._stop_event.is_set():
+                break
+
+            # A process that ran for a while is restarted at once; one that
+            # keeps dying right away is retried less and less often
+            backoff = 1.0 if self.clock() - started > 60 else min(self.max_backoff, backoff * 2)
+            self.restarts += 1
+            self._stop_event.wait(backoff)
+
+    def _read(self, proc):
+        for line in proc.stdout:
+            parse_started = time.perf_counter()
+            reading = self.parse_line(line)
+            if reading is None:
+                # Banners, blank lines and driver warnings
+                if line.strip():
+                    self.bad_lines += 1
+                continue
+            self.lines += 1
+            with self.lock:
+                self.readings[reading['index']] = (self.clock(), reading)
+            if self.timer:
+                self.timer('gpu_telemetry_line', time.perf_counter() - parse_started)
+
+
+class NullGpuTelemetry:
+    """No telemetry source on this machine"""
+
+    backend = None
+
+    def start(self, timer=None):
+        pass
+
+    def close(self):
+        pass
+
+    def latest(self):
+        return None
+
+    def stats(self):
+        return None
@@ -0,0 +1,112 @@
+"""
+Activity Log view for BF6 Crash Monitor
+A ScrolledText capped at a line count and fed in one batch per frame
+"""
+
+import threading
+from collections import deque
+
+import tkinter as tk
+from tkinter import scrolledtext
+
+LEVEL_COLORS = {
+    'INFO': '#00ff00',
+    'WARNING': '#ffaa00',
+    'CRITICAL': '#ff0000',
+    'ERROR': '#ff0000'
+}
+
+
+def coalesce(batch, max_lines):
+    """Turn queued (message, level) pairs into insert() arguments
+
+    Returns (args, added): alternating text/tag arguments with consecutive
+    messages of the same level merged into one chunk, and the number of
+    lines they add. Messages that would be trimmed straight away are dropped.
+    """
+    if len(batch) > max_lines:
+        batch = batch[-max_lines:]
+
+    args = []
+    added = 0
+    chunk = []
+    chunk_level = None
+    for message, level in batch:
+        added += message.count('\n')
+        if level != chunk_level and chunk:
+            args.extend(("".join(chunk), chunk_level))
+            chunk = []
+        chunk.append(message)
+        chunk_level = level
+    if chunk:
+        args.extend(("".join(chunk), chunk_level))
+    return args, added
+
+
+class BoundedLogView:
+    """Log widget that drops its oldest lines and coalesces inserts
+
+    post() may be called from any thread. Messages are queued and inserted
+    at most once per frame with a single scroll per batch.
+    """
+
+    def __init__(self, parent, max_lines=5000, frame_ms=16, poll_ms=100, **text_options):
+        self.max_lines = max_lines
+        self.frame_ms = frame_ms
+        self.poll_ms = poll_ms
+        self.pending = deque()
+        self.line_count = 0
+        self.scheduled = False
+        self.batches = 0
+
+        self.text = scrolledtext.ScrolledText(parent, **text_options)
+        for level, color in LEVEL_COLORS.items():
+            self.text.tag_config(level, foreground=color)
+
+        # Picks up messages posted from background threads, which can't
+        # touch Tk themselves
+        self.text.after(self.poll_ms, self._poll)
+
+    def pack(self, **options):
+        self.text.pack(**options)
+
+    def post(self, message, level="INFO"):
+        """Queue a complete log line (ending in a newline) for display"""
+        self.pending.append((message, level))
+        if not self.scheduled and threading.current_thread() is threading.main_thread():
+            self.scheduled = True
+            self.text.after(self.frame_ms, self.flush)
+
+    def clear(self):
+        self.pending.clear()
+        self.text.delete('1.0', tk.END)
+        self.line_count = 0
+
+    def _poll(self):
+        if self.pending and not self.scheduled:
+            self.flush()
+        try:
+            self.text.after(self.poll_ms, self._poll)
+        except tk.TclError:
+            pass
+
+    def flush(self):
+        """Insert everything queued so far in one call"""
+        self.scheduled = False
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        if not batch:
+            return
+
+        args, added = coalesce(batch, self.max_lines)
+        self.text.insert(tk.END, *args)
+        self.line_count += added
+
+        excess = self.line_count - self.max_lines
+        if excess > 0:
+            self.text.delete('1.0', f'{excess + 1}.0')
+            self.line_count -= excess
+
+        self.text.see(tk.END)
+        self.batches += 1
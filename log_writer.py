@@ -0,0 +1,171 @@
+"""
+Buffered log writer for BF6 Crash Monitor
+Keeps the daily log file open on a background thread and writes in batches
+"""
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+class BufferedLogWriter:
+    """Background writer with time/size flushing and daily/size rotation
+
+    Files are named monitor_YYYYMMDD.log; once a file reaches max_bytes the
+    writer continues in monitor_YYYYMMDD_1.log, monitor_YYYYMMDD_2.log, ...
+    A batch that can't be written is dropped and counted in lines_dropped;
+    on_error(message) hears when writes start failing and when they recover,
+    not about every batch in between.
+    """
+
+    def __init__(self, log_dir, prefix="monitor", flush_interval=1.0, flush_lines=200,
+                 flush_bytes=64 * 1024, max_bytes=10 * 1024 * 1024, on_error=None):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+
+        self.queue = queue.Queue()
+        self.file = None
+        self.file_day = None
+        self.file_part = 0
+        self.file_size = 0
+        self.lines_written = 0
+        self.lines_dropped = 0
+        self.on_error = on_error
+        # Lines dropped since the last batch that was written
+        self._dropping = 0
+
+        self.thread = threading.Thread(target=self._run, name="BufferedLogWriter", daemon=True)
+        self.thread.start()
+
+    def write(self, line):
+        """Queue a line for writing - never blocks the caller"""
+        self.queue.put(('line', line))
+
+    def sync(self, wait=False, timeout=2.0):
+        """Flush everything queued so far and fsync it to disk"""
+        done = threading.Event()
+        self.queue.put(('sync', done))
+        if wait:
+            return done.wait(timeout)
+        return True
+
+    def close(self, timeout=2.0):
+        """Flush, fsync and close the file, then stop the thread"""
+        self.queue.put(('stop', None))
+        self.thread.join(timeout)
+
+    def path_for(self, day, part):
+        suffix = f"_{part}" if part else ""
+        return os.path.join(self.log_dir, f"{self.prefix}_{day}{suffix}.log")
+
+    def _run(self):
+        pending = []
+        pending_bytes = 0
+        last_flush = time.monotonic()
+
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                kind, payload = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                kind, payload = None, None
+
+            if kind == 'line':
+                pending.append(payload)
+                pending_bytes += len(payload)
+                # Keep batching until a size threshold or the flush interval hits
+                if (len(pending) < self.flush_lines and pending_bytes < self.flush_bytes
+                        and time.monotonic() - last_flush < self.flush_interval):
+                    continue
+
+            if pending:
+                try:
+                    self._write_batch(pending)
+                except OSError as e:
+                    self._drop(pending, e)
+                else:
+                    self._resumed()
+                pending = []
+                pending_bytes = 0
+            last_flush = time.monotonic()
+
+            if kind == 'sync':
+                self._fsync()
+                payload.set()
+            elif kind == 'stop':
+                self._fsync()
+                if self.file:
+                    self.file.close()
+                    self.file = None
+                return
+
+    def _write_batch(self, lines):
+        data = "".join(lines)
+        size = len(data.encode('utf-8'))
+        self._rotate_if_needed(size)
+        self.file.write(data)
+        self.file.flush()
+        self.file_size += size
+        self.lines_written += len(lines)
+
+    def _drop(self, lines, error):
+        self.lines_dropped += len(lines)
+        first = not self._dropping
+        self._dropping += len(lines)
+        # The file may be half-written or gone; the next batch reopens it
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+        if first and self.on_error:
+            self.on_error(f"Log file write failed, dropping lines until it works again: "
+                          f"{type(error).__name__}: {error}")
+
+    def _resumed(self):
+        if self._dropping and self.on_error:
+            self.on_error(f"Log file writes resumed; {self._dropping} lines were dropped")
+        self._dropping = 0
+
+    def _rotate_if_needed(self, incoming):
+        day = datetime.now().strftime('%Y%m%d')
+
+        if self.file is not None and day == self.file_day:
+            if self.file_size + incoming <= self.max_bytes or self.file_size == 0:
+                return
+            self.file.close()
+            self.file = None
+            self.file_part += 1
+        elif self.file is not None:
+            self.file.close()
+            self.file = None
+            self.file_part = 0
+
+        if self.file_day != day:
+            self.file_day = day
+            self.file_part = 0
+
+        # Skip parts that are already full from an earlier run today
+        path = self.path_for(day, self.file_part)
+        while os.path.exists(path) and os.path.getsize(path) + incoming > self.max_bytes:
+            self.file_part += 1
+            path = self.path_for(day, self.file_part)
+
+        self.file = open(path, 'a', encoding='utf-8')
+        self.file_size = os.path.getsize(path)
+
+    def _fsync(self):
+        if self.file is None:
+            return
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError:
+            pass
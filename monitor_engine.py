@@ -0,0 +1,838 @@
+"""
+Monitoring engine for BF6 Crash Monitor
+All detection and reporting logic, with no GUI dependency
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import psutil
+
+from platform_backends import default_backends
+from process_scanner import ProcessScanner
+from snapshot_sampler import SnapshotSampler
+from probe_scheduler import ProbeScheduler, IDLE, GAME
+from probe_registry import ProbeRegistry, FileMtimeTrigger
+from process_watcher import ProcessWatcher
+from sample_ring import SampleRing, PreCrashRecorder
+from trend_predictor import MemoryTrendMonitor
+from self_metrics import SelfMetrics
+from targets import load_targets, role_target
+from log_writer import BufferedLogWriter
+from crash_rules import CrashRuleEngine
+from crash_store import CrashStore, CrashStoreError, report_source
+from crash_fingerprint import crash_group
+from crash_capture import CrashCapture, capture_summary, OK
+from event_log_reader import CHANNELS
+
+
+class MonitorEngine:
+    """Watches for BF6, detects crashes and writes reports
+
+    Subscribers registered with subscribe() are called from engine threads
+    as callback(event, payload). Events:
+      'log'          {'message', 'level', 'line'}
+      'snapshot'     the snapshot dict
+      'game_started' the BF6 process info
+      'crash_progress' {'source', 'target', 'collector', 'status', 'done', 'total'}
+                     while a crash's evidence is collected ('started' first)
+      'crash'        {'source', 'report'} once it is complete
+      'monitoring'   True / False
+    """
+
+    def __init__(self, backends=None, log_dir="crash_logs", targets=None):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(exist_ok=True)
+
+        # The monitor's own cost: probe latency histograms, CPU and RSS
+        self.self_metrics = SelfMetrics()
+
+        # Watched games and helpers, each with its own running and crash state
+        self.targets = targets if targets is not None else load_targets()
+
+        self.backends = backends or default_backends(str(self.log_dir))
+        # Games' own dump folders are indexed next to CrashDumps and the WER stores
+        self.backends.dump_index.add_roots(path for target in self.targets.values() for path in target.dump_dirs)
+        self.backends.start(timer=self.self_metrics.record)
+        self.log_writer = BufferedLogWriter(str(self.log_dir),
+                                            on_error=lambda message: self.log(message, "WARNING"))
+        self.crash_store = CrashStore(self.log_dir / "crash_history.db",
+                                      on_error=lambda message: self.log(message, "ERROR"))
+        self.anticheat_path = r"C:\Program Files\EA\AC"
+        # Seconds between runs per scheduler mode; None runs a probe on demand only.
+        # Idle mode only looks for a game launch, game mode samples densely
+        self.probe_intervals = {
+            'launch_check': {IDLE: 1.0, GAME: None},
+            'snapshot': {IDLE: 10.0, GAME: 1.0},
+            'pre_crash': {IDLE: None, GAME: 0.25},
+            'gpu_info': {IDLE: 300.0, GAME: 300.0},
+            'self_metrics': {IDLE: 5.0, GAME: 5.0},
+            'hags_enabled': {IDLE: None, GAME: None}
+        }
+        self.pre_crash_seconds = 60
+        self.pre_crash_interval = 0.25
+
+        # Monitoring state
+        self.monitoring = False
+        self.crash_count = 0
+        self.initial_snapshot_logged = False
+        self.gpu_logged = False
+        self.sampler = None
+        self.recorder = None
+        self.scheduler = None
+        self.dispatch_thread = None
+        self.subscribers = []
+
+        process_table = self.backends.process_table
+
+        # One table walk per tick for every target's names, PIDs cached between ticks
+        self.process_scanner = ProcessScanner(
+            {name: target.processes for name, target in self.targets.items()},
+            process_iter=process_table.process_iter, timer=self.self_metrics.record)
+
+        # Last minute of 250 ms samples, written into crash reports
+        self.sample_ring = SampleRing(int(self.pre_crash_seconds / self.pre_crash_interval))
+
+        # Static system facts are cached instead of re-collected every snapshot
+        self.probe_registry = ProbeRegistry()
+        self.register_probes()
+
+        # Crash heuristics, compiled once
+        self.crash_rules = CrashRuleEngine()
+
+        # Online RSS / free memory / commit trends with time-to-exhaustion
+        self.memory_trends = MemoryTrendMonitor()
+
+        # Crash evidence is collected in parallel under one deadline, each
+        # crash on its own thread so the dispatch loop never waits on it
+        self.capture_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="CrashCapture")
+        self.crash_capture = CrashCapture(self.capture_pool, deadline=15.0, timer=self.self_metrics.record)
+        self.capture_threads = []
+        self.crash_lock = threading.Lock()
+        # Sources saved this session; the store keys reports by source
+        self.report_sources = set()
+
+    # ------------------------------------------------------------------
+    # Targets
+    # ------------------------------------------------------------------
+
+    def game_targets(self):
+        return [target for target in self.targets.values() if target.is_game]
+
+    @property
+    def primary_game(self):
+        """The first game in the config; its exits are what handle_game_exit reports"""
+        return self.game_targets()[0]
+
+    @property
+    def anticheat_target(self):
+        """The target with role 'anticheat', or None when the config has none"""
+        return role_target(self.targets, 'anticheat')
+
+    @property
+    def bf6_running(self):
+        """True while any watched game runs"""
+        return any(target.running for target in self.game_targets())
+
+    def set_primary_processes(self, snapshot):
+        """Fill the bf6_process/anticheat_process keys the rules, store and GUI read
+
+        bf6_process is the running game that the pre-crash ring follows,
+        falling back to the first game in the config. Returns that game's
+        target, or None when no game runs.
+        """
+        processes = snapshot['processes']
+        game = followed = None
+        if self.recorder and processes.get(self.recorder.game_group):
+            followed = self.targets.get(self.recorder.game_group)
+            game = processes[self.recorder.game_group]
+        for target in self.game_targets():
+            if game is None and processes.get(target.name):
+                followed, game = target, processes[target.name]
+        snapshot['bf6_process'] = game
+        anticheat = self.anticheat_target
+        if anticheat:
+            snapshot['anticheat_process'] = processes.get(anticheat.name)
+        else:
+            # Nothing to check Javelin against, so no "not running" warnings
+            snapshot.pop('anticheat_process', None)
+        return followed
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback):
+        """Call callback(event, payload) for every engine event"""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, event, payload):
+        for callback in list(self.subscribers):
+            try:
+                callback(event, payload)
+            except Exception:
+                pass
+
+    def events(self, timeout=None):
+        """Iterate over (event, payload) pairs; stops after timeout seconds idle"""
+        pending = queue.Queue()
+        callback = lambda event, payload: pending.put((event, payload))
+        self.subscribe(callback)
+        try:
+            while True:
+                try:
+                    yield pending.get(timeout=timeout)
+                except queue.Empty:
+                    return
+        finally:
+            self.unsubscribe(callback)
+
+    def log(self, message, level="INFO"):
+        """Log a message to the file and to subscribers (safe from any thread)"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_msg = f"[{timestamp}] [{level}] {message}\n"
+
+        # Write to file (batched on the writer thread)
+        self.log_writer.write(log_msg)
+
+        self.emit('log', {'message': message, 'level': level, 'line': log_msg})
+
+    # ------------------------------------------------------------------
+    # Probes
+    # ------------------------------------------------------------------
+
+    def register_probes(self):
+        """Register cached probes for facts that rarely change"""
+        game_service = os.path.join(self.anticheat_path, "EAAntiCheat.GameService.exe")
+
+        # While monitoring, GPU and HAGS are only collected on the scheduler's
+        # background lane; snapshots peek at the last value (None until the
+        # first run) so a slow CIM or registry read never delays one
+        self.probe_registry.register('gpu_info', self.backends.gpu.get_gpu_info)
+        self.probe_registry.register('ea_javelin', self.check_ea_javelin_installation,
+                                     ttl=600, triggers=[FileMtimeTrigger(game_service)])
+        self.probe_registry.register('hags_enabled', self.backends.registry.check_hardware_accelerated_gpu_scheduling)
+        self.background_probes = ('gpu_info', 'hags_enabled')
+
+    def refresh_probes(self):
+        """Re-collect cached probe values in the background, or on the next snapshot"""
+        if self.scheduler:
+            self.probe_registry.invalidate('ea_javelin')
+            self.scheduler.trigger('gpu_info')
+            self.scheduler.trigger('hags_enabled')
+        else:
+            self.probe_registry.invalidate()
+        self.log("🔄 Cached GPU/Javelin/HAGS info will be refreshed", "INFO")
+
+    def check_ea_javelin_installation(self):
+        """Check if EA Javelin anticheat is properly installed"""
+        try:
+            javelin_info = {
+                'installed': False,
+                'path': None,
+                'version': None,
+                'service_exists': False
+            }
+
+            if os.path.exists(self.anticheat_path):
+                javelin_info['installed'] = True
+                javelin_info['path'] = self.anticheat_path
+
+                game_service = os.path.join(self.anticheat_path, "EAAntiCheat.GameService.exe")
+                if os.path.exists(game_service):
+                    javelin_info['service_exists'] = True
+                    javelin_info['version'] = self.backends.file_info.file_version(game_service)
+
+            return javelin_info
+        except Exception as e:
+            return None
+
+    def get_system_snapshot(self):
+        """Get current system state snapshot"""
+        # Get CPU usage (non-blocking, uses previous interval). The sampler's
+        # prime call seeds the counter, so a blocking retry here would only
+        # stall the scheduler whenever the system is truly idle
+        timed = self.self_metrics.timed
+        with timed('system_stats'):
+            cpu_percent = psutil.cpu_percent(interval=None)
+            mem = psutil.virtual_memory()
+
+        snapshot = {
+            'timestamp': datetime.now().isoformat(),
+            'cpu_percent': cpu_percent,
+            'memory': {
+                'total_gb': mem.total / 1024**3,
+                'available_gb': mem.available / 1024**3,
+                'used_gb': mem.used / 1024**3,
+                'percent': mem.percent,
+                'commit_used_gb': None,
+                'commit_limit_gb': None
+            },
+            'bf6_process': None,
+            'anticheat_process': None
+        }
+
+        # Cache hits are timed too - a miss shows up as a slow outlier.
+        # Without a running scheduler (one-off snapshots) every probe is
+        # collected here
+        background = self.background_probes if self.scheduler else ()
+        for name in ('gpu_info', 'ea_javelin', 'hags_enabled'):
+            with timed(name):
+                if name in background:
+                    snapshot[name] = self.probe_registry.peek(name)
+                else:
+                    snapshot[name] = self.probe_registry.get(name)
+
+        # Live load, VRAM, clocks and temperature from the telemetry stream's newest line
+        with timed('gpu_telemetry'):
+            snapshot['gpu_telemetry'] = self.backends.gpu_telemetry.latest()
+
+        with timed('commit_charge'):
+            commit = self.backends.memory.commit_charge()
+        if commit:
+            snapshot['memory']['commit_used_gb'] = commit[0] / 1024**3
+            snapshot['memory']['commit_limit_gb'] = commit[1] / 1024**3
+
+        # Every target's processes in a single scan
+        with timed('process_scan'):
+            snapshot['processes'] = self.process_scanner.scan()
+        self.set_primary_processes(snapshot)
+
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Crash analysis and reports
+    # ------------------------------------------------------------------
+
+    def check_windows_event_logs(self):
+        """Check Windows Event Logs for recent crashes"""
+        with self.self_metrics.timed('event_log'):
+            return self.backends.event_log.check_windows_event_logs()
+
+    def analyze_crash(self, pre_crash, event_logs):
+        """Quick crash analysis"""
+        return self.crash_rules.analyze(pre_crash, event_logs)
+
+    def capture_gpu_state(self):
+        """Telemetry at the crash plus a fresh adapter query - a TDR can leave the adapter reset or gone"""
+        telemetry = self.backends.gpu_telemetry
+        return {
+            'telemetry': telemetry.latest(),
+            'telemetry_stats': telemetry.stats(),
+            'adapter': self.probe_registry.refresh('gpu_info')
+        }
+
+    def crash_collectors(self, target, exit_info):
+        """(name, collect) pairs for crash capture; each name is also its report key"""
+        crashed_at = exit_info['exit_timestamp'] if exit_info else time.time()
+        event_log = self.backends.event_log
+        collectors = [(f"event_log_{channel.lower()}", partial(event_log.check_channel, channel))
+                      for channel in CHANNELS]
+        collectors += [
+            # WER writes its report folder while the process is still being torn down
+            ('crash_dumps', lambda: self.backends.dump_index.crash_dumps(
+                crashed_at, target.processes, exit_info['pid'] if exit_info else None, target.dump_dirs)),
+            ('gpu_state', self.capture_gpu_state),
+            ('pre_crash_window', self.sample_ring.to_report)
+        ]
+        return collectors
+
+    def claim_source(self, report):
+        """A store source for the report that no other report this session has
+
+        Sources have one-second resolution: a second report for the same
+        target in that second would otherwise overwrite the first.
+        """
+        source = report_source(report)
+        with self.crash_lock:
+            base, number = source[:-len('.json')], 2
+            while source in self.report_sources:
+                source = f"{base}_{number}.json"
+                number += 1
+            self.report_sources.add(source)
+        return source
+
+    def save_clean_exit(self, target, snapshot, exit_info):
+        """Store a game's normal quit without evidence, so analytics counts its play time"""
+        report = {
+            'target': target.name,
+            'target_label': target.label,
+            'crash_time': datetime.fromtimestamp(exit_info['exit_timestamp']).strftime("%Y%m%d_%H%M%S"),
+            'game_exit': exit_info,
+            'pre_crash_snapshot': snapshot
+        }
+        self.crash_store.save(report, self.claim_source(report))
+
+    def save_crash_report(self, pre_crash_data, exit_info=None, target=None):
+        """Save crash report
+
+        The report is stored at once with what the snapshot holds, then
+        updated as each collector finishes; it is complete when this returns.
+        Raises CrashStoreError, carrying the report, if the store could not
+        write the finished report.
+        """
+        target = target or self.primary_game
+        with self.crash_lock:
+            self.crash_count += 1
+            crash_number = self.crash_count
+
+        # In a report, bf6_process is always the process of the game that crashed
+        if pre_crash_data.get('processes'):
+            pre_crash_data = dict(pre_crash_data, bf6_process=pre_crash_data['processes'].get(target.name))
+        crashed_at = datetime.fromtimestamp(exit_info['exit_timestamp']) if exit_info else datetime.now()
+        crash_time = crashed_at.strftime("%Y%m%d_%H%M%S")
+
+        report = {
+            'crash_number': crash_number,
+            'target': target.name,
+            'target_label': target.label,
+            'crash_time': crash_time,
+            'game_exit': exit_info,
+            'pre_crash_snapshot': pre_crash_data,
+            'pre_crash_window': None,
+            'windows_event_logs': [],
+            'crash_dumps': [],
+            'gpu_state': None,
+            # Snapshot rules only until the event logs are in
+            'quick_analysis': self.analyze_crash(pre_crash_data, []),
+            'capture': {},
+            'capture_complete': False,
+            'probe_cache': self.probe_registry.stats(),
+            'scheduler': self.scheduler.stats() if self.scheduler else None,
+            'monitor_overhead': self.self_metrics.report()
+        }
+
+        # Queued for the store's writer thread - the crash path never waits on disk.
+        # Every save gets its own shallow copy, since the report keeps changing
+        source = self.claim_source(report)
+        self.crash_store.save(dict(report), source)
+
+        collectors = self.crash_collectors(target, exit_info)
+        progress = {'source': source, 'target': target.name, 'total': len(collectors)}
+        self.emit('crash_progress', dict(progress, collector=None, status='started', done=0))
+        channel_events = {}
+
+        def on_result(name, outcome):
+            report['capture'] = dict(report['capture'], **capture_summary({name: outcome}))
+            if outcome['status'] == OK:
+                if name.startswith('event_log_'):
+                    channel_events[name] = outcome['value'] or []
+                    report['windows_event_logs'] = sorted(
+                        (event for events in channel_events.values() for event in events),
+                        key=lambda event: event.get('timestamp') or 0)
+                else:
+                    report[name] = outcome['value']
+            self.crash_store.update(dict(report), source)
+            self.emit('crash_progress', dict(progress, collector=name, status=outcome['status'],
+                                             done=len(report['capture'])))
+
+        self.crash_capture.run(collectors, on_result)
+
+        report['quick_analysis'] = self.analyze_crash(pre_crash_data, report['windows_event_logs'])
+        report['capture_complete'] = all(outcome['status'] == OK for outcome in report['capture'].values())
+        self.crash_store.update(report, source)
+
+        # Only now wait for the writer, so a report the store lost doesn't pass for saved
+        if not self.crash_store.sync(wait=True):
+            raise CrashStoreError(source, report, "the store did not finish writing in time")
+        error = self.crash_store.write_error(source)
+        if error:
+            raise CrashStoreError(source, report, error)
+
+        return source, report
+
+    # ------------------------------------------------------------------
+    # Monitoring loop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the probe scheduler and dispatch threads"""
+        if self.monitoring:
+            return
+
+        self.monitoring = True
+        self.initial_snapshot_logged = False
+        self.gpu_logged = False
+        self.log("🚀 Monitor started - waiting for BF6...", "INFO")
+
+        # The scheduler collects snapshots and pre-crash samples, the
+        # dispatch thread applies them
+        self.sampler = SnapshotSampler(self.get_system_snapshot,
+                                       prime=lambda: psutil.cpu_percent(interval=1))
+        anticheat = self.anticheat_target
+        self.recorder = PreCrashRecorder(self.sample_ring, self.process_scanner, game_group=self.primary_game.name,
+                                         anticheat_group=anticheat.name if anticheat else None,
+                                         process_factory=self.backends.process_table.process,
+                                         gpu_telemetry=self.backends.gpu_telemetry)
+        self.scheduler = self.build_scheduler(self.sampler, self.recorder)
+        self.scheduler.start()
+
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, args=(self.sampler,),
+                                                name="MonitorDispatch", daemon=True)
+        self.dispatch_thread.start()
+        self.emit('monitoring', True)
+
+    def stop(self):
+        """Stop monitoring"""
+        if not self.monitoring:
+            return
+
+        self.monitoring = False
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+        # Let a snapshot being applied finish before its targets are reset
+        if self.dispatch_thread and self.dispatch_thread is not threading.current_thread():
+            self.dispatch_thread.join(2.0)
+        # A new start() sees every running process as a fresh launch,
+        # not as the exit or continuation of what was followed before
+        for target in self.targets.values():
+            target.reset()
+        self.memory_trends.reset_game()
+
+        self.log("⏸ Monitoring stopped", "WARNING")
+        self.emit('monitoring', False)
+
+    def close(self):
+        """Stop monitoring, shut down platform helpers and flush the log and crash store"""
+        self.stop()
+        # A crash still being captured gets to finish its report
+        for thread in self.capture_threads:
+            thread.join(self.crash_capture.deadline)
+        self.capture_pool.shutdown(wait=False)
+        self.backends.close()
+        self.crash_store.close()
+        self.log_writer.close()
+
+    def build_scheduler(self, sampler, recorder):
+        """Register every periodic probe with its interval, priority and budget"""
+        scheduler = ProbeScheduler(mode=GAME if self.bf6_running else IDLE,
+                                   on_run=lambda name, seconds: self.self_metrics.record(f"scheduled.{name}", seconds))
+        intervals = self.probe_intervals
+
+        scheduler.add('pre_crash', recorder.sample, intervals['pre_crash'], priority=3, budget=0.05)
+        scheduler.add('snapshot', sampler.sample, intervals['snapshot'], priority=2, budget=0.5)
+        scheduler.add('launch_check', lambda: self.check_game_launch(scheduler),
+                      intervals['launch_check'], priority=1, budget=0.1)
+
+        # Slow, rarely changing facts go to the background lane, which also
+        # collects their first values
+        scheduler.add('gpu_info', self.refresh_gpu_info, intervals['gpu_info'], budget=10.0, background=True)
+        scheduler.add('self_metrics', self.self_metrics.sample_process, intervals['self_metrics'], budget=0.05)
+        scheduler.add('hags_enabled', lambda: self.probe_registry.refresh('hags_enabled'),
+                      intervals['hags_enabled'], budget=2.0, background=True)
+        if self.probe_registry.peek('hags_enabled') is None:
+            scheduler.trigger('hags_enabled')
+        return scheduler
+
+    def refresh_gpu_info(self):
+        """Background lane: re-query the adapter, logging it once per monitoring session"""
+        gpu = self.probe_registry.refresh('gpu_info')
+        if gpu and not self.gpu_logged:
+            self.gpu_logged = True
+            self.log(f"GPU: {gpu.get('Name', 'Unknown')}", "INFO")
+            self.log(f"Driver: {gpu.get('DriverVersion', 'Unknown')}", "INFO")
+
+    def check_game_launch(self, scheduler):
+        """Idle-mode probe: only look for a game, snapshot at once when one appears"""
+        processes = self.process_scanner.scan()
+        for target in self.game_targets():
+            info = processes.get(target.name)
+            if info and target.exited != target.identity(info):
+                scheduler.set_mode(GAME)
+                scheduler.trigger('snapshot')
+                return
+
+    def _dispatch_loop(self, sampler):
+        while self.monitoring and sampler is self.sampler:
+            item = sampler.get(timeout=0.5)
+            if item is None:
+                continue
+            kind, payload = item
+            if kind == 'snapshot':
+                self.apply_snapshot(payload)
+            elif kind == 'game_exit':
+                self.handle_target_exit(self.targets[payload['target']], payload)
+            elif kind == 'watch_failed':
+                self.handle_watch_failed(self.targets[payload['target']], payload)
+            elif kind == 'error':
+                self.log(f"Error collecting system info: {payload}", "ERROR")
+
+    def apply_snapshot(self, snapshot):
+        """Run every target's state machine on a snapshot"""
+        try:
+            if not self.initial_snapshot_logged:
+                self.initial_snapshot_logged = True
+                self.log_initial_snapshot(snapshot)
+
+            # Debug: Check if we got valid data
+            if snapshot['cpu_percent'] == 0.0 and snapshot['memory']['percent'] == 0.0:
+                self.log("⚠️ Debug: Getting zero values from psutil", "WARNING")
+
+            # A snapshot collected just before an exit event can still list
+            # the process that already exited
+            processes = snapshot['processes']
+            for target in self.targets.values():
+                info = processes.get(target.name)
+                if info and target.exited == target.identity(info):
+                    processes[target.name] = None
+            followed = self.set_primary_processes(snapshot)
+
+            for target in self.targets.values():
+                info = processes.get(target.name)
+                if info:
+                    if not target.running:
+                        self.handle_target_start(target, info, snapshot)
+                    target.info = info
+                    if target.is_game:
+                        target.last_snapshot = snapshot
+                elif target.running and target.watcher is None:
+                    # The watcher reports exits itself; polling only decides
+                    # when there is no process handle to wait on
+                    self.handle_target_exit(target, None)
+
+            # A launch_check hit that turned out not to be a new game drops back to idle
+            if self.scheduler and not self.bf6_running:
+                self.scheduler.set_mode(IDLE)
+
+            # Trend estimates ride along in the snapshot, and so in crash reports
+            snapshot['memory_trend'] = self.memory_trends.update(snapshot, followed.label if followed else None)
+            for warning in self.memory_trends.pending_warnings:
+                self.log(f"📈 {warning}", "WARNING")
+
+            snapshot['targets'] = {name: target.status() for name, target in self.targets.items()}
+            self.emit('snapshot', snapshot)
+
+        except Exception as e:
+            self.log(f"Error updating system info: {e}", "ERROR")
+            self.log(f"Traceback: {traceback.format_exc()}", "ERROR")
+
+    def handle_target_start(self, target, info, snapshot):
+        """A watched process appeared"""
+        target.running = True
+        target.exited = None
+        if target.watch_exit:
+            self.watch_target(target, info)
+
+        if not target.is_game:
+            self.log(f"✓ {target.label} started: {info['name']} (PID: {info['pid']})", "INFO")
+            return
+
+        self.log("═" * 50, "INFO")
+        self.log(f"🎮 {target.label} DETECTED - Monitoring active!", "INFO")
+        self.log("═" * 50, "INFO")
+
+        self.log(f"Process: {info['name']} (PID: {info['pid']})", "INFO")
+        if info['memory_mb'] is not None:
+            self.log(f"Memory: {info['memory_mb']:.0f}MB", "INFO")
+
+        if snapshot.get('anticheat_process'):
+            ac = snapshot['anticheat_process']
+            self.log(f"✓ EA Javelin: {ac['name']} running", "INFO")
+        elif 'anticheat_process' in snapshot:
+            self.log("⚠️ WARNING: EA Javelin NOT running!", "WARNING")
+
+        if snapshot.get('hags_enabled'):
+            self.log("⚠️ WARNING: HAGS is ENABLED - may cause crashes!", "WARNING")
+
+        # The pre-crash ring follows one game; keep it on a game that is still running
+        current = self.targets.get(self.recorder.game_group) if self.recorder else None
+        if self.recorder and (current is None or current is target or not current.running):
+            self.recorder.game_group = target.name
+        if self.scheduler:
+            self.scheduler.set_mode(GAME)
+            self.scheduler.trigger('hags_enabled')
+        self.emit('game_started', dict(info, target=target.name))
+
+    def watch_target(self, target, info):
+        """Wait on the process in the background to catch its exit instantly"""
+        if target.watcher:
+            target.watcher.cancel()
+            target.watcher = None
+        if info['create_time'] is None:
+            # Without its start time a reused PID can't be told apart - poll instead
+            self.log(f"Can't wait on {target.label} (PID: {info['pid']}, no start time) "
+                     f"- checking for its exit every snapshot", "WARNING")
+            return
+        sampler = self.sampler
+        name = target.name
+        target.watcher = ProcessWatcher(info['pid'], info['create_time'],
+                                        lambda exit_info: sampler.put('game_exit', dict(exit_info, target=name)),
+                                        process_factory=self.backends.process_table.process,
+                                        on_error=lambda watcher, error: sampler.put('watch_failed', {
+                                            'target': name, 'pid': watcher.pid, 'error': type(error).__name__}))
+        target.watcher.start()
+
+    def handle_watch_failed(self, target, failure):
+        """The watcher couldn't open the process - snapshots poll for its exit from now on"""
+        if not target.watcher or target.watcher.pid != failure['pid']:
+            return
+        target.watcher = None
+        self.log(f"Can't wait on {target.label} (PID: {failure['pid']}, {failure['error']}) "
+                 f"- checking for its exit every snapshot", "WARNING")
+
+    def handle_target_exit(self, target, exit_info):
+        """A watched process exited - a non-zero exit code is a crash: games get a report, helpers a log line"""
+        if not target.running:
+            return
+        if exit_info and target.watcher and exit_info['pid'] != target.watcher.pid:
+            return
+
+        target.running = False
+        target.exit_count += 1
+        if target.watcher:
+            target.exited = (target.watcher.pid, target.watcher.create_time)
+            target.watcher = None
+        elif target.info:
+            target.exited = target.identity(target.info)
+
+        exit_code = exit_info['exit_code'] if exit_info else None
+        code_text = f"0x{exit_code & 0xFFFFFFFF:08X}" if exit_code is not None else "unknown"
+
+        if target.is_game:
+            if self.scheduler and not self.bf6_running:
+                self.scheduler.set_mode(IDLE)
+            if self.recorder and self.recorder.game_group == target.name:
+                running = [game for game in self.game_targets() if game.running]
+                if running:
+                    self.recorder.game_group = running[0].name
+
+        if exit_code is None or exit_code == 0:
+            # Exit code 0 is a normal quit. Without a code (polling noticed
+            # the exit) a crash can't be told from quitting, so it isn't one
+            if exit_code == 0:
+                self.log(f"{target.label} exited normally", "INFO")
+                if target.is_game:
+                    self.save_clean_exit(target, target.last_snapshot, exit_info)
+            else:
+                self.log(f"{target.label} exited (exit code unknown - not counted as a crash)", "INFO")
+            target.last_snapshot = None
+            self.emit('target_exit', {'target': target.name, 'exit': exit_info})
+            return
+
+        if not target.is_game:
+            target.crash_count += 1
+            self.log(f"⚠️ {target.label} exited unexpectedly (exit code: {code_text})", "WARNING")
+            self.emit('target_exit', {'target': target.name, 'exit': exit_info})
+            return
+
+        # The game just crashed
+        target.crash_count += 1
+        self.log("═" * 50, "CRITICAL")
+        self.log(f"💥 {target.label} CRASHED!", "CRITICAL")
+        self.log("═" * 50, "CRITICAL")
+        self.log_writer.sync()
+
+        self.log(f"Exit time: {exit_info['exit_time']} | Exit code: {code_text}", "CRITICAL")
+
+        if target.last_snapshot:
+            # Evidence capture can take up to its deadline; snapshots and the
+            # other targets keep being handled meanwhile
+            thread = threading.Thread(target=self.report_crash, args=(target, target.last_snapshot, exit_info),
+                                      name=f"CrashReport-{target.name}", daemon=True)
+            self.capture_threads = [alive for alive in self.capture_threads if alive.is_alive()] + [thread]
+            thread.start()
+
+        target.last_snapshot = None
+        self.log_writer.sync()
+
+    def report_crash(self, target, snapshot, exit_info):
+        """Capture, save and log one crash report (runs on its own thread)"""
+        stored = True
+        try:
+            source, report = self.save_crash_report(snapshot, exit_info, target)
+        except CrashStoreError as e:
+            # Still report the crash, and keep it where --import-reports can pick it up
+            source, report, stored = e.source, e.report, False
+            self.log(f"Error saving crash report: {e}", "ERROR")
+            self.save_report_file(source, report)
+        except Exception as e:
+            self.log(f"Error saving crash report: {e}", "ERROR")
+            return
+
+        analysis = report['quick_analysis']
+
+        self.log(f"\n🔍 Issues Found:", "WARNING")
+        for issue in analysis['issues']:
+            self.log(f"  {issue}", "WARNING")
+
+        self.log(f"\n💡 Recommendations:", "INFO")
+        for rec in analysis['recommendations']:
+            self.log(f"  • {rec}", "INFO")
+
+        missing = [f"{name} ({outcome['status']})" for name, outcome in report['capture'].items()
+                   if outcome['status'] != OK]
+        if missing:
+            self.log(f"⚠️ Evidence missing from the report: {', '.join(missing)}", "WARNING")
+
+        if stored:
+            group = self.recurring_group(source)
+            if group and group['crashes'] > 1:
+                first = datetime.fromtimestamp(group['first_time']).strftime('%Y-%m-%d')
+                self.log(f"🧬 Seen before: {group['crashes'] - 1} earlier crash(es) look like this one "
+                         f"(group #{group['group']}, first on {first})", "WARNING")
+            self.log(f"\n💾 Full report saved: {source} in {Path(self.crash_store.path).name}", "INFO")
+        self.log("═" * 50, "INFO")
+
+        self.emit('crash', {'source': source, 'report': report})
+        self.log_writer.sync()
+
+    def save_report_file(self, source, report):
+        """Write a report the crash store couldn't take as JSON in the log folder"""
+        path = self.log_dir / source
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=str)
+            self.log(f"💾 Report kept in {path} - load it later with --import-reports", "WARNING")
+        except Exception as e:
+            self.log(f"Error writing {path}: {e}", "ERROR")
+
+    def recurring_group(self, source):
+        """The crash group a saved report joined, once the store has fingerprinted it"""
+        if not self.crash_store.sync(wait=True):
+            return None
+        conn = self.crash_store.connect()
+        try:
+            return crash_group(conn, source)
+        except Exception:
+            return None
+        finally:
+            conn.close()
+
+    def handle_game_exit(self, exit_info):
+        """The primary game exited (exit_info from its watcher, or None when polling noticed)"""
+        self.handle_target_exit(self.primary_game, exit_info)
+
+    def log_initial_snapshot(self, snapshot):
+        """Log system details from the first snapshot after starting (the GPU is logged by refresh_gpu_info)"""
+        telemetry = self.backends.gpu_telemetry
+        if telemetry.backend:
+            self.log(f"GPU telemetry: {telemetry.backend}", "INFO")
+
+        javelin = snapshot.get('ea_javelin') or {}
+        if javelin.get('installed'):
+            self.log(f"✓ EA Javelin installed: {javelin.get('path')}", "INFO")
+            if javelin.get('version'):
+                self.log(f"  Version: {javelin['version']}", "INFO")
+        else:
+            self.log("⚠️ EA Javelin NOT installed!", "WARNING")
+
+        if snapshot.get('hags_enabled'):
+            self.log("⚠️ WARNING: HAGS is enabled - may cause crashes!", "WARNING")
+
+        # Log system resources
+        self.log(f"System: CPU {snapshot['cpu_percent']:.1f}% | RAM {snapshot['memory']['percent']:.1f}% ({snapshot['memory']['used_gb']:.1f}GB used)", "INFO")
+
+        self.log("─" * 50, "INFO")
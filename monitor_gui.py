@@ -0,0 +1,445 @@
+"""
+Battlefield 6 Crash Monitor - GUI
+Tkinter front end that subscribes to a MonitorEngine and repaints its status
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+import tkinter as tk
+from tkinter import messagebox
+
+from crash_analytics import crash_analytics, format_analytics
+from crash_fingerprint import crash_groups, format_groups
+from self_metrics import format_overhead
+from monitor_engine import MonitorEngine
+from platform_backends import is_admin
+from frame_latency import FrameLatencyMonitor
+from log_view import BoundedLogView
+from startup_trace import StartupTrace
+
+def drain_events(events):
+    """Empty a queue of (event, payload) pairs without blocking
+
+    Returns (latest_snapshot, others): only the newest snapshot needs
+    painting, every other event is kept in arrival order.
+    """
+    latest_snapshot = None
+    others = []
+    while True:
+        try:
+            event, payload = events.get_nowait()
+        except queue.Empty:
+            return latest_snapshot, others
+        if event == 'snapshot':
+            latest_snapshot = payload
+        else:
+            others.append((event, payload))
+
+
+class BF6CrashMonitorGUI:
+    def __init__(self, root, engine=None):
+        self.root = root
+        self.root.title("BF6 Crash Monitor - AMD/NVIDIA GPU Edition")
+        self.root.geometry("900x700")
+        self.root.configure(bg='#1e1e1e')
+        
+        self.engine = engine or MonitorEngine()
+        self.log_max_lines = 5000
+        self.startup_trace = StartupTrace()
+        self.pending_probes = set()
+        self.history_window = None
+        self.history_text = None
+        self.overhead_window = None
+        self.overhead_text = None
+        
+        # Engine events arrive on engine threads; Tk work happens in the drain
+        self.ui_events = queue.Queue()
+        
+        self.setup_ui()
+        self.engine.subscribe(self.on_engine_event)
+        self.root.bind('<Expose>', self.on_first_paint, add='+')
+        self.start_initial_probes()  # Fill in initial values as they arrive
+        
+        # Track how late Tk callbacks run so GUI stalls are measurable
+        self.frame_latency = FrameLatencyMonitor(self.root)
+        self.frame_latency.start()
+        self.root.after(100, self.process_engine_events)
+        
+    def setup_ui(self):
+        """Setup the GUI layout"""
+        # Title
+        title_frame = tk.Frame(self.root, bg='#1e1e1e')
+        title_frame.pack(fill='x', padx=10, pady=10)
+        
+        title = tk.Label(title_frame, text="🎮 Battlefield 6 Crash Monitor", 
+                        font=('Arial', 18, 'bold'), bg='#1e1e1e', fg='#00ff00')
+        title.pack()
+        
+        subtitle = tk.Label(title_frame, text="AMD & NVIDIA GPU + Windows 11 Edition", 
+                           font=('Arial', 10), bg='#1e1e1e', fg='#888888')
+        subtitle.pack()
+        
+        # Status Frame
+        status_frame = tk.LabelFrame(self.root, text="System Status", 
+                                     bg='#2e2e2e', fg='white', font=('Arial', 10, 'bold'))
+        status_frame.pack(fill='x', padx=10, pady=5)
+        
+        # Create grid for status info
+        self.status_labels = {}
+        status_items = [
+            ('bf6_status', 'BF6 Status:', 'Waiting...'),
+            ('anticheat_status', 'EA Javelin:', 'Checking...'),
+            ('gpu_status', 'GPU:', 'Detecting...'),
+            ('cpu_usage', 'CPU Usage:', 'Measuring...'),
+            ('ram_usage', 'RAM Usage:', 'Measuring...'),
+            ('crashes', 'Crashes Detected:', '0'),
+            ('targets', 'Other Targets:', '-'),
+            ('gpu_load', 'GPU Load:', '-')
+        ]
+        
+        for idx, (key, label_text, default_value) in enumerate(status_items):
+            row = idx // 2
+            col = (idx % 2) * 2
+            
+            label = tk.Label(status_frame, text=label_text, bg='#2e2e2e', 
+                           fg='#aaaaaa', font=('Arial', 9))
+            label.grid(row=row, column=col, sticky='w', padx=10, pady=5)
+            
+            value = tk.Label(status_frame, text=default_value, bg='#2e2e2e', 
+                           fg='white', font=('Arial', 9, 'bold'))
+            value.grid(row=row, column=col+1, sticky='w', padx=10, pady=5)
+            
+            self.status_labels[key] = value
+        
+        # Control Frame
+        control_frame = tk.Frame(self.root, bg='#1e1e1e')
+        control_frame.pack(fill='x', padx=10, pady=5)
+        
+        self.start_button = tk.Button(control_frame, text="▶ Start Monitoring", 
+                                      command=self.start_monitoring,
+                                      bg='#00aa00', fg='white', font=('Arial', 10, 'bold'),
+                                      width=20, height=2)
+        self.start_button.pack(side='left', padx=5)
+        
+        self.stop_button = tk.Button(control_frame, text="⏸ Stop Monitoring", 
+                                     command=self.stop_monitoring,
+                                     bg='#aa0000', fg='white', font=('Arial', 10, 'bold'),
+                                     width=20, height=2, state='disabled')
+        self.stop_button.pack(side='left', padx=5)
+        
+        self.clear_button = tk.Button(control_frame, text="🗑 Clear Log", 
+                                      command=self.clear_log,
+                                      bg='#555555', fg='white', font=('Arial', 10),
+                                      width=15, height=2)
+        self.clear_button.pack(side='left', padx=5)
+        
+        self.refresh_button = tk.Button(control_frame, text="🔄 Refresh Probes", 
+                                        command=self.refresh_probes,
+                                        bg='#555555', fg='white', font=('Arial', 10),
+                                        width=15, height=2)
+        self.refresh_button.pack(side='left', padx=5)
+        
+        self.history_button = tk.Button(control_frame, text="📊 Crash History", 
+                                        command=self.show_crash_history,
+                                        bg='#555555', fg='white', font=('Arial', 10),
+                                        width=15, height=2)
+        self.history_button.pack(side='left', padx=5)
+        
+        self.overhead_button = tk.Button(control_frame, text="🩺 Overhead", 
+                                         command=self.show_overhead,
+                                         bg='#555555', fg='white', font=('Arial', 10),
+                                         width=12, height=2)
+        self.overhead_button.pack(side='left', padx=5)
+        
+        # Log Frame
+        log_frame = tk.LabelFrame(self.root, text="Activity Log", 
+                                 bg='#2e2e2e', fg='white', font=('Arial', 10, 'bold'))
+        log_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        # Log text area with scrollbar, capped and batched per frame
+        self.log_view = BoundedLogView(log_frame, max_lines=self.log_max_lines,
+                                       wrap=tk.WORD, bg='#1e1e1e', fg='#00ff00',
+                                       font=('Consolas', 9),
+                                       insertbackground='white')
+        self.log_view.pack(fill='both', expand=True, padx=5, pady=5)
+        
+    def log(self, message, level="INFO"):
+        """Log a message to the GUI and file (safe from any thread)"""
+        self.engine.log(message, level)
+    
+    def on_engine_event(self, event, payload):
+        """Engine subscriber - runs on engine threads"""
+        if event == 'log':
+            self.log_view.post(payload['line'], payload['level'])
+        elif event in ('snapshot', 'crash', 'crash_progress', 'monitoring'):
+            self.ui_events.put((event, payload))
+    
+    def process_engine_events(self):
+        """Repaint from engine events queued since the last frame"""
+        latest_snapshot, events = drain_events(self.ui_events)
+        for event, payload in events:
+            if event == 'crash_progress':
+                # Evidence arrives over several seconds; show how far along it is
+                self.update_status('crashes', f"{self.engine.crash_count} (capturing "
+                                   f"{payload['done']}/{payload['total']})", '#ffaa00')
+            elif event == 'crash':
+                self.update_status('crashes', str(self.engine.crash_count), '#ff0000')
+            elif event == 'monitoring' and not payload:
+                self.update_status('bf6_status', 'Monitoring Stopped', '#ffaa00')
+            elif event == 'probe':
+                self.show_probe_result(*payload)
+            elif event == 'history':
+                self.show_history_lines(payload)
+        
+        if latest_snapshot and self.engine.monitoring:
+            self.show_snapshot(latest_snapshot)
+        
+        self.root.after(100, self.process_engine_events)
+    
+    def update_status(self, key, value, color='white'):
+        """Update a status label"""
+        if key in self.status_labels:
+            self.status_labels[key].config(text=value, fg=color)
+    
+    def clear_log(self):
+        """Clear the log display"""
+        self.log_view.clear()
+        self.log("Log cleared", "INFO")
+    
+    
+    def show_snapshot(self, snapshot):
+        """Update system info display from a snapshot"""
+        # Update CPU/RAM
+        cpu_val = snapshot['cpu_percent']
+        ram_pct = snapshot['memory']['percent']
+        ram_used = snapshot['memory']['used_gb']
+        
+        self.update_status('cpu_usage', f"{cpu_val:.1f}%", 
+                         '#ff0000' if cpu_val > 90 else '#ffaa00' if cpu_val > 70 else 'white')
+        self.update_status('ram_usage', 
+                         f"{ram_pct:.1f}% ({ram_used:.1f}GB)",
+                         '#ff0000' if ram_pct > 90 else '#ffaa00' if ram_pct > 70 else 'white')
+        
+        # Update GPU
+        gpu = snapshot.get('gpu_info')
+        if gpu:
+            gpu_name = gpu.get('Name', 'Unknown')[:30]
+            self.update_status('gpu_status', gpu_name)
+        
+        # Live GPU telemetry, as far as the backend reports it
+        telemetry = snapshot.get('gpu_telemetry')
+        if telemetry:
+            parts = []
+            if telemetry.get('utilization_percent') is not None:
+                parts.append(f"{telemetry['utilization_percent']:.0f}%")
+            if telemetry.get('memory_used_mb') is not None:
+                vram = f"{telemetry['memory_used_mb'] / 1024:.1f}"
+                if telemetry.get('memory_total_mb'):
+                    vram += f"/{telemetry['memory_total_mb'] / 1024:.1f}"
+                parts.append(vram + "GB VRAM")
+            temp = telemetry.get('temperature_c')
+            if temp is not None:
+                parts.append(f"{temp:.0f}°C")
+            if telemetry.get('power_w') is not None:
+                parts.append(f"{telemetry['power_w']:.0f}W")
+            self.update_status('gpu_load', ' | '.join(parts) or '-',
+                               '#ff0000' if (temp or 0) >= 90 else '#ffaa00' if (temp or 0) >= 80 else 'white')
+        else:
+            self.update_status('gpu_load', '-', '#888888')
+        
+        # Update crashes
+        crash_count = self.engine.crash_count
+        self.update_status('crashes', str(crash_count), 
+                         '#ff0000' if crash_count > 0 else 'white')
+        
+        # Update BF6 and anticheat status
+        if snapshot['bf6_process']:
+            self.update_status('bf6_status', '🟢 Running', '#00ff00')
+            if 'anticheat_process' not in snapshot:
+                self.update_status('anticheat_status', '- Not watched', '#888888')
+            elif snapshot['anticheat_process']:
+                self.update_status('anticheat_status', '✓ Running', '#00ff00')
+            else:
+                self.update_status('anticheat_status', '✗ Not Running', '#ff0000')
+        else:
+            self.update_status('bf6_status', '⚫ Not Running', '#888888')
+            self.update_status('anticheat_status', '⚫ Idle', '#888888')
+        
+        # Every other configured game or helper on one line
+        anticheat = self.engine.anticheat_target
+        shown = (self.engine.primary_game.name, anticheat.name if anticheat else None)
+        others = []
+        for name, status in snapshot.get('targets', {}).items():
+            if name in shown:
+                continue
+            text = f"{status['label']} {'🟢' if status['running'] else '⚫'}"
+            if status['crashes']:
+                text += f" ({status['crashes']} crashed)"
+            others.append(text)
+        self.update_status('targets', ' | '.join(others) or '-')
+    
+    def refresh_probes(self):
+        """Drop cached probe values so the next snapshot re-collects them"""
+        self.engine.refresh_probes()
+    
+    def show_crash_history(self):
+        """Open the crash history panel; the summary is computed off the Tk thread"""
+        if self.history_window is None or not self.history_window.winfo_exists():
+            self.history_window = tk.Toplevel(self.root)
+            self.history_window.title("Crash History")
+            self.history_window.geometry("700x500")
+            self.history_window.configure(bg='#1e1e1e')
+            self.history_text = tk.Text(self.history_window, wrap=tk.NONE, bg='#1e1e1e', fg='#00ff00',
+                                        font=('Consolas', 9))
+            self.history_text.pack(fill='both', expand=True, padx=5, pady=5)
+        self.history_window.lift()
+        self.show_history_lines(["Loading crash history..."])
+        threading.Thread(target=self.load_crash_history, name="CrashHistory", daemon=True).start()
+    
+    def load_crash_history(self):
+        """Runs on a worker thread - hands the summary back through ui_events"""
+        conn = self.engine.crash_store.connect()
+        try:
+            lines = format_analytics(crash_analytics(conn))
+            lines += [""] + format_groups(crash_groups(conn, limit=10))
+        except Exception as e:
+            lines = [f"Could not read crash history: {e}"]
+        finally:
+            conn.close()
+        self.ui_events.put(('history', lines))
+    
+    def show_history_lines(self, lines):
+        if self.history_text is None or not self.history_text.winfo_exists():
+            return
+        self.history_text.config(state='normal')
+        self.history_text.delete('1.0', tk.END)
+        self.history_text.insert(tk.END, "\n".join(lines))
+        self.history_text.config(state='disabled')
+    
+    def show_overhead(self):
+        """Open the debug panel with the monitor's own cost, refreshed every second"""
+        if self.overhead_window is None or not self.overhead_window.winfo_exists():
+            self.overhead_window = tk.Toplevel(self.root)
+            self.overhead_window.title("Monitor Overhead")
+            self.overhead_window.geometry("820x460")
+            self.overhead_window.configure(bg='#1e1e1e')
+            self.overhead_text = tk.Text(self.overhead_window, wrap=tk.NONE, bg='#1e1e1e', fg='#00ff00',
+                                         font=('Consolas', 9))
+            self.overhead_text.pack(fill='both', expand=True, padx=5, pady=5)
+            self.refresh_overhead()
+        self.overhead_window.lift()
+    
+    def refresh_overhead(self):
+        if self.overhead_text is None or not self.overhead_text.winfo_exists():
+            return
+        lines = format_overhead(self.engine.self_metrics.report(), self.frame_latency.stats())
+        self.overhead_text.config(state='normal')
+        self.overhead_text.delete('1.0', tk.END)
+        self.overhead_text.insert(tk.END, "\n".join(lines))
+        self.overhead_text.config(state='disabled')
+        self.root.after(1000, self.refresh_overhead)
+    
+    def start_initial_probes(self):
+        """Run the initial system probes concurrently without blocking the window"""
+        probes = {
+            'cpu': lambda: psutil.cpu_percent(interval=0.5),
+            'ram': psutil.virtual_memory,
+            'gpu': lambda: self.engine.probe_registry.get('gpu_info'),
+            'javelin': lambda: self.engine.probe_registry.get('ea_javelin')
+        }
+        self.pending_probes = set(probes)
+        
+        pool = ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="StartupProbe")
+        for name, probe in probes.items():
+            future = pool.submit(probe)
+            future.add_done_callback(lambda f, name=name: self.ui_events.put(('probe', (name, f))))
+        pool.shutdown(wait=False)
+    
+    def show_probe_result(self, name, future):
+        """Fill in a status label once its initial probe finishes"""
+        self.pending_probes.discard(name)
+        try:
+            value = future.result()
+            
+            if name == 'cpu':
+                self.update_status('cpu_usage', f"{value:.1f}%")
+            elif name == 'ram':
+                self.update_status('ram_usage', f"{value.percent:.1f}% ({value.used/1024**3:.1f}GB)")
+            elif name == 'gpu':
+                if value:
+                    self.update_status('gpu_status', value.get('Name', 'Unknown')[:30])
+                else:
+                    self.update_status('gpu_status', 'Unknown', '#888888')
+            elif name == 'javelin':
+                if value and value.get('installed'):
+                    self.update_status('anticheat_status', '✓ Installed', '#00ff00')
+                else:
+                    self.update_status('anticheat_status', '✗ Not Found', '#ff0000')
+        except Exception as e:
+            self.log(f"Error in initial {name} probe: {e}", "WARNING")
+        
+        if not self.pending_probes:
+            self.startup_trace.mark('probes_done')
+            self.finish_startup_trace()
+    
+    def on_first_paint(self, event):
+        self.startup_trace.mark('first_paint')
+        self.finish_startup_trace()
+    
+    def finish_startup_trace(self):
+        """Write the startup trace once both milestones are recorded"""
+        if not self.startup_trace.enabled:
+            return
+        if 'first_paint' in self.startup_trace.marks and 'probes_done' in self.startup_trace.marks:
+            self.startup_trace.write()
+            if self.startup_trace.exit_when_done:
+                self.engine.close()
+                self.root.after(0, self.root.destroy)
+    
+    def start_monitoring(self):
+        """Start the monitoring process"""
+        if self.engine.monitoring:
+            return
+        
+        self.start_button.config(state='disabled')
+        self.stop_button.config(state='normal')
+        self.engine.start()
+    
+    def stop_monitoring(self):
+        """Stop the monitoring process"""
+        if not self.engine.monitoring:
+            return
+        
+        self.start_button.config(state='normal')
+        self.stop_button.config(state='disabled')
+        self.engine.stop()
+
+def run_gui(engine=None):
+    root = tk.Tk()
+    app = BF6CrashMonitorGUI(root, engine)
+    
+    # Check if running as admin - warn once the window is already up
+    def warn_if_not_admin():
+        if is_admin() is False:
+            print("⚠️  WARNING: Not running as Administrator - some features may be limited")
+            messagebox.showwarning("Not Administrator", 
+                                  "Not running as Administrator.\nSome features may be limited.\n\nRight-click and 'Run as Administrator' for best results.")
+    
+    if not app.startup_trace.enabled:
+        root.after(500, warn_if_not_admin)
+    
+    # Handle window close
+    def on_closing():
+        if app.engine.monitoring:
+            if messagebox.askokcancel("Quit", "Monitoring is active. Do you want to quit?"):
+                app.engine.close()
+                root.destroy()
+        else:
+            app.engine.close()
+            root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.mainloop()
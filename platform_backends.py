@@ -0,0 +1,261 @@
+"""
+Platform backends for BF6 Crash Monitor
+Everything that touches psutil, winreg, PowerShell, GPU tools or ctypes lives
+here so the monitoring engine can run with fakes on any OS
+"""
+
+import os
+import shutil
+import sys
+
+import psutil
+
+from event_log_reader import EventLogReader
+from gpu_telemetry import (GpuTelemetry, NullGpuTelemetry, nvidia_smi_argv, parse_nvidia_smi_line,
+                           wddm_counter_argv, parse_json_line)
+from shell_worker import ShellWorkerPool, powershell_transport
+from dump_index import DumpIndex, NullDumpIndex, default_dump_roots
+
+
+class PsutilProcessTable:
+    """Process table backed by psutil"""
+
+    def process_iter(self, attrs=None):
+        return psutil.process_iter(attrs)
+
+    def process(self, pid):
+        return psutil.Process(pid)
+
+
+class WindowsRegistry:
+    """Registry reads via winreg (imported lazily so other OSes can load this module)"""
+
+    def check_hardware_accelerated_gpu_scheduling(self):
+        """Check if Hardware-Accelerated GPU Scheduling is enabled"""
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                                r"SYSTEM\CurrentControlSet\Control\GraphicsDrivers")
+            hags, _ = winreg.QueryValueEx(key, "HwSchMode")
+            winreg.CloseKey(key)
+            return hags == 2
+        except:
+            return None
+
+
+class PowerShellFileInfo:
+    """File version lookups through the persistent PowerShell worker"""
+
+    def __init__(self, shell):
+        self.shell = shell
+
+    def file_version(self, path):
+        try:
+            result = self.shell.query(f'(Get-Item "{path}").VersionInfo.FileVersion', timeout=5)
+            if result and result[0]:
+                return str(result[0]).strip()
+            return None
+        except:
+            return None
+
+
+class WindowsMemoryStatus:
+    """Commit charge via GlobalMemoryStatusEx"""
+
+    def commit_charge(self):
+        """(used_bytes, limit_bytes) or None"""
+        try:
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                            ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                            ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                            ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                            ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return None
+            # The "page file" figures are the system commit limit and what is left of it
+            return status.ullTotalPageFile - status.ullAvailPageFile, status.ullTotalPageFile
+        except Exception:
+            return None
+
+
+class ProcMeminfo:
+    """Commit charge from /proc/meminfo on Linux"""
+
+    def commit_charge(self):
+        try:
+            values = {}
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    key, _, rest = line.partition(':')
+                    if key in ('Committed_AS', 'CommitLimit'):
+                        values[key] = int(rest.split()[0]) * 1024
+            return values['Committed_AS'], values['CommitLimit']
+        except (OSError, KeyError, ValueError, IndexError):
+            return None
+
+
+class CimGpuProbe:
+    """GPU inventory through Get-CimInstance on the persistent PowerShell worker (wmic is deprecated)"""
+
+    def __init__(self, shell):
+        self.shell = shell
+
+    def get_gpu_info(self):
+        """Get GPU information (AMD or NVIDIA)"""
+        try:
+            adapters = self.shell.query(
+                "Get-CimInstance Win32_VideoController | Select-Object Name, DriverVersion", timeout=10)
+            return pick_gpu(adapters)
+        except Exception:
+            return None
+
+
+def pick_gpu(adapters):
+    """The AMD or NVIDIA adapter out of Win32_VideoController rows, with its Vendor"""
+    gpu_data = None
+    for adapter in adapters:
+        if not isinstance(adapter, dict):
+            continue
+        gpu_name = adapter.get('Name') or ''
+        # The last match wins, so a discrete card listed after the iGPU is the one kept
+        if any(brand in gpu_name for brand in ['AMD', 'Radeon', 'NVIDIA', 'GeForce', 'RTX', 'GTX']):
+            gpu_data = {'Name': gpu_name, 'DriverVersion': adapter.get('DriverVersion')}
+            if 'NVIDIA' in gpu_name or 'GeForce' in gpu_name or 'RTX' in gpu_name or 'GTX' in gpu_name:
+                gpu_data['Vendor'] = 'NVIDIA'
+            elif 'AMD' in gpu_name or 'Radeon' in gpu_name:
+                gpu_data['Vendor'] = 'AMD'
+    return gpu_data
+
+
+def default_gpu_telemetry():
+    """nvidia-smi when the NVIDIA driver provides it, else the WDDM counters on Windows"""
+    executable = shutil.which('nvidia-smi')
+    if executable:
+        return GpuTelemetry(nvidia_smi_argv(executable=executable), parse_nvidia_smi_line, 'nvidia-smi')
+    if sys.platform == 'win32':
+        return GpuTelemetry(wddm_counter_argv(), parse_json_line, 'wddm-counters')
+    return NullGpuTelemetry()
+
+
+class NullRegistry:
+    """No registry outside Windows"""
+
+    def check_hardware_accelerated_gpu_scheduling(self):
+        return None
+
+
+class NullEventLog:
+    """No Windows Event Log outside Windows"""
+
+    def start(self, interval=30.0, timer=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def check_windows_event_logs(self, limit=None):
+        return []
+
+    def check_channel(self, channel, minutes=10, limit=None):
+        return []
+
+
+class NullMemoryStatus:
+    def commit_charge(self):
+        return None
+
+
+class NullFileInfo:
+    def file_version(self, path):
+        return None
+
+
+class NullGpuProbe:
+    def get_gpu_info(self):
+        return None
+
+
+class PlatformBackends:
+    """The set of backends a MonitorEngine talks to"""
+
+    def __init__(self, process_table, registry, event_log, gpu, file_info, shell=None, memory=None,
+                 gpu_telemetry=None, dump_index=None):
+        self.process_table = process_table
+        self.registry = registry
+        self.event_log = event_log
+        self.gpu = gpu
+        self.file_info = file_info
+        self.shell = shell
+        self.memory = memory or NullMemoryStatus()
+        self.gpu_telemetry = gpu_telemetry or NullGpuTelemetry()
+        self.dump_index = dump_index or NullDumpIndex()
+
+    def start(self, timer=None):
+        """Start long-lived helpers (the PowerShell workers, event log polling, GPU telemetry, dump index) in the background
+
+        timer(name, seconds) receives the duration of every background event
+        log poll, telemetry line and dump folder scan.
+        """
+        if self.shell:
+            self.shell.start()
+        self.event_log.start(timer=timer)
+        self.gpu_telemetry.start(timer=timer)
+        self.dump_index.start(timer=timer)
+
+    def close(self):
+        self.event_log.stop()
+        self.dump_index.stop()
+        self.gpu_telemetry.close()
+        if self.shell:
+            self.shell.close()
+
+
+def windows_backends(state_dir="crash_logs"):
+    # One pool of PowerShell workers shared by every PowerShell query; crash
+    # capture runs both event log channels and the GPU query at once
+    shell = ShellWorkerPool(powershell_transport, size=3)
+    # Event log watermarks live next to the logs so restarts resume where they left off
+    return PlatformBackends(
+        process_table=PsutilProcessTable(),
+        registry=WindowsRegistry(),
+        event_log=EventLogReader(shell, os.path.join(state_dir, "event_log_state.json")),
+        gpu=CimGpuProbe(shell),
+        file_info=PowerShellFileInfo(shell),
+        shell=shell,
+        memory=WindowsMemoryStatus(),
+        gpu_telemetry=default_gpu_telemetry(),
+        dump_index=DumpIndex(default_dump_roots(), os.path.join(state_dir, "dump_index.db"))
+    )
+
+
+def generic_backends():
+    """Process monitoring only - for Linux/macOS runs and testing"""
+    return PlatformBackends(
+        process_table=PsutilProcessTable(),
+        registry=NullRegistry(),
+        event_log=NullEventLog(),
+        gpu=NullGpuProbe(),
+        file_info=NullFileInfo(),
+        memory=ProcMeminfo() if sys.platform.startswith('linux') else NullMemoryStatus(),
+        # nvidia-smi exists on Linux too
+        gpu_telemetry=default_gpu_telemetry()
+    )
+
+
+def default_backends(state_dir="crash_logs"):
+    return windows_backends(state_dir) if sys.platform == 'win32' else generic_backends()
+
+
+def is_admin():
+    """True/False on Windows, None when it can't be determined"""
+    try:
+        import ctypes
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    except:
+        return None
@@ -0,0 +1,126 @@
+"""
+Probe registry for BF6 Crash Monitor
+Memoizes slow system facts (GPU, Javelin install, HAGS) with TTLs and triggers
+"""
+
+import os
+import threading
+import time
+
+
+class FileMtimeTrigger:
+    """Invalidates a probe when a file's mtime changes (or it appears/disappears)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.last = self._stamp()
+
+    def _stamp(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self):
+        stamp = self._stamp()
+        changed = stamp != self.last
+        self.last = stamp
+        return changed
+
+
+class Probe:
+    """A named collector with a TTL and optional invalidation triggers
+
+    ttl=None caches until a trigger fires or the probe is invalidated,
+    ttl=0 disables caching.
+    """
+
+    def __init__(self, name, collect, ttl=None, triggers=()):
+        self.name = name
+        self.collect = collect
+        self.ttl = ttl
+        self.triggers = list(triggers)
+
+        self.value = None
+        self.collected_at = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def is_fresh(self, now):
+        if self.collected_at is None or self.ttl == 0:
+            return False
+        if self.ttl is not None and now - self.collected_at >= self.ttl:
+            return False
+        # Poll every trigger so each one keeps its own state current
+        fired = [trigger.changed() for trigger in self.triggers]
+        return not any(fired)
+
+
+class ProbeRegistry:
+    """Serves probe results from cache and re-collects them when stale"""
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.monotonic
+        self.probes = {}
+
+    def register(self, name, collect, ttl=None, triggers=()):
+        """Register (or replace) a probe and return it"""
+        probe = Probe(name, collect, ttl, triggers)
+        self.probes[name] = probe
+        return probe
+
+    def get(self, name):
+        """Return the probe's value, collecting it only if the cache is stale
+
+        Concurrent callers wait for one collection; probes kept fresh by a
+        background lane are read with peek() instead.
+        """
+        probe = self.probes[name]
+        with probe.lock:
+            now = self.clock()
+            if probe.is_fresh(now):
+                probe.hits += 1
+                return probe.value
+
+            probe.misses += 1
+            probe.value = probe.collect()
+            probe.collected_at = self.clock()
+            return probe.value
+
+    def peek(self, name):
+        """The cached value, however old, or None - never collects or waits"""
+        probe = self.probes[name]
+        if probe.collected_at is not None:
+            probe.hits += 1
+        return probe.value
+
+    def refresh(self, name):
+        """Re-collect a probe now; readers keep the old value until it is done"""
+        probe = self.probes[name]
+        value = probe.collect()
+        with probe.lock:
+            probe.misses += 1
+            probe.value = value
+            probe.collected_at = self.clock()
+        return value
+
+    def invalidate(self, name=None):
+        """Manual refresh - drop one cached value, or all of them"""
+        names = [name] if name else list(self.probes)
+        for probe_name in names:
+            probe = self.probes[probe_name]
+            with probe.lock:
+                probe.collected_at = None
+
+    def stats(self):
+        """Cache hit/miss counters and value age for every probe"""
+        now = self.clock()
+        return {
+            name: {
+                'hits': probe.hits,
+                'misses': probe.misses,
+                'age_seconds': round(now - probe.collected_at, 1) if probe.collected_at is not None else None
+            }
+            for name, probe in self.probes.items()
+        }
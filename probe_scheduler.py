@@ -0,0 +1,211 @@
+"""
+Probe scheduler for BF6 Crash Monitor
+Runs each probe at its own interval for the current mode (idle or game),
+by priority, and backs off probes that overrun their time budget
+"""
+
+import queue
+import threading
+import time
+import traceback
+
+IDLE = 'idle'
+GAME = 'game'
+
+
+class ScheduledProbe:
+    """A periodic job with a per-mode interval, priority and time budget
+
+    intervals maps a mode to seconds between runs; a mode that is missing
+    or None runs the probe only when trigger() asks for it.
+    """
+
+    def __init__(self, name, run, intervals, priority=0, budget=None, background=False,
+                 immediate=True, max_backoff=8):
+        self.name = name
+        self.run = run
+        self.intervals = dict(intervals)
+        self.priority = priority
+        self.budget = budget
+        self.background = background
+        self.immediate = immediate
+        self.max_backoff = max_backoff
+
+        self.due = None
+        self.scheduled_for = None
+        self.requested = False
+        self.running = False
+        self.backoff = 1
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_duration = None
+
+    def interval(self, mode):
+        base = self.intervals.get(mode)
+        return None if base is None else base * self.backoff
+
+
+class ProbeScheduler:
+    """One thread runs the fast probes; slow ones go to a background lane
+
+    A probe is never queued twice: while it runs it has no due time, and
+    runs missed while it was late or busy are counted as skipped rather
+    than replayed.
+    """
+
+    def __init__(self, mode=IDLE, clock=None, on_run=None):
+        self.mode = mode
+        self.clock = clock or time.monotonic
+        # on_run(name, seconds) after every probe run, e.g. for latency histograms
+        self.on_run = on_run
+        self.probes = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.background_thread = None
+        self.background_queue = queue.Queue()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def add(self, name, run, intervals, priority=0, budget=None, background=False, immediate=True):
+        """Register a probe; immediate=False waits one interval before the first run"""
+        probe = ScheduledProbe(name, run, intervals, priority, budget, background, immediate)
+        with self.lock:
+            self.probes[name] = probe
+            interval = probe.interval(self.mode)
+            if interval is not None:
+                probe.due = self.clock() + (0.0 if immediate else interval)
+        self._wake.set()
+        return probe
+
+    def set_mode(self, mode):
+        """Switch mode, starting probes the new mode enables and parking the rest"""
+        with self.lock:
+            if mode == self.mode:
+                return
+            self.mode = mode
+            now = self.clock()
+            for probe in self.probes.values():
+                if probe.running:
+                    continue
+                interval = probe.interval(mode)
+                if interval is None:
+                    probe.due = None
+                elif probe.due is None:
+                    probe.due = now if probe.immediate else now + interval
+                else:
+                    probe.due = min(probe.due, now + interval)
+        self._wake.set()
+
+    def trigger(self, name):
+        """Run a probe as soon as possible, once"""
+        with self.lock:
+            self.probes[name].requested = True
+        self._wake.set()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="ProbeScheduler", daemon=True)
+        self.thread.start()
+        self.background_thread = threading.Thread(target=self._run_background,
+                                                  name="ProbeSchedulerBackground", daemon=True)
+        self.background_thread.start()
+
+    def stop(self):
+        """Stop after the probes currently running"""
+        self._stop_event.set()
+        self._wake.set()
+        self.background_queue.put(None)
+
+    def stats(self):
+        """Run, overrun and skip counters for every probe"""
+        with self.lock:
+            return {
+                name: {
+                    'interval': probe.interval(self.mode),
+                    'runs': probe.runs,
+                    'overruns': probe.overruns,
+                    'skipped': probe.skipped,
+                    'errors': probe.errors,
+                    'backoff': probe.backoff,
+                    'last_ms': round(probe.last_duration * 1000, 2) if probe.last_duration is not None else None
+                }
+                for name, probe in self.probes.items()
+            }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.clear()
+            probe, wait = self._next()
+            if probe is None:
+                self._wake.wait(wait)
+            elif probe.background:
+                self.background_queue.put(probe)
+            else:
+                self._execute(probe)
+
+    def _run_background(self):
+        while True:
+            probe = self.background_queue.get()
+            if probe is None or self._stop_event.is_set():
+                return
+            self._execute(probe)
+
+    def _next(self):
+        """Claim the most urgent due probe, or return how long to sleep"""
+        with self.lock:
+            now = self.clock()
+            due = [probe for probe in self.probes.values()
+                   if not probe.running and (probe.requested or (probe.due is not None and probe.due <= now))]
+            if due:
+                probe = min(due, key=lambda p: (-p.priority, p.due if p.due is not None else now))
+                probe.running = True
+                probe.requested = False
+                # A triggered run restarts the cadence from now
+                probe.scheduled_for = now if probe.due is None else min(probe.due, now)
+                probe.due = None
+                return probe, None
+
+            upcoming = [probe.due for probe in self.probes.values() if probe.due is not None]
+            return None, (max(0.0, min(upcoming) - now) if upcoming else None)
+
+    def _execute(self, probe):
+        started = self.clock()
+        try:
+            probe.run()
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+        finished = self.clock()
+
+        with self.lock:
+            duration = finished - started
+            probe.runs += 1
+            probe.last_duration = duration
+            if error:
+                probe.errors += 1
+                probe.last_error = error
+
+            # Overrunning probes slow down until they fit their budget again
+            if probe.budget is not None and duration > probe.budget:
+                probe.overruns += 1
+                probe.backoff = min(probe.backoff * 2, probe.max_backoff)
+            else:
+                probe.backoff = 1
+
+            interval = probe.interval(self.mode)
+            if interval is not None:
+                due = probe.scheduled_for + interval
+                if due <= finished:
+                    # Drop the runs we are already late for instead of bursting
+                    probe.skipped += int((finished - due) // interval) + 1
+                    due = finished + interval
+                probe.due = due
+            probe.running = False
+        if self.on_run:
+            self.on_run(probe.name, duration)
+        self._wake.set()
@@ -0,0 +1,151 @@
+"""
+Per-process sampler for BF6 Crash Monitor
+Holds one psutil.Process per watched target and reads every metric in a
+single oneshot() so CPU, thread and IO rates come from real deltas
+"""
+
+import time
+
+import psutil
+
+MB = 1024 * 1024
+
+
+class ProcessSampler:
+    """Detailed metrics for one process, with rates computed between calls
+
+    The first sample after attaching primes the counters: CPU, per-thread
+    CPU and IO rates are None until there is a previous sample to diff.
+    """
+
+    def __init__(self, proc, top_threads=5, clock=None, name=None, create_time=None):
+        self.proc = proc
+        self.top_threads = top_threads
+        self.clock = clock or time.monotonic
+        self.samples = 0
+        # Known from the process table walk; stand in when the process
+        # itself refuses to say
+        self.name = name
+        self.create_time = create_time
+
+        self._last_time = None
+        self._last_threads = {}
+        self._last_io = None
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def sample(self):
+        """Read one sample, None once the process is gone
+
+        Metrics the process won't give out (AccessDenied, normal for
+        protected anticheat services) are None and named in 'unavailable'
+        instead of costing the whole sample.
+        """
+        proc = self.proc
+        denied = []
+        try:
+            # is_running() compares the stored create_time against the live
+            # one, so a reused PID is reported as a different process
+            if not proc.is_running():
+                return None
+            with proc.oneshot():
+                now = self.clock()
+                name = _read(proc, 'name', denied)
+                create_time = _read(proc, 'create_time', denied)
+                mem = _read(proc, 'memory_info', denied, 'memory_mb')
+                cpu = _read(proc, 'cpu_percent', denied, interval=None)
+                num_threads = _read(proc, 'num_threads', denied)
+                handles = _read(proc, 'num_handles' if hasattr(proc, 'num_handles') else 'num_fds',
+                                denied, 'handles')
+                threads = _read(proc, 'threads', denied, 'busiest_threads')
+                io = _read(proc, 'io_counters', denied, 'io')
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+
+        if create_time is not None and self.create_time is not None and abs(create_time - self.create_time) > 0.01:
+            # Same PID, different start time: the process we attached to is gone
+            return None
+        if name is not None:
+            self.name = name
+        if create_time is not None:
+            self.create_time = create_time
+        create_time = self.create_time
+        private = getattr(mem, 'private', None)
+        info = {
+            'pid': proc.pid,
+            'name': self.name,
+            'cpu_percent': cpu if self.samples else None,
+            'memory_mb': mem.rss / MB if mem is not None else None,
+            # Committed private bytes exist on Windows only
+            'private_mb': private / MB if private is not None else None,
+            'page_faults': getattr(mem, 'num_page_faults', None),
+            'num_threads': num_threads,
+            # Handles on Windows, open file descriptors elsewhere
+            'handles': handles,
+            'create_time': create_time,
+            'running_time': time.time() - create_time if create_time is not None else None,
+            'unavailable': denied
+        }
+
+        elapsed = now - self._last_time if self._last_time is not None else None
+        info['busiest_threads'] = self._thread_rates(threads, elapsed)
+        info['io'] = self._io_rates(io, elapsed)
+
+        self._last_time = now
+        self.samples += 1
+        return info
+
+    def _thread_rates(self, threads, elapsed):
+        """Top threads by CPU % since the previous sample"""
+        if threads is None:
+            return None
+        current = {thread.id: thread.user_time + thread.system_time for thread in threads}
+        previous, self._last_threads = self._last_threads, current
+        if not elapsed:
+            return None
+
+        rates = []
+        for thread_id, cpu_time in current.items():
+            delta = cpu_time - previous.get(thread_id, cpu_time)
+            if delta > 0:
+                rates.append((delta / elapsed * 100, thread_id))
+        rates.sort(reverse=True)
+        return [{'id': thread_id, 'cpu_percent': round(rate, 1)}
+                for rate, thread_id in rates[:self.top_threads]]
+
+    def _io_rates(self, io, elapsed):
+        """Cumulative IO counters plus per-second rates since the previous sample"""
+        if io is None:
+            return None
+        previous, self._last_io = self._last_io, io
+        result = {
+            'read_mb': io.read_bytes / MB,
+            'write_mb': io.write_bytes / MB,
+            'read_count': io.read_count,
+            'write_count': io.write_count,
+            'read_mb_s': None,
+            'write_mb_s': None
+        }
+        if previous is not None and elapsed:
+            result['read_mb_s'] = round((io.read_bytes - previous.read_bytes) / MB / elapsed, 3)
+            result['write_mb_s'] = round((io.write_bytes - previous.write_bytes) / MB / elapsed, 3)
+        return result
+
+
+def _read(proc, method, denied, field=None, **kwargs):
+    """One metric, None if the platform lacks it or access to it is denied
+
+    Denied metrics are added to denied under their field name.
+    """
+    read = getattr(proc, method, None)
+    if read is None:
+        return None
+    try:
+        return read(**kwargs)
+    except psutil.AccessDenied:
+        denied.append(field or method)
+        return None
+    except NotImplementedError:
+        return None
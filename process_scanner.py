@@ -0,0 +1,117 @@
+"""
+Process scanner for BF6 Crash Monitor
+Resolves every watched process name in a single pass over the process table
+"""
+
+import time
+
+import psutil
+
+from process_sampler import ProcessSampler
+
+
+class ProcessScanner:
+    """Find watched processes with one process table walk and a PID cache"""
+
+    def __init__(self, targets, process_iter=None, timer=None):
+        # targets maps a group name to its process names in priority order,
+        # e.g. {'bf6': ['bf6.exe', ...], 'anticheat': ['JavelinAC.exe', ...]}
+        self.process_iter = process_iter or psutil.process_iter
+        # timer(name, seconds) gets each table walk and per-group sample
+        self.timer = timer
+
+        self.full_scans = 0
+        self.cache_hits = 0
+        self.set_targets(targets)
+
+    def set_targets(self, targets):
+        """Rebuild the case-folded name index and drop cached PIDs"""
+        self.targets = {group: list(names) for group, names in targets.items()}
+
+        # name -> [(group, rank)], lower rank wins when several names match
+        self.name_index = {}
+        for group, names in self.targets.items():
+            for rank, name in enumerate(names):
+                self.name_index.setdefault(name.casefold(), []).append((group, rank))
+
+        self.cache = {}
+        self.samplers = {}
+
+    def scan(self):
+        """Return {group: process info or None} for every target group"""
+        results = {}
+        need_full_scan = False
+
+        # Check cached PIDs first - no table walk while they stay alive
+        for group in self.targets:
+            sampler = self.samplers.get(group)
+            info = self._sample(group, sampler) if sampler is not None else None
+            if info is None:
+                self.cache.pop(group, None)
+                self.samplers.pop(group, None)
+                need_full_scan = True
+            else:
+                self.cache_hits += 1
+            results[group] = info
+
+        if need_full_scan:
+            started = time.perf_counter()
+            found = self._full_scan()
+            if self.timer:
+                self.timer('process_table_walk', time.perf_counter() - started)
+            for group, procs in found.items():
+                if results[group] is not None:
+                    continue
+                # Best match first; one that exited since the walk gives way
+                # to the next-ranked process rather than to "not running"
+                for proc in procs:
+                    # The sampler keeps this Process between ticks so CPU and
+                    # IO figures are real deltas rather than first-sight zeros;
+                    # the walk's start time lets it spot a reused PID
+                    sampler = ProcessSampler(proc, name=proc.info.get('name'),
+                                             create_time=proc.info.get('create_time'))
+                    info = self._sample(group, sampler)
+                    if info is not None:
+                        self.cache[group] = proc
+                        self.samplers[group] = sampler
+                        results[group] = info
+                        break
+
+        return results
+
+    def _sample(self, group, sampler):
+        if not self.timer:
+            return sampler.sample()
+        started = time.perf_counter()
+        info = sampler.sample()
+        self.timer(f"sample.{group}", time.perf_counter() - started)
+        return info
+
+    def invalidate(self):
+        """Forget all cached PIDs so the next scan walks the table"""
+        self.cache = {}
+        self.samplers = {}
+
+    def _full_scan(self):
+        """Walk the process table once: {group: matching processes, best first}"""
+        self.full_scans += 1
+        found = {}
+
+        for proc in self.process_iter(['name', 'create_time']):
+            try:
+                name = proc.info['name']
+            except (KeyError, AttributeError):
+                continue
+            if not name:
+                continue
+
+            matches = self.name_index.get(name.casefold())
+            if not matches:
+                continue
+
+            for group, rank in matches:
+                found.setdefault(group, []).append((rank, proc))
+
+        # Stable sort: among equal ranks the table order decides, as before
+        return {group: [proc for rank, proc in sorted(ranked, key=lambda match: match[0])]
+                for group, ranked in found.items()}
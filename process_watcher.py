@@ -0,0 +1,78 @@
+"""
+Process watcher for BF6 Crash Monitor
+Waits on the game process handle so exits are seen the moment they happen
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+
+class ProcessWatcher:
+    """Background thread that blocks on a process and reports how it ended"""
+
+    def __init__(self, pid, create_time, on_exit, process_factory=None, wait_slice=1.0, on_error=None):
+        self.pid = pid
+        self.create_time = create_time
+        self.on_exit = on_exit
+        # on_error(watcher, error): the process can't be watched, poll for its exit instead
+        self.on_error = on_error
+        self.process_factory = process_factory or psutil.Process
+        self.wait_slice = wait_slice
+        self.thread = None
+        self._cancelled = threading.Event()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"ProcessWatcher-{self.pid}", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stop watching without reporting an exit"""
+        self._cancelled.set()
+
+    def _run(self):
+        exit_code = None
+        try:
+            proc = self.process_factory(self.pid)
+            # A different create_time means the game already exited and the
+            # PID was handed to another process before we started watching
+            if abs(proc.create_time() - self.create_time) < 0.01:
+                exit_code = self._wait(proc)
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.Error as e:
+            # Protected processes (anticheat) can refuse even create_time();
+            # whether they are still running isn't known here, so no exit is reported
+            if not self._cancelled.is_set() and self.on_error:
+                self.on_error(self, e)
+            return
+
+        exit_time = time.time()
+        if self._cancelled.is_set():
+            return
+
+        self.on_exit({
+            'pid': self.pid,
+            'exit_code': exit_code,
+            'exit_time': datetime.fromtimestamp(exit_time).isoformat(timespec='milliseconds'),
+            'exit_timestamp': exit_time,
+            'running_time': exit_time - self.create_time
+        })
+
+    def _wait(self, proc):
+        """Block until the process exits, returning its exit code if known"""
+        while not self._cancelled.is_set():
+            try:
+                # Windows returns the real exit code; elsewhere it is only
+                # known for our own children
+                return proc.wait(timeout=self.wait_slice)
+            except psutil.TimeoutExpired:
+                continue
+            except psutil.AccessDenied:
+                # No wait handle for protected processes - poll instead
+                while not self._cancelled.is_set() and proc.is_running():
+                    self._cancelled.wait(0.1)
+                return None
+        return None
@@ -0,0 +1,235 @@
+"""
+Snapshot publisher for BF6 Crash Monitor
+Streams snapshots and crash reports to an aggregator in batched, compressed
+frames from a background thread, so a slow or missing aggregator never
+holds up sampling
+"""
+
+import json
+import socket
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+
+DEFAULT_PORT = 47615
+
+# Frame: magic, version, flags, payload length, then the payload
+MAGIC = b'BF6M'
+VERSION = 1
+FLAG_ZLIB = 0x01
+HEADER = struct.Struct('!4sBBI')
+# The aggregator answers each frame with its batch sequence number once stored
+ACK = struct.Struct('!Q')
+MAX_FRAME = 16 * 1024 * 1024
+# Largest batch a frame may inflate to, so a small frame can't balloon in memory
+MAX_BATCH = 64 * 1024 * 1024
+
+
+def encode_batch(batch, compress=True):
+    """One wire frame for a batch dict"""
+    payload = json.dumps(batch, separators=(',', ':'), default=str).encode('utf-8')
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, VERSION, flags, len(payload)) + payload
+
+
+def decode_header(header):
+    """(flags, payload length) from a frame header; ValueError if it isn't one"""
+    magic, version, flags, length = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a BF6 monitor frame")
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes is too large")
+    return flags, length
+
+
+def decode_payload(flags, payload):
+    """The batch dict in a frame payload; ValueError if it isn't one or inflates past MAX_BATCH"""
+    if flags & FLAG_ZLIB:
+        inflater = zlib.decompressobj()
+        payload = inflater.decompress(payload, MAX_BATCH)
+        if inflater.unconsumed_tail:
+            raise ValueError(f"frame inflates past {MAX_BATCH} bytes")
+        if not inflater.eof:
+            raise ValueError("truncated compressed frame")
+    return json.loads(payload.decode('utf-8'))
+
+
+def parse_address(text, default_host='127.0.0.1'):
+    """'host:port', ':port' or 'port' -> (host, port)"""
+    host, _, port = text.rpartition(':')
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+class SnapshotPublisher:
+    """Bounded send queues drained by a sender thread that reconnects with back-off
+
+    Snapshots and crash reports queue separately; when a queue is full the
+    oldest item is dropped, so a crash report is never pushed out by
+    snapshots. publish() is a deque append and never waits. A batch stays
+    pending until the aggregator acknowledges it and is resent after a
+    reconnect; the aggregator skips sequence numbers it already has.
+    """
+
+    def __init__(self, address, host_name=None, batch_size=50, flush_interval=5.0, max_queue=500,
+                 max_crash_queue=50, connect_timeout=3.0, send_timeout=5.0, max_backoff=30.0):
+        self.address = address
+        self.host_name = host_name or socket.gethostname()
+        self.sender_id = uuid.uuid4().hex
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.max_backoff = max_backoff
+
+        self.snapshots = deque(maxlen=max_queue)
+        self.crashes = deque(maxlen=max_crash_queue)
+        self.seq = 0
+        self.sent_items = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.connected = False
+
+        self.sock = None
+        self.pending = None
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+        self.thread = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def on_event(self, event, payload):
+        """MonitorEngine subscriber"""
+        if event == 'snapshot':
+            self.publish('snapshot', payload)
+        elif event == 'crash':
+            self.publish('crash', payload)
+
+    def publish(self, kind, data):
+        """Queue an item, dropping the oldest of its kind when full"""
+        target = self.crashes if kind == 'crash' else self.snapshots
+        if len(target) == target.maxlen:
+            self.dropped += 1
+        target.append({'kind': kind, 'time': time.time(), 'data': data})
+        if kind == 'crash' or len(self.snapshots) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="SnapshotPublisher", daemon=True)
+        self.thread.start()
+
+    def close(self, timeout=5.0):
+        """Send what is queued if the aggregator is reachable, then stop"""
+        self._stop_event.set()
+        self._wake.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self._disconnect()
+
+    def stats(self):
+        return {
+            'connected': self.connected,
+            'queued': len(self.snapshots) + len(self.crashes),
+            'sent_items': self.sent_items,
+            'sent_bytes': self.sent_bytes,
+            'dropped': self.dropped,
+            'reconnects': self.reconnects
+        }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        # Last chance for whatever is still queued
+        self.next_attempt = 0.0
+        self._flush()
+
+    def _flush(self):
+        while True:
+            if self.pending is None:
+                items = self._take()
+                if not items:
+                    return
+                self.seq += 1
+                self.pending = (len(items), self.seq, encode_batch({
+                    'host': self.host_name,
+                    'sender': self.sender_id,
+                    'seq': self.seq,
+                    'sent_at': time.time(),
+                    'items': items
+                }))
+            if not self._send(self.pending[2], self.pending[1]):
+                return
+            self.sent_items += self.pending[0]
+            self.pending = None
+
+    def _take(self):
+        """Up to batch_size items, crash reports first"""
+        items = []
+        for source in (self.crashes, self.snapshots):
+            while source and len(items) < self.batch_size:
+                try:
+                    items.append(source.popleft())
+                except IndexError:
+                    break
+        return items
+
+    def _send(self, frame, seq):
+        if self.sock is None:
+            if time.monotonic() < self.next_attempt:
+                return False
+            try:
+                self.sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+                self.sock.settimeout(self.send_timeout)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                self._retry_later()
+                return False
+            self.connected = True
+            self.backoff = 0.0
+            self.reconnects += 1
+
+        try:
+            self.sock.sendall(frame)
+            acked, = ACK.unpack(self._recv_exact(ACK.size))
+            if acked != seq:
+                raise OSError(f"aggregator acknowledged batch {acked}, expected {seq}")
+        except OSError:
+            # The batch stays pending and goes out again after reconnecting
+            self._disconnect()
+            self._retry_later()
+            return False
+        self.sent_bytes += len(frame)
+        return True
+
+    def _recv_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("aggregator closed the connection")
+            data += chunk
+        return data
+
+    def _retry_later(self):
+        self.backoff = min(self.max_backoff, self.backoff * 2 or 0.5)
+        self.next_attempt = time.monotonic() + self.backoff
+
+    def _disconnect(self):
+        self.connected = False
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
@@ -0,0 +1,203 @@
+"""
+Pre-crash sample ring for BF6 Crash Monitor
+Keeps the last N seconds of high-frequency samples in preallocated arrays
+"""
+
+import math
+import threading
+import time
+from array import array
+from datetime import datetime
+
+import psutil
+
+SAMPLE_FIELDS = (
+    'timestamp',
+    'cpu_percent',
+    'ram_percent',
+    'game_rss_mb',
+    'game_cpu_percent',
+    'game_handles',
+    'game_private_mb',
+    'game_threads',
+    'game_page_faults',
+    'anticheat_present',
+    'gpu_util_percent',
+    'gpu_vram_used_mb',
+    'gpu_core_clock_mhz',
+    'gpu_temp_c',
+    'gpu_power_w'
+)
+
+NAN = float('nan')
+
+
+class SampleRing:
+    """Fixed-size ring buffer with one preallocated array('d') per field"""
+
+    def __init__(self, capacity, fields=SAMPLE_FIELDS):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.columns = [array('d', [NAN]) * capacity for _ in self.fields]
+        self.head = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, *values):
+        """Write one sample in place, overwriting the oldest when full"""
+        with self.lock:
+            index = self.head
+            for column, value in zip(self.columns, values):
+                column[index] = value
+            self.head = (index + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    def nbytes(self):
+        """Memory held by the sample columns"""
+        return sum(column.itemsize * len(column) for column in self.columns)
+
+    def series(self):
+        """Chronological columns as plain lists, missing values as None"""
+        with self.lock:
+            start = (self.head - self.count) % self.capacity
+            result = {}
+            for field, column in zip(self.fields, self.columns):
+                if start + self.count <= self.capacity:
+                    values = column[start:start + self.count]
+                else:
+                    values = column[start:] + column[:self.head]
+                result[field] = [None if math.isnan(v) else v for v in values]
+            return result
+
+    def to_report(self, precision=2):
+        """Compact time series for crash reports
+
+        Timestamps become second offsets from the newest sample so the
+        window stays small and easy to plot.
+        """
+        series = self.series()
+        timestamps = series.pop('timestamp', [])
+        if not timestamps:
+            return None
+
+        end = timestamps[-1]
+        report = {
+            'end_time': datetime.fromtimestamp(end).isoformat(timespec='milliseconds'),
+            'samples': len(timestamps),
+            'offset_seconds': [round(t - end, 3) for t in timestamps]
+        }
+        for field, values in series.items():
+            report[field] = [round(v, precision) if v is not None else None for v in values]
+        return report
+
+
+class PreCrashRecorder:
+    """Samples system and game resources into a SampleRing on each sample() call
+
+    game_group and anticheat_group are scanner groups (target names); the
+    defaults are the names in targets.DEFAULT_TARGETS. anticheat_group is
+    None when no target has the anticheat role.
+    """
+
+    def __init__(self, ring, scanner, game_group='bf6', anticheat_group='anticheat',
+                 process_factory=None, gpu_telemetry=None):
+        self.ring = ring
+        self.scanner = scanner
+        # Anything with latest() -> reading dict or None (gpu_telemetry.GpuTelemetry)
+        self.gpu_telemetry = gpu_telemetry
+        self.process_factory = process_factory or psutil.Process
+        self.game_group = game_group
+        self.anticheat_group = anticheat_group
+
+        # Own Process object so cpu_percent() deltas don't collide with the scanner
+        self._game = None
+        # Samples taken from _game; its first cpu_percent() only primes the delta
+        self._game_samples = 0
+
+    def sample(self):
+        """Take one sample and append it to the ring"""
+        game_rss = game_cpu = game_handles = NAN
+        game_private = game_threads = game_page_faults = NAN
+
+        game = self._game_process()
+        if game is not None:
+            try:
+                # Everything here comes from the one oneshot() snapshot; reads
+                # a protected game refuses stay NaN
+                with game.oneshot():
+                    mem = _allowed(game.memory_info, None)
+                    if mem is not None:
+                        game_rss = mem.rss / 1024 / 1024
+                        game_private = getattr(mem, 'private', NAN) / 1024 / 1024
+                        game_page_faults = getattr(mem, 'num_page_faults', NAN)
+                    game_cpu = _allowed(lambda: game.cpu_percent(interval=None))
+                    if not self._game_samples:
+                        # psutil answers 0.0 until it has a previous reading to diff
+                        game_cpu = NAN
+                    self._game_samples += 1
+                    game_threads = _allowed(game.num_threads)
+                    if hasattr(game, 'num_handles'):
+                        game_handles = _allowed(game.num_handles)
+            except psutil.NoSuchProcess:
+                self._game = None
+
+        anticheat = self.scanner.cache.get(self.anticheat_group)
+        try:
+            anticheat_present = 1.0 if anticheat is not None and anticheat.is_running() else 0.0
+        except psutil.Error:
+            anticheat_present = 0.0
+
+        gpu = self.gpu_telemetry.latest() if self.gpu_telemetry else None
+        gpu_values = [_value(gpu, field) for field in
+                      ('utilization_percent', 'memory_used_mb', 'core_clock_mhz', 'temperature_c', 'power_w')]
+
+        self.ring.append(
+            time.time(),
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            game_rss,
+            game_cpu,
+            game_handles,
+            game_private,
+            game_threads,
+            game_page_faults,
+            anticheat_present,
+            *gpu_values
+        )
+
+    def _game_process(self):
+        scanned = self.scanner.cache.get(self.game_group)
+        if scanned is None:
+            self._game = None
+            return None
+        try:
+            same = (self._game is not None and self._game.pid == scanned.pid
+                    and self._game.create_time() == scanned.create_time())
+        except psutil.AccessDenied:
+            # A protected game hides its start time; the PID has to do
+            same = self._game.pid == scanned.pid
+        except psutil.Error:
+            same = False
+        if not same:
+            self._game_samples = 0
+            try:
+                self._game = self.process_factory(scanned.pid)
+            except psutil.Error:
+                self._game = None
+        return self._game
+
+
+def _allowed(read, default=NAN):
+    try:
+        return read()
+    except psutil.AccessDenied:
+        return default
+
+
+def _value(reading, field):
+    value = reading.get(field) if reading else None
+    return NAN if value is None else value
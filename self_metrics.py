@@ -0,0 +1,212 @@
+"""
+Self-overhead metrics for BF6 Crash Monitor
+Per-probe latency histograms plus the monitor's own CPU, RSS and busiest
+threads, so its cost next to the game can be shown rather than guessed
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import psutil
+
+# Upper bucket bounds in milliseconds; anything slower lands in the overflow bucket
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets: O(log buckets) to record, constant memory"""
+
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile, capped at the max seen"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], round(self.max_ms, 3))
+                break
+        return round(self.max_ms, 3)
+
+    def to_dict(self):
+        buckets = {}
+        for index, count in enumerate(self.counts):
+            if count:
+                label = f"<={self.bounds[index]}" if index < len(self.bounds) else f">{self.bounds[-1]}"
+                buckets[label] = count
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': buckets
+        }
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class SelfMetrics:
+    """Collects probe timings and samples the monitor's own process
+
+    record() and timed() are safe from any thread; a timing costs two
+    perf_counter() calls and one bisect.
+    """
+
+    def __init__(self, process=None, top_threads=5):
+        self.process = process or psutil.Process(os.getpid())
+        self.top_threads = top_threads
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+        self.cpu_count = psutil.cpu_count() or 1
+        self.samples = 0
+        self.cpu_percent = None
+        self.cpu_total = 0.0
+        self.cpu_peak = 0.0
+        self.rss_mb = None
+        self.rss_peak_mb = 0.0
+        self.num_threads = None
+        self.busiest_threads = None
+        self._last_time = None
+        self._last_threads = {}
+
+    def timed(self, name):
+        """Context manager that records the block's duration under name"""
+        return _Timer(self, name)
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds * 1000)
+
+    def sample_process(self):
+        """Read the monitor's own CPU, RSS and per-thread CPU"""
+        proc = self.process
+        try:
+            with proc.oneshot():
+                now = time.monotonic()
+                cpu = proc.cpu_percent(interval=None)
+                rss_mb = proc.memory_info().rss / 1024 / 1024
+                threads = proc.threads()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+
+        elapsed = now - self._last_time if self._last_time is not None else None
+        busiest = self._thread_rates(threads, elapsed)
+
+        with self.lock:
+            if self._last_time is not None:
+                # Share of the whole machine, the figure that competes with the game
+                self.cpu_percent = cpu / self.cpu_count
+                self.cpu_total += self.cpu_percent
+                self.cpu_peak = max(self.cpu_peak, self.cpu_percent)
+                self.samples += 1
+            self.rss_mb = rss_mb
+            self.rss_peak_mb = max(self.rss_peak_mb, rss_mb)
+            self.num_threads = len(threads)
+            if busiest is not None:
+                self.busiest_threads = busiest
+            self._last_time = now
+
+    def _thread_rates(self, threads, elapsed):
+        current = {thread.id: thread.user_time + thread.system_time for thread in threads}
+        previous, self._last_threads = self._last_threads, current
+        if not elapsed:
+            return None
+
+        # Name OS threads after the Python threads running on them
+        names = {getattr(thread, 'native_id', None): thread.name for thread in threading.enumerate()}
+        rates = []
+        for thread_id, cpu_time in current.items():
+            delta = cpu_time - previous.get(thread_id, cpu_time)
+            if delta > 0:
+                rates.append((delta / elapsed * 100 / self.cpu_count, thread_id))
+        rates.sort(reverse=True)
+        return [{'name': names.get(thread_id, str(thread_id)), 'cpu_percent': round(rate, 3)}
+                for rate, thread_id in rates[:self.top_threads]]
+
+    def report(self):
+        """Process figures and per-probe histograms, ready for JSON"""
+        with self.lock:
+            return {
+                'process': {
+                    'cpu_percent': _round(self.cpu_percent, 3),
+                    'cpu_mean_percent': _round(self.cpu_total / self.samples, 3) if self.samples else None,
+                    'cpu_peak_percent': round(self.cpu_peak, 3),
+                    'rss_mb': _round(self.rss_mb, 1),
+                    'rss_peak_mb': round(self.rss_peak_mb, 1),
+                    'num_threads': self.num_threads,
+                    'busiest_threads': self.busiest_threads
+                },
+                'probes': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+            }
+
+
+def format_overhead(report, frame_latency=None):
+    """Readable lines for the debug panel"""
+    process = report['process']
+    lines = [
+        "Monitor process",
+        f"  CPU: {_text(process['cpu_percent'])}% now, {_text(process['cpu_mean_percent'])}% mean, "
+        f"{_text(process['cpu_peak_percent'])}% peak (share of all cores)",
+        f"  RSS: {_text(process['rss_mb'])} MB, peak {_text(process['rss_peak_mb'])} MB, "
+        f"{_text(process['num_threads'])} threads"
+    ]
+    for thread in process['busiest_threads'] or []:
+        lines.append(f"    {thread['name']:<28}{thread['cpu_percent']:>8.3f}%")
+
+    if frame_latency:
+        lines.append("")
+        lines.append(f"GUI frames: {frame_latency['frames']}, p99 late {frame_latency['p99_ms']} ms, "
+                     f"max {frame_latency['max_ms']} ms, {frame_latency['over_budget']} over budget")
+
+    lines.append("")
+    lines.append(f"{'Probe':<28}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, stats in report['probes'].items():
+        lines.append(f"{name:<28}{stats['count']:>8}{_text(stats['mean_ms']):>10}{_text(stats['p50_ms']):>10}"
+                     f"{_text(stats['p90_ms']):>10}{_text(stats['p99_ms']):>10}{_text(stats['max_ms']):>10}")
+    return lines
+
+
+def _round(value, digits):
+    return None if value is None else round(value, digits)
+
+
+def _text(value):
+    return "-" if value is None else str(value)
@@ -0,0 +1,281 @@
+"""
+Persistent shell worker for BF6 Crash Monitor
+Keeps PowerShell running and talks to it with line-delimited JSON instead of
+starting a new powershell.exe for every query
+"""
+
+import base64
+import itertools
+import json
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+# Reads one JSON request per line from stdin and answers with one JSON line:
+#   -> {"id": 1, "command": "Get-Date"}
+#   <- {"id": 1, "ok": true, "result": [...]}   or   {"id": 1, "ok": false, "error": "..."}
+# A line that isn't valid JSON gets an error answer too, so the loop keeps running
+POWERSHELL_WORKER_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if ($line.Trim() -eq '') { continue }
+    $req = $null
+    try {
+        $req = $line | ConvertFrom-Json
+        $result = @(Invoke-Expression $req.command)
+        $out = @{ id = $req.id; ok = $true; result = $result }
+    } catch {
+        # A request that doesn't parse is still answered, under its id if one can be found
+        if ($req -ne $null) { $id = $req.id }
+        elseif ($line -match '"id"\s*:\s*(\d+)') { $id = [int64]$Matches[1] }
+        else { $id = $null }
+        $out = @{ id = $id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($out | ConvertTo-Json -Compress -Depth 5))
+    [Console]::Out.Flush()
+}
+"""
+
+
+class ShellWorkerError(Exception):
+    """A shell query failed"""
+
+
+class ShellTimeout(ShellWorkerError):
+    """A shell query did not answer in time"""
+
+
+class Transport:
+    """A line-oriented connection to a worker process
+
+    Subclasses provide start(), send_line(), read_line(timeout), is_alive()
+    and close(). read_line returns None on timeout and raises EOFError when
+    the worker is gone.
+    """
+
+    def start(self):
+        raise NotImplementedError
+
+    def send_line(self, line):
+        raise NotImplementedError
+
+    def read_line(self, timeout):
+        raise NotImplementedError
+
+    def is_alive(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class SubprocessTransport(Transport):
+    """Runs argv as a child process and exchanges lines over its pipes"""
+
+    def __init__(self, argv):
+        self.argv = argv
+        self.proc = None
+        self.lines = None
+
+    def start(self):
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        self.proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            creationflags=creationflags
+        )
+        # A reader thread lets read_line() honour a timeout on every OS
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(self.proc, self.lines),
+                         name="ShellWorkerReader", daemon=True).start()
+
+    @staticmethod
+    def _read_stdout(proc, lines):
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def send_line(self, line):
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise EOFError(str(e))
+
+    def read_line(self, timeout):
+        try:
+            line = self.lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            raise EOFError("worker exited")
+        return line
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.proc = None
+
+
+def powershell_argv(script):
+    """argv that runs a PowerShell script without quoting trouble"""
+    encoded = base64.b64encode(script.encode('utf-16-le')).decode('ascii')
+    return ['powershell', '-NoProfile', '-NonInteractive', '-ExecutionPolicy', 'Bypass',
+            '-EncodedCommand', encoded]
+
+
+def powershell_transport():
+    """Transport for the PowerShell worker loop"""
+    return SubprocessTransport(powershell_argv(POWERSHELL_WORKER_SCRIPT))
+
+
+class ShellWorker:
+    """One long-lived worker process, restarted when it dies or hangs"""
+
+    def __init__(self, transport_factory):
+        self.transport_factory = transport_factory
+        self.transport = None
+        self.ids = itertools.count(1)
+        self.restarts = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            self._ensure_started()
+
+    def _ensure_started(self):
+        if self.transport is not None and self.transport.is_alive():
+            return
+        if self.transport is not None:
+            self.transport.close()
+            self.restarts += 1
+        self.transport = self.transport_factory()
+        self.transport.start()
+
+    def _restart(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self.restarts += 1
+
+    def query(self, command, timeout=10.0):
+        """Run a command and return its result list"""
+        with self.lock:
+            # One retry covers a worker that died between queries
+            for attempt in range(2):
+                self._ensure_started()
+                request_id = next(self.ids)
+                try:
+                    self.transport.send_line(json.dumps({'id': request_id, 'command': command}))
+                    return self._read_response(request_id, timeout)
+                except EOFError:
+                    self._restart()
+                    if attempt:
+                        raise ShellWorkerError("worker exited during query")
+                except ShellTimeout:
+                    # A hung worker would block every later query - replace it
+                    self._restart()
+                    raise
+
+    def _read_response(self, request_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ShellTimeout(f"no response within {timeout:.1f}s")
+            line = self.transport.read_line(remaining)
+            if line is None:
+                continue
+            try:
+                response = json.loads(line)
+            except ValueError:
+                # Stray output (banners, warnings) is not part of the protocol
+                continue
+            if not isinstance(response, dict) or response.get('id') != request_id:
+                # Late answer to a request that already timed out
+                continue
+            if not response.get('ok'):
+                raise ShellWorkerError(response.get('error') or "query failed")
+            result = response.get('result')
+            if result is None:
+                return []
+            return result if isinstance(result, list) else [result]
+
+    def close(self):
+        with self.lock:
+            if self.transport is not None:
+                self.transport.close()
+                self.transport = None
+
+
+class ShellWorkerPool:
+    """A few ShellWorkers so concurrent queries don't wait on each other"""
+
+    def __init__(self, transport_factory, size=2):
+        self.workers = [ShellWorker(transport_factory) for _ in range(size)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+
+    def start(self):
+        """Start every worker in the background"""
+        for worker in self.workers:
+            threading.Thread(target=self._start_quietly, args=(worker,), daemon=True).start()
+
+    @staticmethod
+    def _start_quietly(worker):
+        try:
+            worker.start()
+        except OSError:
+            pass
+
+    def query(self, command, timeout=10.0):
+        """Run a command on the next free worker; timeout covers waiting for one"""
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ShellTimeout(f"no free worker within {timeout:.1f}s")
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Out of time before asking - the worker itself is fine, don't restart it
+                raise ShellTimeout(f"no free worker within {timeout:.1f}s")
+            return worker.query(command, remaining)
+        finally:
+            self.idle.put(worker)
+
+    def restarts(self):
+        return sum(worker.restarts for worker in self.workers)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+def python_transport(script_path):
+    """Transport for a Python stand-in worker script (used for testing)"""
+    return SubprocessTransport([sys.executable, '-u', str(script_path)])
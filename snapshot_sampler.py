@@ -0,0 +1,61 @@
+"""
+Snapshot sampler for BF6 Crash Monitor
+Collects system snapshots off the GUI thread (the probe scheduler calls
+sample()) so the GUI only repaints
+"""
+
+import queue
+import traceback
+
+
+class SnapshotSampler:
+    """Feeds snapshots and engine events into a bounded queue"""
+
+    def __init__(self, collect, maxsize=8, prime=None):
+        self.collect = collect
+        self.prime = prime
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, kind, payload):
+        """Queue an item, dropping the oldest one if the consumer fell behind"""
+        while True:
+            try:
+                self.queue.put_nowait((kind, payload))
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Block for the next (kind, payload) item, None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self, limit=None):
+        """Return queued (kind, payload) items without blocking"""
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def sample(self):
+        """Collect and queue one snapshot (run by the probe scheduler)"""
+        if self.prime:
+            prime, self.prime = self.prime, None
+            try:
+                prime()
+            except Exception:
+                pass
+        try:
+            self.put('snapshot', self.collect())
+        except Exception:
+            self.put('error', traceback.format_exc())
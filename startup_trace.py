@@ -0,0 +1,40 @@
+"""
+Startup timing for BF6 Crash Monitor
+Set BF6_STARTUP_TRACE=<file> to record when the window first paints and when
+the initial probes finish; BF6_STARTUP_EXIT=1 closes the app afterwards.
+"""
+
+import json
+import os
+import time
+
+import psutil
+
+
+class StartupTrace:
+    """Records wall-clock marks during startup and writes them as JSON"""
+
+    def __init__(self):
+        self.path = os.environ.get('BF6_STARTUP_TRACE')
+        self.exit_when_done = os.environ.get('BF6_STARTUP_EXIT') == '1'
+        self.marks = {}
+        if self.path:
+            try:
+                self.marks['process_start'] = psutil.Process(os.getpid()).create_time()
+            except psutil.Error:
+                pass
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def mark(self, name):
+        """Record the first time a milestone is reached"""
+        if self.path and name not in self.marks:
+            self.marks[name] = time.time()
+
+    def write(self):
+        if not self.path:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.marks, f, indent=2)
@@ -0,0 +1,142 @@
+"""
+Watched targets for BF6 Crash Monitor
+The games and helper processes to watch, loaded from a JSON config, each with
+its own running state and crash counter
+"""
+
+import json
+import os
+
+# Games get a full crash report whenever they exit; helpers (anticheat,
+# launchers, overlays) are logged and counted as crashed on a non-zero exit
+KINDS = ('game', 'helper')
+
+# What a target is to the crash checks, independent of its name: the
+# 'anticheat' target is the one whose absence fires javelin_missing
+ROLES = ('anticheat',)
+
+DEFAULT_TARGETS = [
+    {'name': 'bf6', 'label': 'BF6', 'kind': 'game',
+     'processes': ["bf6.exe", "bf2042.exe", "Battlefield2042.exe"]},
+    {'name': 'anticheat', 'label': 'EA Javelin', 'kind': 'helper', 'role': 'anticheat',
+     'processes': ["JavelinAC.exe", "Javelin.exe", "EAAntiCheat.GameService.exe",
+                   "EAAntiCheat.GameServiceLauncher.exe"]}
+]
+
+DEFAULT_CONFIG = "targets.json"
+
+
+class Target:
+    """One watched title or helper and its state in the current session"""
+
+    def __init__(self, name, processes, label=None, kind='helper', watch_exit=None, dump_dirs=(), role=None):
+        self.name = name
+        self.processes = list(processes)
+        self.label = label or name
+        self.kind = kind
+        self.role = role
+        # Folders the title writes its own crash dumps to, besides CrashDumps and WER
+        self.dump_dirs = [os.path.expandvars(os.path.expanduser(path)) for path in dump_dirs]
+        # Waiting on the process handle costs a thread; by default only games get one
+        self.watch_exit = self.is_game if watch_exit is None else watch_exit
+
+        self.running = False
+        self.info = None
+        self.watcher = None
+        self.exited = None
+        self.last_snapshot = None
+        self.crash_count = 0
+        self.exit_count = 0
+
+    def reset(self):
+        """Forget the process being followed when monitoring stops; crash and exit counts stay"""
+        if self.watcher:
+            self.watcher.cancel()
+        self.running = False
+        self.info = None
+        self.watcher = None
+        self.exited = None
+        self.last_snapshot = None
+
+    @property
+    def is_game(self):
+        return self.kind == 'game'
+
+    def identity(self, info):
+        return (info['pid'], info['create_time'])
+
+    def status(self):
+        return {
+            'label': self.label,
+            'kind': self.kind,
+            'running': self.running,
+            'pid': self.info['pid'] if self.running and self.info else None,
+            'crashes': self.crash_count,
+            'exits': self.exit_count
+        }
+
+
+def parse_targets(entries):
+    """Validate config entries and return {name: Target} in config order"""
+    targets = {}
+    for index, entry in enumerate(entries):
+        where = f"target #{index + 1}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected an object")
+        name = entry.get('name')
+        if not name or not isinstance(name, str):
+            raise ValueError(f"{where}: 'name' is required")
+        if name in targets:
+            raise ValueError(f"{where}: duplicate target name '{name}'")
+        processes = entry.get('processes')
+        if (not isinstance(processes, list) or not processes
+                or not all(isinstance(process, str) and process for process in processes)):
+            raise ValueError(f"{where} ({name}): 'processes' must be a non-empty list of names")
+        kind = entry.get('kind', 'helper')
+        if kind not in KINDS:
+            raise ValueError(f"{where} ({name}): 'kind' must be one of {', '.join(KINDS)}")
+        dump_dirs = entry.get('dump_dirs', [])
+        if not isinstance(dump_dirs, list) or not all(isinstance(path, str) and path for path in dump_dirs):
+            raise ValueError(f"{where} ({name}): 'dump_dirs' must be a list of folders")
+        role = entry.get('role')
+        if role is not None and role not in ROLES:
+            raise ValueError(f"{where} ({name}): 'role' must be one of {', '.join(ROLES)}")
+        if role is not None and any(target.role == role for target in targets.values()):
+            raise ValueError(f"{where} ({name}): only one target can have role '{role}'")
+        targets[name] = Target(name, processes, entry.get('label'), kind, entry.get('watch_exit'), dump_dirs,
+                               role)
+
+    if not any(target.is_game for target in targets.values()):
+        raise ValueError("at least one target must have kind 'game'")
+    # Configs written before roles existed named the entry 'anticheat'; a
+    # config with neither simply skips the Javelin checks
+    if role_target(targets, 'anticheat') is None and 'anticheat' in targets:
+        targets['anticheat'].role = 'anticheat'
+    return targets
+
+
+def role_target(targets, role):
+    """The target with that role in {name: Target}, or None"""
+    for target in targets.values():
+        if target.role == role:
+            return target
+    return None
+
+
+def load_targets(path=None):
+    """Targets from a JSON config ({"targets": [...]}), or the defaults
+
+    A missing file at the default location means the defaults; a missing
+    file that was asked for explicitly is an error.
+    """
+    if path is None:
+        path = DEFAULT_CONFIG
+        if not os.path.exists(path):
+            return parse_targets(DEFAULT_TARGETS)
+
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    entries = config.get('targets') if isinstance(config, dict) else config
+    if entries is None:
+        raise ValueError(f"{path}: expected a 'targets' list")
+    return parse_targets(entries)
@@ -0,0 +1,207 @@
+"""
+Memory trend prediction for BF6 Crash Monitor
+Online, exponentially weighted linear regression over snapshot values, so a
+leaking game or shrinking free memory is spotted while it is still running
+"""
+
+import time
+
+
+class OnlineTrend:
+    """Exponentially weighted least-squares line, O(1) per sample
+
+    Sums are kept relative to the newest sample time, so the fitted level is
+    the intercept and no history is ever re-scanned. Samples lose half their
+    weight every halflife seconds.
+    """
+
+    def __init__(self, halflife=600.0):
+        self.halflife = halflife
+        self.reset()
+
+    def reset(self):
+        self.last_time = None
+        self.first_time = None
+        self.samples = 0
+        self._w = self._t = self._tt = self._y = self._ty = 0.0
+
+    def update(self, t, y):
+        if self.last_time is None:
+            self.first_time = t
+        else:
+            dt = t - self.last_time
+            if dt <= 0:
+                return
+            # Move the origin to the new sample, then age the old weights
+            self._tt += dt * dt * self._w - 2 * dt * self._t
+            self._ty -= dt * self._y
+            self._t -= dt * self._w
+            decay = 0.5 ** (dt / self.halflife)
+            self._w *= decay
+            self._t *= decay
+            self._tt *= decay
+            self._y *= decay
+            self._ty *= decay
+
+        self._w += 1.0
+        self._y += y
+        self.last_time = t
+        self.samples += 1
+
+    @property
+    def span(self):
+        """Seconds covered since the last reset"""
+        return 0.0 if self.last_time is None else self.last_time - self.first_time
+
+    @property
+    def slope(self):
+        """Units per second, None until two samples exist"""
+        denominator = self._w * self._tt - self._t * self._t
+        if self.samples < 2 or denominator <= 1e-12:
+            return None
+        return (self._w * self._ty - self._t * self._y) / denominator
+
+    @property
+    def level(self):
+        """Fitted value at the newest sample"""
+        if not self.samples:
+            return None
+        slope = self.slope or 0.0
+        return (self._y - slope * self._t) / self._w
+
+
+class MemoryTrendMonitor:
+    """Tracks game RSS, available memory and commit charge from snapshots
+
+    update() returns the current estimates, including minutes until memory
+    or commit runs out at the present rate, and a warning string when that
+    is closer than warn_minutes.
+    """
+
+    def __init__(self, halflife=600.0, min_span=300.0, min_samples=10, warn_minutes=30.0,
+                 min_growth_mb_per_min=1.0, warn_every=300.0, clock=None):
+        self.min_span = min_span
+        self.min_samples = min_samples
+        self.warn_minutes = warn_minutes
+        self.min_growth = min_growth_mb_per_min / 60.0
+        self.warn_every = warn_every
+        self.clock = clock or time.time
+
+        self.game_rss = OnlineTrend(halflife)
+        self.available = OnlineTrend(halflife)
+        self.commit = OnlineTrend(halflife)
+        self.game_key = None
+        self.game_label = 'Game'
+        self.commit_limit_mb = None
+        self.last_warning = {}
+        self.pending_warnings = []
+        self.estimates = None
+
+    def reset_game(self):
+        self.game_rss.reset()
+        self.game_key = None
+
+    def update(self, snapshot, game_label=None):
+        """Feed one snapshot and return the estimates dict
+
+        game_label names the game in bf6_process in warnings.
+        """
+        now = self.clock()
+        memory = snapshot['memory']
+        available_mb = memory['available_gb'] * 1024
+        self.available.update(now, available_mb)
+
+        commit_used = memory.get('commit_used_gb')
+        if commit_used is not None:
+            self.commit.update(now, commit_used * 1024)
+            self.commit_limit_mb = memory['commit_limit_gb'] * 1024
+
+        game = snapshot.get('bf6_process')
+        if game:
+            key = (game['pid'], game['create_time'])
+            if key != self.game_key:
+                # A new game process starts a new trend
+                self.game_rss.reset()
+                self.game_key = key
+            self.game_label = game_label or 'Game'
+            if game['memory_mb'] is not None:
+                self.game_rss.update(now, game['memory_mb'])
+        elif self.game_key is not None:
+            self.reset_game()
+
+        self.estimates = self._estimate(available_mb)
+        return self.estimates
+
+    def _ready(self, trend):
+        return trend.samples >= self.min_samples and trend.span >= self.min_span
+
+    def _estimate(self, available_mb):
+        estimates = {}
+        warnings = []
+
+        available_slope = self.available.slope if self._ready(self.available) else None
+        available_minutes = None
+        if available_slope is not None and available_slope < -self.min_growth:
+            available_minutes = self.available.level / -available_slope / 60
+        estimates['available_memory'] = {
+            'mb': _round(self.available.level),
+            'slope_mb_per_min': _per_minute(available_slope),
+            'minutes_to_exhaustion': _round(available_minutes)
+        }
+        if available_minutes is not None and available_minutes < self.warn_minutes:
+            warnings.append(('available_memory',
+                             f"Free RAM is dropping {-available_slope * 60:.0f} MB/min - "
+                             f"runs out in ~{available_minutes:.0f} min"))
+
+        if self.game_key is not None:
+            rss_slope = self.game_rss.slope if self._ready(self.game_rss) else None
+            rss_minutes = None
+            if rss_slope is not None and rss_slope > self.min_growth:
+                rss_minutes = available_mb / rss_slope / 60
+            estimates['game_rss'] = {
+                'mb': _round(self.game_rss.level),
+                'slope_mb_per_min': _per_minute(rss_slope),
+                'minutes_to_exhaustion': _round(rss_minutes)
+            }
+            if rss_minutes is not None and rss_minutes < self.warn_minutes:
+                warnings.append(('game_rss',
+                                 f"{self.game_label} memory is growing {rss_slope * 60:.0f} MB/min (possible leak) - "
+                                 f"free RAM gone in ~{rss_minutes:.0f} min"))
+
+        if self.commit.samples:
+            commit_slope = self.commit.slope if self._ready(self.commit) else None
+            commit_minutes = None
+            if commit_slope is not None and commit_slope > self.min_growth:
+                commit_minutes = max(0.0, self.commit_limit_mb - self.commit.level) / commit_slope / 60
+            estimates['commit'] = {
+                'used_mb': _round(self.commit.level),
+                'limit_mb': _round(self.commit_limit_mb),
+                'slope_mb_per_min': _per_minute(commit_slope),
+                'minutes_to_exhaustion': _round(commit_minutes)
+            }
+            if commit_minutes is not None and commit_minutes < self.warn_minutes:
+                warnings.append(('commit',
+                                 f"Commit charge is growing {commit_slope * 60:.0f} MB/min - "
+                                 f"hits the limit in ~{commit_minutes:.0f} min"))
+
+        estimates['warnings'] = [text for _, text in warnings]
+        self.pending_warnings = self._throttle(warnings)
+        return estimates
+
+    def _throttle(self, warnings):
+        """Warnings not already raised within warn_every seconds"""
+        now = self.clock()
+        fresh = []
+        for resource, text in warnings:
+            if now - self.last_warning.get(resource, float('-inf')) >= self.warn_every:
+                self.last_warning[resource] = now
+                fresh.append(text)
+        return fresh
+
+
+def _per_minute(slope):
+    return None if slope is None else round(slope * 60, 2)
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
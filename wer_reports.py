@@ -0,0 +1,71 @@
+"""
+Windows Error Reporting helpers for BF6 Crash Monitor
+Where the WER report folders (ReportArchive / ReportQueue) live and the
+facts worth keeping out of their Report.wer; dump_index.py walks them
+"""
+
+import os
+from datetime import datetime
+
+# Seconds between 1601-01-01 (FILETIME) and 1970-01-01
+_FILETIME_EPOCH = 11644473600
+
+WER_STORES = ('ReportArchive', 'ReportQueue')
+
+
+def wer_store_paths():
+    """Machine-wide and per-user WER stores; they may not exist until WER first writes one"""
+    paths = []
+    for base in (os.environ.get('ProgramData'), os.environ.get('LOCALAPPDATA')):
+        if not base:
+            continue
+        for store in WER_STORES:
+            paths.append(os.path.join(base, 'Microsoft', 'Windows', 'WER', store))
+    return paths
+
+
+def read_report_wer(path):
+    """Key=value pairs from a Report.wer file (UTF-16 with a BOM, sometimes UTF-8)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        text = data.decode('utf-16', errors='replace')
+    else:
+        text = data.decode('utf-8-sig', errors='replace')
+
+    values = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition('=')
+        if sep:
+            values[key.strip()] = value.strip()
+    return values
+
+
+def _filetime(text):
+    try:
+        return int(text) / 1e7 - _FILETIME_EPOCH
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_report_wer(values):
+    """The crash-report fields out of read_report_wer() pairs"""
+    # Sig[n].Name / Sig[n].Value hold the bucket: app, module, exception code, offset
+    signature = {}
+    index = 0
+    while f"Sig[{index}].Name" in values:
+        signature[values[f"Sig[{index}].Name"]] = values.get(f"Sig[{index}].Value")
+        index += 1
+
+    event_time = _filetime(values.get('EventTime'))
+    return {
+        'event_type': values.get('EventType'),
+        'friendly_name': values.get('FriendlyEventName'),
+        'event_time': datetime.fromtimestamp(event_time).isoformat() if event_time else None,
+        'event_timestamp': event_time,
+        'app_name': values.get('AppName'),
+        'app_path': values.get('AppPath'),
+        'report_id': values.get('ReportIdentifier'),
+        'bucket_id': values.get('Response.BucketId'),
+        'signature': signature
+    }